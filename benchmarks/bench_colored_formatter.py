@@ -0,0 +1,113 @@
+"""
+Benchmark: console formatter throughput.
+
+Formats a realistic mix of records (gateway DEBUG chatter, command INFO,
+occasional warnings and errors across nested logger names) with:
+
+- plain `logging.Formatter`
+- the previous `ColoredFormatter` (prefix scan, mutate/restore the record)
+- the current `ColoredFormatter` (cached colors and time, no record mutation)
+
+Usage:
+    python benchmarks/bench_colored_formatter.py [records]
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot'))
+
+from bot_logging.colored import ColoredFormatter  # noqa: E402
+from bot_logging.config import LOGGING_CONFIG  # noqa: E402
+
+
+class LegacyColoredFormatter(ColoredFormatter):
+    """The colored formatter as it was before per-name caching."""
+
+    formatMessage = logging.Formatter.formatMessage
+    formatTime = logging.Formatter.formatTime
+
+    def format(self, record):
+        original_levelname = record.levelname
+        original_name = record.name
+
+        level_color = self.LEVEL_COLORS.get(record.levelno, self.COLORS['WHITE'])
+        logger_color = self._legacy_logger_color(record.name)
+
+        record.levelname = f"{level_color}{record.levelname}{self.COLORS['RESET']}"
+        record.name = f"{logger_color}{record.name}{self.COLORS['RESET']}"
+
+        formatted = logging.Formatter.format(self, record)
+
+        record.levelname = original_levelname
+        record.name = original_name
+        return formatted
+
+    def _legacy_logger_color(self, logger_name):
+        if logger_name in self.LOGGER_COLORS:
+            return self.LOGGER_COLORS[logger_name]
+        for name_pattern, color in self.LOGGER_COLORS.items():
+            if logger_name.startswith(name_pattern):
+                return color
+        return self.COLORS['WHITE']
+
+
+# (logger name, level, message, args) weighted roughly like a busy bot
+RECORD_MIX = [
+    ('discord.gateway', logging.DEBUG, 'For Shard ID %s: WebSocket Event: %s', (0, {'t': 'MESSAGE_CREATE'})),
+    ('discord.gateway', logging.DEBUG, 'Keeping shard ID %s websocket alive with sequence %s.', (0, 1234)),
+    ('discord.client', logging.DEBUG, 'Dispatching event %s', ('message',)),
+    ('discord.http', logging.DEBUG, '%s %s with %s has returned %s', ('POST', '/interactions', None, 204)),
+    ('discord.state', logging.DEBUG, 'Processed a chunk for %s members in guild ID %s.', (1000, 1234567890)),
+    ('bot.commands', logging.INFO, 'Slash command "/%s" invoked by %s in %s', ('ping', 'user#0001', 'Guild')),
+    ('bot.events', logging.DEBUG, 'Event "%s" triggered', ('member_join',)),
+    ('bot.example_commands', logging.INFO, 'Greeting user %s', ('user',)),
+    ('discord.gateway', logging.WARNING, 'Shard ID %s heartbeat blocked for more than %s seconds.', (0, 10)),
+    ('bot', logging.ERROR, 'Failed to sync slash commands: %s', ('HTTPException',)),
+]
+
+
+def make_records(count):
+    records = []
+    for i in range(count):
+        name, level, msg, args = RECORD_MIX[i % len(RECORD_MIX)]
+        records.append(logging.LogRecord(name, level, __file__, 0, msg, args, None))
+    return records
+
+
+def bench(formatter, records):
+    start = time.perf_counter()
+    for record in records:
+        # Drop cached values so every formatter does the full work
+        record.__dict__.pop('message', None)
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    records = make_records(count)
+    fmt = LOGGING_CONFIG["console"]["format"]
+    datefmt = LOGGING_CONFIG["console"]["date_format"]
+
+    legacy = LegacyColoredFormatter(fmt, datefmt, '{')
+    legacy.use_colors = True
+    current = ColoredFormatter(fmt, datefmt, '{')
+    current.use_colors = True
+
+    formatters = [
+        ('logging.Formatter', logging.Formatter(fmt, datefmt, '{')),
+        ('ColoredFormatter (legacy)', legacy),
+        ('ColoredFormatter (cached)', current),
+    ]
+
+    print(f'{"formatter":<28}{"records/s":>14}')
+    for label, formatter in formatters:
+        bench(formatter, records[:1000])  # Warm-up
+        print(f'{label:<28}{bench(formatter, records):>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark: gateway event throughput of the bot under each event loop.
+
+Replays a burst of raw gateway payloads through the same path the gateway
+takes for every message: JSON decoding, the socket_event_type dispatch,
+discord.py's parser and the bot's dispatch override (statistics and
+listeners, including the prefix command handler on MESSAGE_CREATE). The
+loop is yielded to after every payload, as the websocket reader does, so
+the scheduling cost of each loop is part of the measurement. Each loop runs
+in a fresh interpreter.
+
+The burst is synthetic unless a recording is given: a file with one raw
+gateway payload ({"op": 0, "t": ..., "d": ...}) per line.
+
+Usage:
+    python benchmarks/bench_event_loop.py [events] [recording.jsonl]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot'))
+
+import discord  # noqa: E402
+
+from bot import create_bot  # noqa: E402
+from eventloop import EVENT_LOOPS, backend_info, select_event_loop  # noqa: E402
+
+GUILDS = 50
+ROUNDS = 5
+
+USER = {'id': '1000', 'username': 'user0', 'discriminator': '0', 'avatar': None, 'global_name': 'User'}
+
+
+def guild_payload(guild_id: int) -> dict:
+    """Build a GUILD_CREATE payload with one text channel."""
+    return {
+        'id': str(guild_id), 'name': f'Guild {guild_id}', 'icon': None, 'owner_id': USER['id'],
+        'member_count': 1, 'large': False, 'features': [], 'emojis': [], 'stickers': [],
+        'roles': [{
+            'id': str(guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0,
+            'color': 0, 'hoist': False, 'managed': False, 'mentionable': False,
+        }],
+        'channels': [{'id': str(guild_id + 1), 'type': 0, 'name': 'general', 'position': 0, 'permission_overwrites': []}],
+        'threads': [], 'voice_states': [], 'presences': [],
+        'members': [{'user': USER, 'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False, 'flags': 0}],
+    }
+
+
+def synthetic_burst(events: int) -> list:
+    """Build raw gateway payloads: messages, edits, typing and reactions across the guilds."""
+    payloads = []
+    for index in range(events):
+        guild_id = ((index % GUILDS) + 1) << 32
+        channel_id = str(guild_id + 1)
+        kind = index % 10
+        if kind < 6:
+            event, data = 'MESSAGE_CREATE', {
+                'id': str(guild_id + 100 + index), 'channel_id': channel_id, 'guild_id': str(guild_id),
+                'author': USER, 'member': {'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False},
+                'content': f'message {index} ' + 'lorem ipsum ' * 8, 'timestamp': '2024-01-01T00:00:00+00:00',
+                'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [],
+                'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0,
+            }
+        elif kind < 8:
+            event, data = 'TYPING_START', {
+                'channel_id': channel_id, 'guild_id': str(guild_id), 'user_id': USER['id'], 'timestamp': 1700000000,
+            }
+        elif kind < 9:
+            event, data = 'MESSAGE_UPDATE', {
+                'id': str(guild_id + 100 + index - 8), 'channel_id': channel_id, 'guild_id': str(guild_id),
+                'author': USER, 'content': 'edited', 'timestamp': '2024-01-01T00:00:00+00:00',
+                'edited_timestamp': '2024-01-01T00:01:00+00:00', 'tts': False, 'mention_everyone': False,
+                'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0,
+            }
+        else:
+            event, data = 'MESSAGE_REACTION_ADD', {
+                'user_id': USER['id'], 'channel_id': channel_id, 'message_id': str(guild_id + 100 + index - 9),
+                'guild_id': str(guild_id), 'emoji': {'id': None, 'name': '👍'}, 'burst': False, 'type': 0,
+            }
+        payloads.append(json.dumps({'op': 0, 's': index + 1, 't': event, 'd': data}))
+    return payloads
+
+
+def load_burst(path: str) -> list:
+    """Read recorded raw payloads, keeping the dispatch (op 0) ones."""
+    with open(path, encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return [line for line in lines if json.loads(line).get('op') == 0]
+
+
+async def replay(bot: discord.Client, payloads: list) -> float:
+    """Feed the payloads through the gateway's dispatch path; return the seconds taken."""
+    parsers = bot._connection.parsers
+    start = time.perf_counter()
+    for raw in payloads:
+        msg = discord.utils._from_json(raw)
+        event = msg['t']
+        bot.dispatch('socket_event_type', event)
+        func = parsers.get(event)
+        if func is not None:
+            func(msg['d'])
+        # The websocket reader awaits the next frame between messages
+        await asyncio.sleep(0)
+    # Let the scheduled listeners finish
+    current = asyncio.current_task()
+    while pending := [task for task in asyncio.all_tasks() if task is not current]:
+        await asyncio.gather(*pending, return_exceptions=True)
+    return time.perf_counter() - start
+
+
+async def run(payloads: list) -> float:
+    """Set up a bot with cached guilds and replay the burst, best of ROUNDS."""
+    logger = logging.getLogger('bench')
+    logger.disabled = True
+    bot = create_bot(logger, command_sync='never')
+    await bot._async_setup_hook()
+
+    state = bot._connection
+    for index in range(GUILDS):
+        state._add_guild_from_data(guild_payload((index + 1) << 32))
+
+    received = 0
+
+    async def on_message(message):
+        nonlocal received
+        received += 1
+
+    bot.add_listener(on_message)
+    best = min([await replay(bot, payloads) for _ in range(ROUNDS)])
+    if not received:
+        raise RuntimeError('No MESSAGE_CREATE reached the listeners')
+    return best
+
+
+def run_loop(name: str, events: int, recording: str):
+    """Replay the burst under one event loop and print its throughput."""
+    loop_name, warning = select_event_loop(name)
+    if warning:
+        print(f'{name:<10}skipped ({warning})')
+        return
+    payloads = load_burst(recording) if recording else synthetic_burst(events)
+    seconds = asyncio.run(run(payloads))
+    print(f'{name:<10}{backend_info(loop_name)["Event Loop"]:<34}{len(payloads) / seconds:>14,.0f}{seconds / len(payloads) * 1e6:>10.1f}')
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run_loop(sys.argv[2], int(sys.argv[3]), sys.argv[4] if len(sys.argv) > 4 else '')
+        return
+
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    recording = sys.argv[2] if len(sys.argv) > 2 else ''
+
+    info = backend_info('asyncio')
+    print(f'{"recorded" if recording else "synthetic"} burst, best of {ROUNDS}; '
+          f'JSON: {info["JSON Backend"]}, compression: {info["Gateway Compression"]}')
+    print(f'{"loop":<10}{"implementation":<34}{"events/s":>14}{"µs/event":>10}')
+    for name in EVENT_LOOPS:
+        if name == 'auto':
+            continue
+        # A fresh interpreter per loop keeps the measurements independent
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', name, str(events), recording],
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
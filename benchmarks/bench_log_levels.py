@@ -0,0 +1,83 @@
+"""
+Benchmark: logging throughput with and without level alignment.
+
+Emits a gateway-like mix of records (mostly discord DEBUG, some bot INFO)
+under every environment preset, once with the loggers left at their
+configured levels ("before") and once with levels aligned to the handler
+thresholds ("after"), and reports records per second on the calling thread.
+
+Usage:
+    python benchmarks/bench_log_levels.py [records]
+"""
+
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot'))
+
+import bot_logging  # noqa: E402
+from bot_logging.config import ENVIRONMENT_CONFIGS, LOGGING_CONFIG  # noqa: E402
+
+PAYLOAD = {'op': 0, 't': 'MESSAGE_CREATE', 's': 42, 'd': {'id': '1234567890', 'content': 'hello'}}
+
+
+def emit_records(count: int) -> float:
+    """Emit `count` records and return the elapsed time in seconds."""
+    gateway = logging.getLogger('discord.gateway')
+    events = logging.getLogger('bot.events')
+    commands = logging.getLogger('bot.commands')
+
+    start = time.perf_counter()
+    for i in range(count):
+        if i % 10 == 0:
+            commands.info('Slash command "/%s" invoked by %s', 'ping', 'user#0001')
+        elif i % 3 == 0:
+            events.debug('Event "%s" triggered', 'member_join')
+        else:
+            gateway.debug('For Shard ID %s: WebSocket Event: %s', 0, PAYLOAD)
+    return time.perf_counter() - start
+
+
+def run(environment: str, aligned: bool, count: int) -> float:
+    """Set up logging for an environment and return records per second."""
+    bot_logging.setup_logging(environment)
+    if not aligned:
+        # Previous behaviour: loggers stay at their configured levels
+        for logger_name, level in LOGGING_CONFIG["loggers"].items():
+            logging.getLogger(logger_name).setLevel(level)
+        logging.getLogger('discord.http').setLevel(ENVIRONMENT_CONFIGS[environment]['discord_http_level'])
+
+    elapsed = emit_records(count)
+    bot_logging.shutdown_logging()
+    return count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    log_dir = tempfile.mkdtemp(prefix='bench-logs-')
+    for name, file_config in LOGGING_CONFIG["files"].items():
+        file_config["filename"] = os.path.join(log_dir, f'{name}.log')
+
+    results = []
+    real_stdout = sys.stdout
+    for environment in ENVIRONMENT_CONFIGS:
+        for aligned in (False, True):
+            sys.stdout = io.StringIO()  # Keep console output out of the report
+            try:
+                rate = run(environment, aligned, count)
+            finally:
+                sys.stdout = real_stdout
+            results.append((environment, 'after' if aligned else 'before', rate))
+
+    print(f'{"environment":<14}{"mode":<8}{"records/s":>14}')
+    for environment, mode, rate in results:
+        print(f'{environment:<14}{mode:<8}{rate:>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: resident memory of cached guilds under each cache policy.
+
+Feeds synthetic GUILD_CREATE payloads (members included, as sent with the
+members intent) and MESSAGE_CREATE payloads into discord.py's connection
+state, configured through the same MEMBER_CACHE / MAX_MESSAGES parsing the
+bot uses. Each policy runs in a fresh interpreter and the resident set size
+growth is reported per 1k guilds.
+
+Usage:
+    python benchmarks/bench_member_cache.py [guilds] [members_per_guild]
+"""
+
+import gc
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot'))
+
+import discord  # noqa: E402
+
+from caching import cache_options, describe_member_cache  # noqa: E402
+
+# (label, MEMBER_CACHE, MAX_MESSAGES)
+POLICIES = [
+    ('library default', None, None),
+    ('joined', 'joined', None),
+    ('voice', 'voice', None),
+    ('none', 'none', None),
+    ('none, no messages', 'none', '0'),
+]
+
+MESSAGES_PER_GUILD = 5
+
+
+def rss_bytes() -> int:
+    """Get the resident set size of this process."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def guild_payload(guild_id: int, members: int) -> dict:
+    """Build a GUILD_CREATE payload with `members` members."""
+    channel_id = guild_id + 1
+    return {
+        'id': str(guild_id),
+        'name': f'Guild {guild_id}',
+        'icon': None,
+        'owner_id': str(guild_id + 2),
+        'member_count': members,
+        'large': members > 250,
+        'features': [],
+        'emojis': [],
+        'stickers': [],
+        'roles': [{
+            'id': str(guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0,
+            'color': 0, 'hoist': False, 'managed': False, 'mentionable': False,
+        }],
+        'channels': [{'id': str(channel_id), 'type': 0, 'name': 'general', 'position': 0, 'permission_overwrites': []}],
+        'threads': [],
+        'voice_states': [],
+        'presences': [],
+        'members': [
+            {
+                'user': {
+                    'id': str(guild_id * 1000 + index), 'username': f'user{index}',
+                    'discriminator': '0', 'avatar': None, 'global_name': f'User {index}',
+                },
+                'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False, 'flags': 0,
+            }
+            for index in range(members)
+        ],
+    }
+
+
+def message_payload(guild_id: int, index: int) -> dict:
+    """Build a MESSAGE_CREATE payload in the guild's channel."""
+    return {
+        'id': str(guild_id * 100 + index), 'channel_id': str(guild_id + 1), 'guild_id': str(guild_id),
+        'author': {'id': str(guild_id * 1000), 'username': 'user0', 'discriminator': '0', 'avatar': None},
+        'content': 'hello world ' * 5, 'timestamp': '2024-01-01T00:00:00+00:00', 'edited_timestamp': None,
+        'tts': False, 'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [],
+        'embeds': [], 'pinned': False, 'type': 0,
+    }
+
+
+def run_policy(label: str, guilds: int, members: int):
+    """Load the guilds under one policy and print the RSS growth per 1k guilds."""
+    _, member_cache, max_messages = next(policy for policy in POLICIES if policy[0] == label)
+
+    intents = discord.Intents.default()
+    intents.members = True
+    options = cache_options(intents, member_cache=member_cache, max_messages=max_messages)
+    client = discord.Client(intents=intents, **options)
+    state = client._connection
+
+    gc.collect()
+    before = rss_bytes()
+    for index in range(guilds):
+        guild_id = (index + 1) << 32
+        state._add_guild_from_data(guild_payload(guild_id, members))
+        for message in range(MESSAGES_PER_GUILD):
+            state.parse_message_create(message_payload(guild_id, message))
+    gc.collect()
+    growth = rss_bytes() - before
+
+    cached = sum(len(guild._members) for guild in state._guilds.values())
+    messages = len(state._messages) if state._messages is not None else 0
+    print(
+        f'{label:<20}{describe_member_cache(state.member_cache_flags):<16}'
+        f'{cached:>12,}{messages:>10,}{growth / guilds * 1000 / 2**20:>16.1f}'
+    )
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run_policy(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    members = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print(f'{guilds} guilds x {members} members, {MESSAGES_PER_GUILD} messages per guild')
+    print(f'{"policy":<20}{"member cache":<16}{"members":>12}{"messages":>10}{"MiB/1k guilds":>16}')
+    for label, _, _ in POLICIES:
+        # A fresh interpreter per policy keeps the measurements independent
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', label, str(guilds), str(members)],
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Cached authorization for privileged commands.
+
+The application's owners are fetched once in setup_hook and refreshed in the
+background after APP_INFO_TTL, so checking whether a user may run an owner
+command is a set lookup rather than a REST call. Owners are the application
+owner, or the admin and developer members of the owning team, plus the
+user IDs allowed through BOT_ADMIN_IDS.
+
+Commands opt in with the `owner_only()` check decorator; refused
+invocations raise `NotBotOwner`, which the global error handler answers.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Iterable, List, Optional, Set
+
+import aiohttp
+import discord
+from discord import app_commands
+
+# Seconds before the cached application owners are refreshed
+APP_INFO_TTL = 3600.0
+
+# Seconds before a failed refresh is retried
+RETRY_INTERVAL = 60.0
+
+# Team roles that count as owners, as in discord.py's Bot.is_owner
+OWNER_ROLES = (discord.TeamMemberRole.admin, discord.TeamMemberRole.developer)
+
+
+class NotBotOwner(app_commands.CheckFailure):
+    """Raised when someone other than an owner or allowed admin invokes a privileged command."""
+
+    def __init__(self):
+        super().__init__('This command is only available to the bot owner.')
+
+
+def parse_user_ids(value: Optional[str]) -> List[int]:
+    """
+    Parse a comma-separated list of user IDs (e.g. the BOT_ADMIN_IDS variable).
+
+    Args:
+        value: Raw value, may be empty or None
+
+    Raises:
+        ValueError: If an entry is not a number
+    """
+    if not value:
+        return []
+    return [int(part) for part in value.replace(' ', '').split(',') if part]
+
+
+class Authorization:
+    """Owner and allow-list lookups backed by cached application info."""
+
+    def __init__(
+        self,
+        client: discord.Client,
+        logger: Optional[logging.Logger] = None,
+        admin_ids: Iterable[int] = (),
+        ttl: float = APP_INFO_TTL,
+    ):
+        """
+        Initialize the authorization cache.
+
+        Args:
+            client: Client whose application info is fetched
+            logger: Logger for refreshes and refusals
+            admin_ids: Users allowed in addition to the application owners
+            ttl: Seconds before the owners are refreshed
+        """
+        self.client = client
+        self.logger = logger or logging.getLogger('bot.auth')
+        self.admin_ids: Set[int] = set(admin_ids)
+        self.ttl = ttl
+        self.owner_ids: Set[int] = set()
+        self.refreshed_at: Optional[float] = None
+        self._expires_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the application owners.
+
+        Returns:
+            False if the request failed (retried after RETRY_INTERVAL); the
+            previous owners are kept
+        """
+        try:
+            app = await self.client.application_info()
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._expires_at = time.monotonic() + RETRY_INTERVAL
+            self.logger.warning('Could not fetch application info, keeping cached owners: %r', e)
+            return False
+
+        if app.team:
+            self.owner_ids = {member.id for member in app.team.members if member.role in OWNER_ROLES}
+        else:
+            self.owner_ids = {app.owner.id}
+        self.refreshed_at = time.time()
+        self._expires_at = time.monotonic() + self.ttl
+        self.logger.debug('Cached %d application owner(s)', len(self.owner_ids))
+        return True
+
+    def is_owner(self, user: discord.abc.Snowflake) -> bool:
+        """
+        Check whether a user is an owner or an allowed admin, without a request.
+
+        Stale owners are refreshed in the background; the check answers from
+        the cache meanwhile.
+        """
+        if time.monotonic() >= self._expires_at and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+        return user.id in self.owner_ids or user.id in self.admin_ids
+
+
+def owner_only():
+    """
+    Restrict an application command to the bot's owners and BOT_ADMIN_IDS.
+
+    The client needs an `auth` attribute holding an `Authorization`.
+
+    Raises:
+        NotBotOwner: From the check, when the user is not allowed
+    """
+
+    def predicate(interaction: discord.Interaction) -> bool:
+        if not interaction.client.auth.is_owner(interaction.user):
+            raise NotBotOwner()
+        return True
+
+    return app_commands.check(predicate)
@@ -1,21 +1,44 @@
 import os
 import sys
 import asyncio
+from typing import Optional
+
+# Imported before discord.py so the startup timeline includes the imports below
+from startup import StartupTimeline
+
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
 # Import our logging system
-from bot_logging import setup_logging, log_startup_info
+from auth import Authorization, NotBotOwner, parse_user_ids
+from bot_logging import setup_logging, shutdown_logging, log_startup_info
+from bot_logging.utils import interaction_context, log_slash_command_usage
+from caching import MemberLookup, ResponseCache, cache_options, describe_member_cache
+from command_sync import CommandSyncer, parse_guild_ids
+from eventloop import backend_info, select_event_loop
+from hot_reload import ExtensionReloader, parse_extensions, parse_interval
+from memdiag import DEFAULT_FRAMES, MemoryDiagnostics
+from metrics import Metrics
+from owner_commands import OWNER_COMMANDS
+from ratelimit import RateLimits, parse_rate_limits
+from stats import BotStats
+from watchdog import DEFAULT_THRESHOLD, LoopWatchdog
+from welcome import JoinAggregator, welcome_options
+from sharding import format_latency, format_shard_health, interaction_shard_id, parse_shard_config, shard_health
 
 def main():
     """Main function to run the Discord bot."""
+    timeline = StartupTimeline()
+    timeline.mark('Imports')
+    
     # Load environment variables
     load_dotenv()
     
     # Set up logging
     log_env = os.getenv('LOG_ENVIRONMENT', 'production')
     logger = setup_logging(log_env)
+    timeline.mark('Logging Setup')
     
     # Get Discord token
     token = os.getenv('DISCORD_TOKEN')
@@ -23,42 +46,43 @@ def main():
         logger.critical("DISCORD_TOKEN not found in environment variables!")
         sys.exit(1)
     
+    # Resolve sharding options
+    try:
+        sharded, shard_count, shard_ids = parse_shard_config(os.getenv('SHARD_COUNT'), os.getenv('SHARD_IDS'))
+    except ValueError as e:
+        logger.critical('Invalid sharding configuration: %s', e)
+        sys.exit(1)
+    
+    # Pick the event loop before the bot creates it
+    try:
+        event_loop, loop_warning = select_event_loop(os.getenv('EVENT_LOOP', 'auto'))
+    except ValueError as e:
+        logger.critical('Invalid configuration: %s', e)
+        sys.exit(1)
+    if loop_warning:
+        logger.warning(loop_warning)
+    
     # Log startup information
     startup_info = {
         'Python Version': sys.version.split()[0],
         'discord.py Version': discord.__version__,
         'Log Environment': log_env,
+        'Sharding': (
+            f"{shard_count or 'auto'} shard(s)" + (f", running {shard_ids}" if shard_ids else "")
+            if sharded else 'disabled'
+        ),
+        **backend_info(event_loop),
         'Bot Starting': 'Initializing...'
     }
     log_startup_info(logger, startup_info)
     
-    # Set up intents
-    intents = discord.Intents.default()
-    intents.message_content = True
-    
-    # Create bot instance
-    bot = DiscordBot(intents=intents, logger=logger)
-    
-    # Register slash commands
-    bot.tree.add_command(ping_slash)
-    bot.tree.add_command(status_slash)
-    bot.tree.add_command(info_slash)
+    try:
+        bot = create_bot(logger, sharded=sharded, shard_count=shard_count, shard_ids=shard_ids, timeline=timeline)
+    except ValueError as e:
+        logger.critical('Invalid configuration: %s', e)
+        sys.exit(1)
+    timeline.mark('Bot Created')
     
-    # Load example commands cog if it exists
-    async def setup_hook(self):
-        """This is called when the bot starts up."""
-        self.logger.info('Bot setup hook called - registering slash commands')
-
-        # Load cogs if the function exists
-        if hasattr(self, '_load_cogs'):
-            # Load example commands cog if it exists
-            try:
-                await self.load_extension('example_commands')
-                self.logger.info('Loaded example_commands cog')
-            except ImportError:
-                self.logger.debug('example_commands module not found, skipping')
-            except Exception as e:
-                self.logger.warning(f'Failed to load example_commands cog: {e}')    
     try:
         # Run the bot (suppress discord.py's default logging since we have our own)
         logger.info('Starting Discord bot connection...')
@@ -69,72 +93,315 @@ def main():
     except KeyboardInterrupt:
         logger.info('Bot shutdown requested by user')
     except Exception as e:
-        logger.critical(f'Failed to start bot: {e}', exc_info=True)
+        logger.critical('Failed to start bot: %s', e, exc_info=True)
         sys.exit(1)
+    finally:
+        # Flush any records still queued for the background log writer
+        shutdown_logging()
+
+
+def create_bot(logger, sharded=False, shard_count=None, shard_ids=None, command_sync=None, timeline=None):
+    """
+    Create the bot and register its slash commands.
+    
+    Args:
+        logger: Bot logger
+        sharded: Use the auto-sharded bot
+        shard_count: Total number of shards, None for Discord's recommendation
+        shard_ids: Shards run by this process, None for all of them
+        command_sync: Command sync mode, defaults to the COMMAND_SYNC variable
+        timeline: Startup timeline to continue, a new one by default
+        
+    Returns:
+        Configured bot instance
+        
+    Raises:
+        ValueError: If the cache policy, metrics, hot reload, admin ID, rate limit or welcome variables are malformed
+    """
+    # Set up intents
+    intents = discord.Intents.default()
+    intents.message_content = True
+    
+    # Create bot instance
+    bot_options = {
+        'intents': intents,
+        'logger': logger,
+        'timeline': timeline,
+        # Users allowed to run owner commands besides the application owners
+        'admin_ids': parse_user_ids(os.getenv('BOT_ADMIN_IDS')),
+        # Per-command rate limits, e.g. serverinfo=3/10,*=20/10:user
+        'rate_limits': parse_rate_limits(os.getenv('RATE_LIMITS')),
+        # Welcome message batching during join bursts
+        'welcome': welcome_options(
+            os.getenv('WELCOME_WINDOW'), os.getenv('WELCOME_MAX_MENTIONS'), os.getenv('WELCOME_SAMPLE_THRESHOLD'),
+        ),
+        'command_sync': command_sync or os.getenv('COMMAND_SYNC', 'auto'),
+        'dev_guild_ids': parse_guild_ids(os.getenv('DEV_GUILD_IDS')),
+        # Prometheus endpoint, disabled unless a port is set
+        'metrics_port': int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None,
+        'metrics_host': os.getenv('METRICS_HOST', '0.0.0.0'),
+        # Milliseconds the event loop may be blocked before the culprit's stack is logged
+        'loop_stall_threshold': (
+            int(os.getenv('LOOP_STALL_THRESHOLD_MS')) / 1000 if os.getenv('LOOP_STALL_THRESHOLD_MS') else DEFAULT_THRESHOLD
+        ),
+        # Periodic tracemalloc snapshots (minutes between them; disabled when unset)
+        'memory_snapshot_interval': (
+            float(os.getenv('MEMORY_SNAPSHOT_INTERVAL')) * 60 if os.getenv('MEMORY_SNAPSHOT_INTERVAL') else None
+        ),
+        'tracemalloc_frames': int(os.getenv('TRACEMALLOC_FRAMES') or DEFAULT_FRAMES),
+        # Extensions loaded at startup and reloaded from disk when edited
+        'extensions': parse_extensions(os.getenv('BOT_EXTENSIONS', 'example_commands')),
+        'hot_reload_interval': parse_interval(os.getenv('HOT_RELOAD_INTERVAL')),
+        # Member cache, startup chunking and message cache size
+        **cache_options(
+            intents,
+            member_cache=os.getenv('MEMBER_CACHE'),
+            chunk_guilds=os.getenv('CHUNK_GUILDS_AT_STARTUP'),
+            max_messages=os.getenv('MAX_MESSAGES'),
+        ),
+    }
+    if sharded:
+        bot = ShardedDiscordBot(shard_count=shard_count, shard_ids=shard_ids, **bot_options)
+    else:
+        bot = DiscordBot(**bot_options)
+    
+    # Register slash commands
+    bot.tree.add_command(ping_slash)
+    bot.tree.add_command(status_slash)
+    bot.tree.add_command(info_slash)
+    for command in OWNER_COMMANDS:
+        bot.tree.add_command(command)
+    
+    return bot
+
+
+class BotCommandTree(discord.app_commands.CommandTree):
+    """Command tree that enforces RATE_LIMITS and reports errors through the app_command_error event."""
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Reject rate-limited commands before their checks and argument conversion run."""
+        # Autocomplete requests pass through here too and cannot be answered with an error
+        if interaction.type is discord.InteractionType.application_command:
+            self.client.rate_limits.check(interaction)
+        return True
+    
+    async def on_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        """Dispatch the error to every on_app_command_error listener."""
+        self.client.dispatch('app_command_error', interaction, error)
 
 
 class DiscordBot(commands.Bot):
     """Custom Discord bot class with integrated logging."""
     
-    def __init__(self, *args, logger=None, **kwargs):
+    def __init__(
+        self, *args, logger=None, command_sync='auto', dev_guild_ids=(), metrics_port=None, metrics_host='0.0.0.0',
+        loop_stall_threshold=DEFAULT_THRESHOLD, memory_snapshot_interval=None, tracemalloc_frames=DEFAULT_FRAMES,
+        extensions=(), hot_reload_interval=None, timeline=None, admin_ids=(), rate_limits=None, welcome=None, **kwargs,
+    ):
         # Set a minimal command prefix since we're using slash commands
         if 'command_prefix' not in kwargs:
             kwargs['command_prefix'] = commands.when_mentioned
+        kwargs.setdefault('tree_cls', BotCommandTree)
         super().__init__(*args, **kwargs)
         self.logger = logger or setup_logging()
+        self.command_syncer = CommandSyncer(self.tree, self.logger, mode=command_sync, dev_guild_ids=dev_guild_ids)
+        # Application owners and allowed admins, cached for owner-only command checks
+        self.auth = Authorization(self, self.logger.getChild('auth'), admin_ids)
+        # Configured command rate limits, checked by the command tree
+        self.rate_limits = RateLimits(rate_limits)
+        # Joins welcomed in one message per guild and window
+        self.join_aggregator = JoinAggregator(self.logger.getChild('welcome'), **(welcome or {}))
+        # Connection to the cluster supervisor when running as a cluster worker
+        self.cluster = None
+        # Members fetched on demand by commands that need them
+        self.member_lookup = MemberLookup()
+        # Embeds of informational commands, dropped when events change what they show
+        self.response_cache = ResponseCache()
+        # Guild, member, channel, command and event counters kept up to date from dispatched events
+        self.stats = BotStats(self, self.logger.getChild('stats'))
+        self.metrics = Metrics(self, self.logger.getChild('metrics'))
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        # Event loop lag percentiles and reports of callbacks blocking the loop
+        self.watchdog = LoopWatchdog(self.logger.getChild('watchdog'), threshold=loop_stall_threshold)
+        # tracemalloc snapshots, on demand through /memory or periodically
+        self.memory = MemoryDiagnostics(self, self.logger.getChild('memory'))
+        self.memory_snapshot_interval = memory_snapshot_interval
+        self.tracemalloc_frames = tracemalloc_frames
+        # Extensions from the bot volume, reloaded in place when their files change
+        self.extension_names = list(extensions)
+        self.reloader = ExtensionReloader(self, self.extension_names, self.logger.getChild('reload'))
+        self.hot_reload_interval = hot_reload_interval
+        # Durations of the startup phases, logged once at the first READY
+        self.timeline = timeline or StartupTimeline()
+    
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        """Update the statistics and cached responses before handing the event to listeners."""
+        self.stats.on_dispatch(event_name, args)
+        self.response_cache.on_dispatch(event_name, args)
+        super().dispatch(event_name, *args, **kwargs)
         
     async def setup_hook(self):
         """This is called when the bot starts up."""
+        self.timeline.mark('Login')
         self.logger.info('Bot setup hook called - registering slash commands')
+        self.watchdog.start()
+        await self.auth.refresh()
+        self.logger.info(
+            'Member cache: %s, chunk at startup: %s, message cache: %s',
+            describe_member_cache(self._connection.member_cache_flags),
+            self._connection._chunk_guilds, self._connection.max_messages or 'disabled',
+        )
+        
+        await self._load_cogs()
+        if self.hot_reload_interval:
+            self.reloader.start(self.hot_reload_interval)
         
-        # Load cogs if the function exists
-        if hasattr(self, '_load_cogs'):
-            await self._load_cogs()
+        self.stats.start()
+        if self.memory_snapshot_interval:
+            self.memory.start_periodic(self.memory_snapshot_interval, self.tracemalloc_frames)
+        if self.cluster is not None:
+            self.cluster.start()
         
-        # Sync slash commands
+        if self.metrics_port is not None:
+            # Cluster workers share the host, so each takes the next port
+            port = self.metrics_port + (self.cluster.worker_id if self.cluster is not None else 0)
+            try:
+                await self.metrics.start(self.metrics_host, port)
+            except OSError as e:
+                self.logger.error('Failed to start metrics server on port %d: %s', port, e)
+        
+        self.timeline.mark('Setup Hook')
+        
+        # Sync slash commands, skipping scopes whose commands did not change
         try:
-            synced = await self.tree.sync()
-            self.logger.info(f'Synced {len(synced)} slash command(s)')
+            await self.command_syncer.sync()
         except Exception as e:
-            self.logger.error(f'Failed to sync slash commands: {e}', exc_info=True)
+            self.logger.error('Failed to sync slash commands: %s', e, exc_info=True)
+        self.timeline.mark('Command Sync')
     
     async def on_ready(self):
         """Called when the bot is ready."""
-        self.logger.info(f'Bot logged in as {self.user.name} (ID: {self.user.id})')
-        self.logger.info(f'Connected to {len(self.guilds)} guild(s)')
-        self.logger.info(f'Monitoring {len(self.users)} users')
+        self.logger.info('Bot logged in as %s (ID: %s)', self.user.name, self.user.id)
+        self.logger.info('Connected to %d guild(s)', self.stats.guilds)
+        self.logger.info('Monitoring %d members', self.member_count())
         self.logger.info('Bot is ready and operational!')
+        self.report_startup()
         
-        # Set activity status
-        activity = discord.Activity(
+        await self.update_presence()
+    
+    def report_startup(self):
+        """Log the startup timeline on the first READY (reconnects are not startups)."""
+        if 'Ready' in self.timeline:
+            return
+        self.timeline.mark('Ready')
+        log_startup_info(
+            self.logger,
+            {**self.timeline.summary(), 'Time to Ready': f'{self.timeline.elapsed():.2f}s'},
+            title='⏱️ Startup Timeline',
+        )
+    
+    async def _load_cogs(self):
+        """Load the configured extensions; one failing does not stop the others."""
+        for name in self.extension_names:
+            try:
+                await self.load_extension(name)
+                self.logger.info('Loaded extension %s', name)
+            except commands.ExtensionNotFound:
+                self.logger.debug('Extension %s not found, skipping', name)
+            except commands.NoEntryPointError:
+                # e.g. example_commands while its code is still commented out
+                self.logger.info('Extension %s has no setup function, skipping', name)
+            except commands.ExtensionError as e:
+                self.logger.warning('Failed to load extension %s: %s', name, e, exc_info=e.__cause__ or e)
+    
+    async def close(self):
+        """Stop background tasks and close the connection."""
+        self.reloader.stop()
+        await self.join_aggregator.close()
+        self.stats.stop()
+        self.watchdog.stop()
+        self.memory.stop_periodic()
+        await self.metrics.stop()
+        await super().close()
+    
+    def member_count(self) -> int:
+        """Get the number of members across this process's guilds, without relying on the member cache."""
+        return self.stats.members
+    
+    def total_member_count(self) -> int:
+        """Get the number of members across the whole cluster, or of this process when not clustered."""
+        if self.cluster is not None and self.cluster.stats is not None:
+            return self.cluster.stats['members']
+        return self.member_count()
+    
+    def total_guild_count(self) -> int:
+        """Get the number of guilds across the whole cluster, or of this process when not clustered."""
+        if self.cluster is not None and self.cluster.stats is not None:
+            return self.cluster.stats['guilds']
+        return self.stats.guilds
+    
+    def presence_activity(self) -> discord.Activity:
+        """Build the activity shown in the bot's status."""
+        return discord.Activity(
             type=discord.ActivityType.watching,
-            name=f"{len(self.guilds)} servers"
+            name=f"{self.total_guild_count()} servers"
         )
-        await self.change_presence(activity=activity)
+    
+    async def update_presence(self):
+        """Set the activity status."""
+        await self.change_presence(activity=self.presence_activity())
         self.logger.debug('Bot presence updated')
     
     async def on_guild_join(self, guild):
         """Log when the bot joins a new guild."""
-        self.logger.info(f'Bot joined new guild: {guild.name} (ID: {guild.id}) with {guild.member_count} members')
+        self.logger.info(
+            'Bot joined new guild: %s (ID: %s) with %s members', guild.name, guild.id, guild.member_count,
+            extra={'guild_id': guild.id},
+        )
     
     async def on_guild_remove(self, guild):
         """Log when the bot leaves a guild."""
-        self.logger.info(f'Bot removed from guild: {guild.name} (ID: {guild.id})')
+        self.logger.info('Bot removed from guild: %s (ID: %s)', guild.name, guild.id, extra={'guild_id': guild.id})
+    
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        """Forget a member fetched on demand once they leave (fires without the member cache)."""
+        self.member_lookup.invalidate(payload.guild_id, payload.user.id)
     
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Forget a member fetched on demand once their roles or nickname change."""
+        self.member_lookup.invalidate(after.guild.id, after.id)
+
+    async def on_command_error(self, context: commands.Context, exception: commands.CommandError, /):
+        """Count a failed prefix command, then report it as discord.py does by default."""
+        self.metrics.observe_command_error(context, exception)
+        await super().on_command_error(context, exception)
+
     async def on_app_command_error(self, interaction: discord.Interaction, error: Exception):
         """Handle application command errors."""
         command_name = interaction.command.name if interaction.command else "unknown"
+        context = interaction_context(interaction)
         
         if isinstance(error, discord.app_commands.CommandOnCooldown):
-            self.logger.debug(f'Command "{command_name}" on cooldown for {interaction.user}')
+            self.logger.debug('Command "%s" on cooldown for %s', command_name, interaction.user, extra=context)
             await interaction.response.send_message(
                 f'⏰ This command is on cooldown. Try again in {error.retry_after:.1f} seconds.',
                 ephemeral=True
             )
             return
         
+        if isinstance(error, NotBotOwner):
+            self.logger.warning(
+                'Non-owner %s tried to use /%s', interaction.user, interaction.command.qualified_name, extra=context,
+            )
+            await interaction.response.send_message(f'❌ {error}', ephemeral=True)
+            return
+        
         if isinstance(error, discord.app_commands.MissingPermissions):
-            self.logger.warning(f'User {interaction.user} missing permissions for command "{command_name}": {error.missing_permissions}')
+            self.logger.warning(
+                'User %s missing permissions for command "%s": %s',
+                interaction.user, command_name, error.missing_permissions, extra=context,
+            )
             await interaction.response.send_message(
                 f'❌ You need the following permissions: {", ".join(error.missing_permissions)}',
                 ephemeral=True
@@ -142,7 +409,9 @@ class DiscordBot(commands.Bot):
             return
         
         if isinstance(error, discord.app_commands.BotMissingPermissions):
-            self.logger.warning(f'Bot missing permissions for command "{command_name}": {error.missing_permissions}')
+            self.logger.warning(
+                'Bot missing permissions for command "%s": %s', command_name, error.missing_permissions, extra=context
+            )
             await interaction.response.send_message(
                 f'❌ I need the following permissions: {", ".join(error.missing_permissions)}',
                 ephemeral=True
@@ -150,7 +419,10 @@ class DiscordBot(commands.Bot):
             return
         
         # Log unexpected errors
-        self.logger.error(f'Unexpected error in slash command "{command_name}" by {interaction.user}: {error}', exc_info=True)
+        self.logger.error(
+            'Unexpected error in slash command "%s" by %s: %s', command_name, interaction.user, error,
+            exc_info=error, extra=context,
+        )
         
         if interaction.response.is_done():
             await interaction.followup.send('❌ An unexpected error occurred. The issue has been logged.', ephemeral=True)
@@ -158,6 +430,58 @@ class DiscordBot(commands.Bot):
             await interaction.response.send_message('❌ An unexpected error occurred. The issue has been logged.', ephemeral=True)
 
 
+class ShardedDiscordBot(DiscordBot, commands.AutoShardedBot):
+    """Discord bot running several gateway connections (shards) in one process."""
+    
+    async def on_ready(self):
+        """Called once every shard of this process is ready."""
+        self.logger.info('Bot logged in as %s (ID: %s)', self.user.name, self.user.id)
+        self.logger.info(
+            'Connected to %d guild(s) across %d shard(s) (shard count: %d)',
+            self.stats.guilds, len(self.shards), self.shard_count,
+        )
+        self.logger.info('Monitoring %d members', self.member_count())
+        self.logger.info('Bot is ready and operational!')
+        self.report_startup()
+        
+        await self.update_presence()
+    
+    async def on_shard_ready(self, shard_id: int):
+        """Called when a shard has identified and received its guilds."""
+        self.logger.info('Shard %d ready with %d guild(s)', shard_id, self.stats.shard_guilds[shard_id])
+        
+        # During startup on_ready sets every shard's presence at once; later
+        # READYs come from a shard re-identifying and need their own update
+        if self.is_ready():
+            await self.update_presence(shard_id)
+    
+    async def on_shard_connect(self, shard_id: int):
+        """Called when a shard opens its gateway connection."""
+        self.logger.debug('Shard %d connected', shard_id)
+    
+    async def on_shard_disconnect(self, shard_id: int):
+        """Called when a shard loses its gateway connection."""
+        self.logger.warning('Shard %d disconnected', shard_id)
+    
+    async def on_shard_resumed(self, shard_id: int):
+        """Called when a shard resumes its session after a reconnect."""
+        self.logger.info('Shard %d resumed', shard_id)
+    
+    def presence_activity(self, shard_id: Optional[int] = None) -> discord.Activity:
+        """Build the activity shown in the bot's status, naming the shard."""
+        name = f"{self.total_guild_count()} servers"
+        if shard_id is not None:
+            name += f" | shard {shard_id + 1}/{self.shard_count}"
+        return discord.Activity(type=discord.ActivityType.watching, name=name)
+    
+    async def update_presence(self, shard_id: Optional[int] = None):
+        """Set the activity status of one shard, or of every shard of this process."""
+        shard_ids = [shard_id] if shard_id is not None else list(self.shards)
+        for current in shard_ids:
+            await self.change_presence(activity=self.presence_activity(current), shard_id=current)
+        self.logger.debug('Bot presence updated for shard(s) %s', shard_ids)
+
+
 # Create bot instance for registering commands
 bot = None
 
@@ -168,48 +492,98 @@ def get_bot():
 
 # Slash Commands
 @discord.app_commands.command(name="ping", description="Check bot latency and responsiveness")
+@log_slash_command_usage
 async def ping_slash(interaction: discord.Interaction):
     """Check bot latency and responsiveness."""
     logger = interaction.client.logger.getChild('commands')
-    logger.info(f'Ping slash command invoked by {interaction.user} in {interaction.guild.name if interaction.guild else "DM"}')
-    
-    latency = round(interaction.client.latency * 1000)
+    bot = interaction.client
+    shard_id = interaction_shard_id(interaction)
+    if isinstance(bot, discord.AutoShardedClient) and shard_id in bot.shards:
+        latency = format_latency(bot.shards[shard_id].latency)
+    else:
+        latency = format_latency(bot.latency)
     
     embed = discord.Embed(
         title="🏓 Pong!",
-        description=f"Latency: {latency}ms",
+        description=f"Latency: {latency}",
         color=0x00ff00
     )
+    if bot.shard_count and bot.shard_count > 1:
+        embed.description += f" (shard {shard_id})"
+        embed.add_field(name="🧩 Shards", value=format_shard_health(shard_health(bot, bot.stats.shard_guilds)), inline=False)
     
     await interaction.response.send_message(embed=embed)
-    logger.debug(f'Ping response sent with {latency}ms latency')
+    logger.debug('Ping response sent with %s latency', latency, extra=interaction_context(interaction))
+
+
+def format_loop_health(watchdog: LoopWatchdog) -> str:
+    """Render event loop lag percentiles and the last stall as embed field text."""
+    lag = watchdog.percentiles()
+    if lag is None:
+        return "No samples yet"
+    text = (
+        f"Lag p50 {lag['p50'] * 1000:.1f}ms · p95 {lag['p95'] * 1000:.1f}ms · "
+        f"p99 {lag['p99'] * 1000:.1f}ms · max {lag['max'] * 1000:.0f}ms\n"
+        f"Stalls over {watchdog.threshold * 1000:.0f}ms: {watchdog.stalls}"
+    )
+    if watchdog.last_stall is not None:
+        stall = watchdog.last_stall
+        text += f"\nLast: {stall['duration'] * 1000:.0f}ms <t:{int(stall['at'])}:R> in `{stall['where'][:200]}`"
+    return text
 
 
 @discord.app_commands.command(name="status", description="Show bot status and statistics")
+@log_slash_command_usage
 async def status_slash(interaction: discord.Interaction):
     """Show bot status and statistics."""
-    logger = interaction.client.logger.getChild('commands')
-    logger.info(f'Status slash command invoked by {interaction.user}')
-    
     bot = interaction.client
     
     embed = discord.Embed(
         title="🤖 Bot Status",
         color=0x0099ff
     )
-    embed.add_field(name="🏓 Latency", value=f"{round(bot.latency * 1000)}ms", inline=True)
-    embed.add_field(name="🏠 Guilds", value=len(bot.guilds), inline=True)
-    embed.add_field(name="👥 Users", value=len(bot.users), inline=True)
+    embed.add_field(name="🏓 Latency", value=format_latency(bot.latency), inline=True)
+    cluster_stats = bot.cluster.stats if bot.cluster is not None else None
+    embed.add_field(name="🏠 Guilds", value=bot.total_guild_count(), inline=True)
+    embed.add_field(name="👥 Members", value=bot.total_member_count(), inline=True)
+    embed.add_field(name="💬 Channels", value=bot.stats.channels, inline=True)
     embed.add_field(name="📝 Slash Commands", value=len(bot.tree.get_commands()), inline=True)
+    embed.add_field(name="⚡ Commands Served", value=bot.stats.commands_total, inline=True)
+    embed.add_field(name="📡 Events Processed", value=bot.stats.events_total, inline=True)
+    embed.add_field(name="🐢 Event Loop", value=format_loop_health(bot.watchdog), inline=False)
+    
+    if cluster_stats:
+        embed.add_field(
+            name="🖥️ Cluster",
+            value=f"{cluster_stats['workers_ready']}/{cluster_stats['workers']} workers ready · this is worker {bot.cluster.worker_id}",
+            inline=False
+        )
+        embed.add_field(
+            name=f"🧩 Shards ({cluster_stats['shard_count']} total)",
+            value=format_shard_health(cluster_stats['shards']),
+            inline=False
+        )
+    else:
+        health = shard_health(bot, bot.stats.shard_guilds)
+        if len(health) > 1 or bot.shard_count:
+            embed.add_field(
+                name=f"🧩 Shards ({len(health)}/{bot.shard_count or 1} in this process)",
+                value=format_shard_health(health),
+                inline=False
+            )
     
     await interaction.response.send_message(embed=embed)
 
 
 @discord.app_commands.command(name="info", description="Display bot information and help")
+@log_slash_command_usage
 async def info_slash(interaction: discord.Interaction):
     """Display bot information and help."""
-    logger = interaction.client.logger.getChild('commands')
-    logger.info(f'Info slash command invoked by {interaction.user}')
+    cache = interaction.client.response_cache
+    embed = cache.get('info')
+    if embed is not None:
+        await interaction.response.send_message(embed=embed)
+        return
     
     embed = discord.Embed(
         title="ℹ️ Bot Information",
@@ -229,6 +603,7 @@ async def info_slash(interaction: discord.Interaction):
         inline=False
     )
     
+    cache.set('info', None, None, embed)
     await interaction.response.send_message(embed=embed)
 
 
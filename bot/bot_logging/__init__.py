@@ -6,55 +6,80 @@ logging recommendations and best practices.
 """
 
 import os
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
-from typing import Optional
+from collections import Counter
+from typing import Dict, List, Optional
 from .config import LOGGING_CONFIG, get_environment_config
 from .colored import create_colored_formatter
+from .queueing import NonBlockingQueueHandler, RoutingQueueListener, POLICY_BLOCK, lowest_level
+from .tail import RingBufferHandler, tail_logs
+from .structured import JsonFormatter
+from .filters import LogThrottle, create_throttles
+from .rotation import CompressingRotatingFileHandler, resolve_compression, rotation_worker
 
 # Global flag to track if logging has been initialized
 _logging_initialized = False
 
+# Background listener and queue handlers when the non-blocking pipeline is enabled
+_queue_listener: Optional[RoutingQueueListener] = None
+_queue_handlers: List[NonBlockingQueueHandler] = []
 
-def setup_logging(environment: str = "production") -> logging.Logger:
+# Listener delivering records sent by cluster worker processes (supervisor only)
+_cluster_listener: Optional[RoutingQueueListener] = None
+
+# In-memory buffer of recent records
+_log_buffer: Optional[RingBufferHandler] = None
+
+# Requested logger levels (before alignment) and named handlers, for runtime changes
+_configured_levels: Dict[str, int] = {}
+_handlers: Dict[str, logging.Handler] = {}
+_routes: Dict[str, List[logging.Handler]] = {}
+
+# Throttle filters attached to high-volume loggers
+_throttles: Dict[str, LogThrottle] = {}
+
+
+def setup_logging(environment: str = "production", cluster_queue=None) -> logging.Logger:
     """
     Set up comprehensive logging for the Discord bot.
     
     Args:
-        environment: Logging environment ('development', 'production', 'minimal')
+        environment: Logging environment ('development', 'production', 'minimal', 'json')
+        cluster_queue: multiprocessing queue of the cluster supervisor; when given,
+            records are sent there instead of being written by this process
         
     Returns:
         Configured bot logger instance
     """
-    global _logging_initialized
+    global _logging_initialized, _queue_listener, _log_buffer
     
     # Return existing logger if already initialized
     if _logging_initialized:
         return logging.getLogger('bot')
-        
-    # Create logs directory if it doesn't exist
-    os.makedirs('/app/data/logs', exist_ok=True)
     
     # Get environment-specific configuration
     env_config = get_environment_config(environment)
     
-    # Configure loggers based on configuration
-    for logger_name, level in LOGGING_CONFIG["loggers"].items():
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(level)
-        logger.handlers.clear()  # Clear existing handlers
-        logger.propagate = False  # Prevent duplicate emission via root
+    if cluster_queue is not None:
+        return _setup_cluster_worker_logging(environment, env_config, cluster_queue)
+        
+    # Create log directories if they don't exist
+    for file_config in LOGGING_CONFIG["files"].values():
+        os.makedirs(os.path.dirname(file_config["filename"]), exist_ok=True)
     
-    # Apply environment-specific overrides
-    logging.getLogger('discord.http').setLevel(env_config.get('discord_http_level', logging.INFO))
+    _configure_loggers(env_config)
     
     # Create formatters
-    file_formatter = logging.Formatter(
+    text_formatter = logging.Formatter(
         LOGGING_CONFIG["file_format"]["format"],
         LOGGING_CONFIG["file_format"]["date_format"],
         style='{'
     )
+    file_formatter = JsonFormatter() if env_config.get('file_format') == 'json' else text_formatter
     
     # Create colored console formatter
     console_formatter = create_colored_formatter(
@@ -64,44 +89,103 @@ def setup_logging(environment: str = "production") -> logging.Logger:
         force_colors=env_config.get('colored_logs', True)
     )
     
+    # Group handlers by the logger they serve ("route")
+    routes: Dict[str, List[logging.Handler]] = {}
+    
     # Set up file handlers
+    rotation_config = LOGGING_CONFIG.get("rotation", {})
+    rotation_worker.max_total_bytes = rotation_config.get("max_total_bytes")
     for logger_name, file_config in LOGGING_CONFIG["files"].items():
-        logger = logging.getLogger(logger_name)
-        
-        file_handler = logging.handlers.RotatingFileHandler(
-            filename=file_config["filename"],
-            encoding='utf-8',
-            maxBytes=file_config["max_bytes"],
-            backupCount=file_config["backup_count"],
-        )
+        if rotation_config.get("enabled", False):
+            file_handler = CompressingRotatingFileHandler(
+                filename=file_config["filename"],
+                encoding='utf-8',
+                maxBytes=file_config["max_bytes"],
+                backupCount=file_config["backup_count"],
+                compression=rotation_config.get("compression", "gzip"),
+                interval=rotation_config.get("interval"),
+                max_age_days=rotation_config.get("max_age_days"),
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                filename=file_config["filename"],
+                encoding='utf-8',
+                maxBytes=file_config["max_bytes"],
+                backupCount=file_config["backup_count"],
+            )
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(env_config.get('file_level', logging.INFO))
-        logger.addHandler(file_handler)
+        file_handler.set_name(f'file:{logger_name}')
+        routes.setdefault(logger_name, []).append(file_handler)
     
     # Set up console handler if enabled
     if LOGGING_CONFIG["console"]["enabled"]:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(env_config.get('console_level', LOGGING_CONFIG["console"]["level"]))
+        console_handler.set_name('console')
         
         # Add console handler to main loggers
         for logger_name in ["discord", "bot"]:
+            routes.setdefault(logger_name, []).append(console_handler)
+    
+    # Keep recent records in memory for cheap tailing
+    buffer_config = LOGGING_CONFIG.get("buffer", {})
+    if buffer_config.get("enabled", False):
+        _log_buffer = RingBufferHandler(buffer_config.get("capacity", 500))
+        _log_buffer.setFormatter(text_formatter)  # Buffer is for humans
+        _log_buffer.setLevel(env_config.get('file_level', logging.INFO))
+        _log_buffer.set_name('buffer')
+        for logger_name in LOGGING_CONFIG["files"]:
+            routes.setdefault(logger_name, []).append(_log_buffer)
+    
+    # Attach handlers, either through the background queue or directly
+    queue_config = LOGGING_CONFIG.get("queue", {})
+    if queue_config.get("enabled", False):
+        log_queue = queue.Queue(maxsize=queue_config.get("max_size", 10000))
+        for logger_name, handlers in routes.items():
+            queue_handler = NonBlockingQueueHandler(
+                log_queue,
+                route=logger_name,
+                policy=queue_config.get("policy", POLICY_BLOCK),
+            )
+            queue_handler.setLevel(lowest_level(handlers))
+            logging.getLogger(logger_name).addHandler(queue_handler)
+            _queue_handlers.append(queue_handler)
+        
+        _queue_listener = RoutingQueueListener(log_queue, routes)
+        _queue_listener.start()
+    else:
+        for logger_name, handlers in routes.items():
             logger = logging.getLogger(logger_name)
-            logger.propagate = False
-            # Avoid attaching duplicate stdout handlers
-            if not any(
-                isinstance(h, logging.StreamHandler) and getattr(h, "stream", None) is sys.stdout
-                for h in logger.handlers
-            ):
-                logger.addHandler(console_handler)
+            for handler in handlers:
+                logger.addHandler(handler)
+    
+    _routes.clear()
+    _routes.update(routes)
+    _handlers.clear()
+    _handlers.update({h.get_name(): h for group in routes.values() for h in group})
+    
+    # Never create records that no handler would accept
+    _align_logger_levels()
+    
+    _attach_throttles()
     
     # Log the logging setup
     bot_logger = logging.getLogger('bot')
     bot_logger.info('🎨 Colored logging system initialized')
-    bot_logger.info(f'📊 Environment: {environment}')
-    bot_logger.info(f'🖥️  Console level: {logging.getLevelName(env_config.get("console_level", logging.INFO))}')
-    bot_logger.info(f'📁 File level: {logging.getLevelName(env_config.get("file_level", logging.INFO))}')
-    bot_logger.info(f'🌈 Colored logs: {"enabled" if env_config.get("colored_logs", True) else "disabled"}')
+    bot_logger.info('📊 Environment: %s', environment)
+    bot_logger.info('🖥️  Console level: %s', logging.getLevelName(env_config.get("console_level", logging.INFO)))
+    bot_logger.info('📁 File level: %s', logging.getLevelName(env_config.get("file_level", logging.INFO)))
+    bot_logger.info('📝 File format: %s', env_config.get("file_format", "text"))
+    bot_logger.info('🌈 Colored logs: %s', "enabled" if env_config.get("colored_logs", True) else "disabled")
+    if rotation_config.get("enabled", False):
+        compression = rotation_config.get("compression", "gzip")
+        bot_logger.info('🗜️  Rotation compression: %s', compression)
+        if compression == 'zstd' and resolve_compression(compression) != 'zstd':
+            bot_logger.warning('zstd compression requested but zstandard is not installed, using gzip')
+    if _queue_listener is not None:
+        bot_logger.info('🧵 Non-blocking queue: enabled (policy: %s)', queue_config.get("policy", POLICY_BLOCK))
     
     # Mark logging as initialized
     _logging_initialized = True
@@ -109,6 +193,259 @@ def setup_logging(environment: str = "production") -> logging.Logger:
     return bot_logger
 
 
+def _configure_loggers(env_config: dict):
+    """Reset the configured loggers and record their requested levels."""
+    _configured_levels.clear()
+    for logger_name, level in LOGGING_CONFIG["loggers"].items():
+        logger = logging.getLogger(logger_name)
+        logger.handlers.clear()  # Clear existing handlers
+        # Top-level loggers own the handlers; children propagate to them
+        logger.propagate = '.' in logger_name
+        _configured_levels[logger_name] = level
+    
+    # Apply environment-specific overrides
+    _configured_levels['discord.http'] = env_config.get('discord_http_level', logging.INFO)
+
+
+def _attach_throttles():
+    """Cap the volume of noisy loggers."""
+    for logger_name, throttle in create_throttles(LOGGING_CONFIG.get("throttle", {})).items():
+        logging.getLogger(logger_name).addFilter(throttle)
+        _throttles[logger_name] = throttle
+
+
+def _setup_cluster_worker_logging(environment: str, env_config: dict, cluster_queue) -> logging.Logger:
+    """
+    Send every record to the cluster supervisor instead of writing it here.
+    
+    Each top-level logger gets a queue handler on the supervisor's
+    multiprocessing queue, set to the lowest level the supervisor's handlers
+    for that logger accept. Messages are merged before sending so records pickle.
+    
+    Args:
+        environment: Logging environment name
+        env_config: Environment configuration
+        cluster_queue: multiprocessing queue read by the supervisor
+        
+    Returns:
+        Configured bot logger instance
+    """
+    global _logging_initialized
+    
+    _configure_loggers(env_config)
+    
+    # Mirror the thresholds of the handlers the supervisor delivers each route to
+    file_level = env_config.get('file_level', logging.INFO)
+    route_levels = {logger_name: file_level for logger_name in LOGGING_CONFIG["files"]}
+    if LOGGING_CONFIG["console"]["enabled"]:
+        console_level = env_config.get('console_level', LOGGING_CONFIG["console"]["level"])
+        for logger_name in ["discord", "bot"]:
+            route_levels[logger_name] = min(route_levels.get(logger_name, console_level), console_level)
+    
+    policy = LOGGING_CONFIG.get("queue", {}).get("policy", POLICY_BLOCK)
+    for logger_name, level in route_levels.items():
+        queue_handler = NonBlockingQueueHandler(cluster_queue, route=logger_name, policy=policy, merge_message=True)
+        queue_handler.setLevel(level)
+        queue_handler.set_name(f'cluster:{logger_name}')
+        logging.getLogger(logger_name).addHandler(queue_handler)
+        _queue_handlers.append(queue_handler)
+        _handlers[queue_handler.get_name()] = queue_handler
+    
+    _align_logger_levels()
+    _attach_throttles()
+    
+    bot_logger = logging.getLogger('bot')
+    bot_logger.debug('Cluster worker logging initialized (environment: %s)', environment)
+    
+    _logging_initialized = True
+    
+    return bot_logger
+
+
+def attach_cluster_queue(cluster_queue):
+    """
+    Deliver records sent by cluster worker processes to this process's handlers.
+    
+    Must be called after setup_logging() in the supervisor process.
+    
+    Args:
+        cluster_queue: multiprocessing queue passed to the workers' setup_logging()
+    """
+    global _cluster_listener
+    
+    _cluster_listener = RoutingQueueListener(cluster_queue, _routes)
+    _cluster_listener.start()
+
+
+def shutdown_logging():
+    """
+    Flush and stop the logging pipeline.
+    
+    Drains any records still queued for the background listener, then
+    closes all handlers. Safe to call more than once.
+    """
+    global _logging_initialized, _queue_listener, _log_buffer, _cluster_listener
+    
+    # Report anything still being collapsed before the writers stop
+    for logger_name, throttle in _throttles.items():
+        throttle.flush()
+        logging.getLogger(logger_name).removeFilter(throttle)
+    _throttles.clear()
+    
+    if _cluster_listener is not None:
+        # Write what the workers already sent before the handlers close
+        _cluster_listener.stop()
+        _cluster_listener = None
+    
+    if _queue_listener is not None:
+        # stop() enqueues a sentinel and waits until everything before it is written
+        _queue_listener.stop()
+        rotation_worker.stop()
+        for handler in _queue_listener.handlers:
+            handler.flush()
+            handler.close()
+        _queue_listener = None
+    
+    _queue_handlers.clear()
+    rotation_worker.stop()
+    _log_buffer = None
+    _routes.clear()
+    _handlers.clear()
+    
+    if _logging_initialized:
+        for logger_name in LOGGING_CONFIG["loggers"]:
+            logger = logging.getLogger(logger_name)
+            for handler in list(logger.handlers):
+                handler.close()
+                logger.removeHandler(handler)
+    
+    _logging_initialized = False
+
+
+# Make sure queued records reach disk on interpreter exit
+atexit.register(shutdown_logging)
+
+
+def _handler_threshold(logger: logging.Logger) -> Optional[int]:
+    """
+    Get the lowest level any handler reachable from a logger accepts.
+    
+    Args:
+        logger: Logger whose handler chain is inspected
+        
+    Returns:
+        Lowest handler level, or None if no handler is reachable
+    """
+    levels = []
+    current = logger
+    while current is not None:
+        levels.extend(h.level for h in current.handlers)
+        if not current.propagate:
+            break
+        current = current.parent
+    return min(levels) if levels else None
+
+
+def _align_logger_levels():
+    """Raise each configured logger to the lowest threshold of its handlers."""
+    # Queue handlers stand in for their route, so keep them at the route minimum
+    # (cluster workers have no local routes and keep their own level)
+    for queue_handler in _queue_handlers:
+        if queue_handler.route in _routes:
+            queue_handler.setLevel(lowest_level(_routes[queue_handler.route]))
+    
+    for logger_name, level in _configured_levels.items():
+        logger = logging.getLogger(logger_name)
+        threshold = _handler_threshold(logger)
+        logger.setLevel(max(level, threshold) if threshold is not None else level)
+
+
+def set_log_level(target: str, level: int) -> str:
+    """
+    Change a logger's or handler's level at runtime.
+    
+    Handler names are 'console', 'buffer' and 'file:<logger>' ('cluster:<logger>'
+    in cluster workers); anything else is treated as a logger name. Logger levels are re-aligned afterwards.
+    
+    Args:
+        target: Handler or logger name
+        level: New logging level
+        
+    Returns:
+        'handler' or 'logger', depending on what was changed
+    """
+    if target in _handlers:
+        _handlers[target].setLevel(level)
+        kind = 'handler'
+    else:
+        _configured_levels[target] = level
+        kind = 'logger'
+    
+    _align_logger_levels()
+    return kind
+
+
+def get_log_levels() -> Dict[str, Dict[str, str]]:
+    """
+    Get the current logging levels.
+    
+    Returns:
+        Mapping with 'loggers' (requested -> effective level names)
+        and 'handlers' (level names)
+    """
+    return {
+        'loggers': {
+            name: f'{logging.getLevelName(level)} -> {logging.getLevelName(logging.getLogger(name).level)}'
+            for name, level in _configured_levels.items()
+        },
+        'handlers': {name: logging.getLevelName(h.level) for name, h in _handlers.items()},
+    }
+
+
+def get_throttles() -> Dict[str, LogThrottle]:
+    """
+    Get the throttle filters attached to high-volume loggers.
+    
+    Returns:
+        Mapping of logger name to throttle (see LogThrottle.dropped for counts)
+    """
+    return dict(_throttles)
+
+
+def get_log_counts() -> Dict[str, Counter]:
+    """
+    Get how many records were logged and dropped, per level.
+    
+    Records are counted as they enter the queue pipeline, so 'logged' stays
+    empty when the queue is disabled. Records discarded by throttles never
+    reach the queue and are only counted as dropped.
+    
+    Returns:
+        Mapping with 'logged' (level name -> count) and 'dropped'
+        ((reason, level name) -> count, reason being 'queue_full' or 'throttle')
+    """
+    logged: Counter = Counter()
+    dropped: Counter = Counter()
+    for queue_handler in _queue_handlers:
+        logged.update(queue_handler.enqueued)
+        for level, count in queue_handler.dropped.items():
+            dropped['queue_full', level] += count
+    for throttle in _throttles.values():
+        for level, count in throttle.dropped_levels.items():
+            dropped['throttle', level] += count
+    return {'logged': logged, 'dropped': dropped}
+
+
+def get_log_buffer() -> Optional[RingBufferHandler]:
+    """
+    Get the in-memory buffer of recent log records.
+    
+    Returns:
+        Ring buffer handler, or None if buffering is disabled or logging is not set up
+    """
+    return _log_buffer
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
     Get a logger instance for bot modules.
@@ -126,20 +463,21 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
         return logging.getLogger(name)
 
 
-def log_startup_info(logger: logging.Logger, bot_info: dict):
+def log_startup_info(logger: logging.Logger, bot_info: dict, title: str = '🤖 Discord Bot Starting Up'):
     """
     Log comprehensive startup information.
     
     Args:
         logger: Logger instance
         bot_info: Dictionary containing bot information
+        title: Banner heading
     """
     logger.info('=' * 60)
-    logger.info('🤖 Discord Bot Starting Up')
+    logger.info(title)
     logger.info('=' * 60)
     
     for key, value in bot_info.items():
-        logger.info(f'  {key}: {value}')
+        logger.info('  %s: %s', key, value)
     
     logger.info('=' * 60)
     logger.info('🚀 Bot initialization complete!')
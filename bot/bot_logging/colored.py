@@ -8,7 +8,11 @@ and debugging scenarios.
 import logging
 import os
 import sys
-from typing import Dict
+from typing import Dict, Tuple
+
+
+class _RecordView:
+    """Attribute holder standing in for a LogRecord during formatting."""
 
 
 class ColoredFormatter(logging.Formatter):
@@ -72,6 +76,11 @@ class ColoredFormatter(logging.Formatter):
         
         # Check if we should use colors (disable in non-TTY environments)
         self.use_colors = self._should_use_colors()
+        
+        # Pre-rendered colored strings, resolved once per level / logger name
+        self._level_cache: Dict[Tuple[int, str], str] = {}
+        self._name_cache: Dict[str, str] = {}
+        self._time_cache: Tuple[int, str] = (-1, '')
     
     def _should_use_colors(self) -> bool:
         """
@@ -108,10 +117,14 @@ class ColoredFormatter(logging.Formatter):
                 or any(t in term_lower for t in ('xterm', 'ansi', 'color'))
             )        # Enable colors on Unix-like systems by default
     
-    def format(self, record: logging.LogRecord) -> str:
+    def formatMessage(self, record: logging.LogRecord) -> str:
         """
         Format the log record with colors if enabled.
         
+        The shared record is never modified; colored values are substituted
+        in a copy of its attributes, so several handlers can safely format
+        the same record.
+        
         Args:
             record: The log record to format
             
@@ -119,49 +132,90 @@ class ColoredFormatter(logging.Formatter):
             Formatted log message with colors
         """
         if not self.use_colors:
-            return super().format(record)
-        
-        # Save original values
-        original_levelname = record.levelname
-        original_name = record.name
-        
-        # Apply colors
-        level_color = self.LEVEL_COLORS.get(record.levelno, self.COLORS['WHITE'])
-        logger_color = self._get_logger_color(record.name)
-        
-        # Colorize level name
-        record.levelname = f"{level_color}{record.levelname}{self.COLORS['RESET']}"
-        
-        # Colorize logger name
-        record.name = f"{logger_color}{record.name}{self.COLORS['RESET']}"
+            return super().formatMessage(record)
+        
+        view = _RecordView()
+        view.__dict__ = {
+            **record.__dict__,
+            'levelname': self._colored_levelname(record.levelno, record.levelname),
+            'name': self._colored_name(record.name),
+        }
+        return self._style.format(view)
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        """
+        Format the record time, reusing the result within the same second.
         
-        # Format the message
-        formatted = super().format(record)
+        Args:
+            record: The log record being formatted
+            datefmt: Date format string
+            
+        Returns:
+            Formatted time string
+        """
+        if datefmt is None:
+            # Default format includes milliseconds, nothing to reuse
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, cached_text = self._time_cache
+        if second != cached_second:
+            cached_text = super().formatTime(record, datefmt)
+            self._time_cache = (second, cached_text)
+        return cached_text
+    
+    def _colored_levelname(self, levelno: int, levelname: str) -> str:
+        """
+        Get the pre-rendered colored level name.
         
-        # Restore original values
-        record.levelname = original_levelname
-        record.name = original_name
+        Args:
+            levelno: Numeric level of the record
+            levelname: Level name of the record
+            
+        Returns:
+            Level name wrapped in its ANSI color codes
+        """
+        key = (levelno, levelname)
+        colored = self._level_cache.get(key)
+        if colored is None:
+            level_color = self.LEVEL_COLORS.get(levelno, self.COLORS['WHITE'])
+            colored = self._level_cache[key] = f"{level_color}{levelname}{self.COLORS['RESET']}"
+        return colored
+    
+    def _colored_name(self, logger_name: str) -> str:
+        """
+        Get the pre-rendered colored logger name.
         
-        return formatted
+        Args:
+            logger_name: Name of the logger
+            
+        Returns:
+            Logger name wrapped in its ANSI color codes
+        """
+        colored = self._name_cache.get(logger_name)
+        if colored is None:
+            logger_color = self._get_logger_color(logger_name)
+            colored = self._name_cache[logger_name] = f"{logger_color}{logger_name}{self.COLORS['RESET']}"
+        return colored
     
     def _get_logger_color(self, logger_name: str) -> str:
         """
         Get the appropriate color for a logger name.
         
+        Uses the longest configured prefix on a dotted-name boundary, so
+        'discord.gateway.x' resolves to 'discord.gateway' rather than 'discord'.
+        
         Args:
             logger_name: Name of the logger
             
         Returns:
             ANSI color code string
         """
-        # Check for exact matches first
-        if logger_name in self.LOGGER_COLORS:
-            return self.LOGGER_COLORS[logger_name]
-        
-        # Check for partial matches (e.g., 'bot.commands' matches 'bot')
-        for name_pattern, color in self.LOGGER_COLORS.items():
-            if logger_name.startswith(name_pattern):
-                return color
+        name = logger_name
+        while name:
+            if name in self.LOGGER_COLORS:
+                return self.LOGGER_COLORS[name]
+            name = name.rpartition('.')[0]
         
         # Default color for unknown loggers
         return self.COLORS['WHITE']
@@ -24,15 +24,25 @@ LOGGING_CONFIG: Dict[str, Any] = {
         "discord": {
             "filename": "/app/data/logs/discord.log",
             "max_bytes": 32 * 1024 * 1024,  # 32 MiB
-            "backup_count": 5,
+            "backup_count": 20,
         },
         "bot": {
             "filename": "/app/data/logs/bot.log",
             "max_bytes": 16 * 1024 * 1024,  # 16 MiB
-            "backup_count": 3,
+            "backup_count": 20,
         }
     },
     
+    # Rotation of the files above. Backups are timestamped and compressed by a
+    # background thread; set "enabled" to False for plain RotatingFileHandlers.
+    "rotation": {
+        "enabled": True,
+        "compression": "gzip",  # 'gzip', 'zstd' (needs zstandard, else gzip) or None
+        "interval": None,  # Also rotate every N seconds, e.g. 24 * 60 * 60
+        "max_age_days": 30,  # Delete backups older than this
+        "max_total_bytes": 128 * 1024 * 1024,  # Disk budget for all backups combined
+    },
+    
     # Console logging settings
     "console": {
         "enabled": True,
@@ -47,6 +57,30 @@ LOGGING_CONFIG: Dict[str, Any] = {
         "format": "[{asctime}] [{levelname:<8}] {name}: {message}",
         "date_format": "%Y-%m-%d %H:%M:%S",
         "style": "{"
+    },
+    
+    # In-memory ring buffer of recent records, used by the /logs command
+    "buffer": {
+        "enabled": True,
+        "capacity": 500,  # Records kept per logger
+    },
+    
+    # Throttling for high-volume loggers; WARNING and above always pass.
+    #   rate/burst: token bucket (records per second / bucket size)
+    #   sample_every: keep 1 in N DEBUG/INFO records
+    #   dedup_window: collapse identical messages into "repeated N times" per window (seconds)
+    "throttle": {
+        "discord.gateway": {"rate": 20.0, "burst": 100, "sample_every": 1, "dedup_window": 10.0},
+        "bot.events": {"rate": 50.0, "burst": 200, "sample_every": 1, "dedup_window": 5.0},
+    },
+    
+    # Non-blocking pipeline: loggers enqueue records and a background thread
+    # performs the file/console I/O. Policy applies when the queue is full:
+    # 'block', 'drop_oldest' or 'drop_debug' (evict DEBUG records first).
+    "queue": {
+        "enabled": True,
+        "max_size": 10000,
+        "policy": "block",
     }
 }
 
@@ -69,6 +103,14 @@ ENVIRONMENT_CONFIGS = {
         "file_level": logging.INFO,
         "discord_http_level": logging.ERROR,
         "colored_logs": False,
+    },
+    # Production levels with one JSON object per line in the log files
+    "json": {
+        "console_level": logging.INFO,
+        "file_level": logging.INFO,
+        "discord_http_level": logging.WARNING,
+        "colored_logs": False,
+        "file_format": "json",
     }
 }
 
@@ -0,0 +1,207 @@
+"""
+Rate limiting, sampling and deduplication for high-volume loggers.
+
+This module caps how many records a noisy logger (e.g. discord.gateway during
+a reconnect storm) can emit, while always letting WARNING and above through.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Maximum number of distinct messages tracked for deduplication
+MAX_DEDUP_KEYS = 1000
+
+# (logger name, level, message template, args)
+DedupKey = Tuple[str, int, Any, Any]
+
+
+class LogThrottle(logging.Filter):
+    """
+    Logger filter combining deduplication, 1-in-N sampling and a token bucket.
+
+    Records above `max_level` always pass. For the rest, in order:
+
+    - dedup: identical messages within `dedup_window` seconds are suppressed
+      and reported as a single "repeated N times" record when the window closes;
+      a timer closes windows that saw repeats even if the logger goes quiet
+    - sampling: only every `sample_every`-th record passes
+    - rate limit: a token bucket refilled at `rate` records/second holding at
+      most `burst` tokens
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        sample_every: int = 1,
+        dedup_window: Optional[float] = None,
+        max_level: int = logging.INFO,
+    ):
+        """
+        Initialize the throttle.
+
+        Args:
+            rate: Records per second allowed by the token bucket (None disables it)
+            burst: Bucket capacity, defaults to one second worth of records
+            sample_every: Keep one record out of this many (1 keeps all)
+            dedup_window: Seconds during which repeats are collapsed (None disables it)
+            max_level: Highest level subject to throttling
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.sample_every = max(1, sample_every)
+        self.dedup_window = dedup_window
+        self.max_level = max_level
+
+        self.dropped: Counter = Counter()
+        self.dropped_levels: Counter = Counter()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._seen = 0
+        # key -> [window end, suppressed count, pathname, lineno] of the first record
+        self._dedup: Dict[DedupKey, list] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record should be emitted."""
+        if record.levelno > self.max_level or getattr(record, 'throttle_summary', False):
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            summaries = self._expire(now) if self.dedup_window else []
+            allowed = self._allow(record, now)
+            if not allowed:
+                self.dropped_levels[record.levelname] += 1
+
+        for summary in summaries:
+            self._emit_summary(*summary)
+        return allowed
+
+    def flush(self):
+        """Emit summaries for every open deduplication window."""
+        with self._lock:
+            self._cancel_timer()
+            summaries = self._expire(float('inf'))
+        for summary in summaries:
+            self._emit_summary(*summary)
+
+    def _on_timer(self):
+        """Timer callback: close the windows that ended and wait for the next one with repeats."""
+        with self._lock:
+            self._timer = None
+            now = time.monotonic()
+            summaries = self._expire(now)
+            pending = next((entry[0] for entry in self._dedup.values() if entry[1]), None)
+            if pending is not None:
+                self._schedule(pending, now)
+        for summary in summaries:
+            self._emit_summary(*summary)
+
+    def _schedule(self, window_end: float, now: float):
+        """Start the timer closing a window, unless one is pending. Must hold the lock."""
+        if self._timer is None:
+            self._timer = threading.Timer(max(0.0, window_end - now), self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self):
+        """Stop the pending timer. Must hold the lock."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _allow(self, record: logging.LogRecord, now: float) -> bool:
+        """Apply dedup, sampling and the token bucket. Must hold the lock."""
+        if self.dedup_window:
+            key = _dedup_key(record)
+            entry = self._dedup.get(key)
+            if entry is not None:
+                entry[1] += 1
+                self.dropped['dedup'] += 1
+                if entry[1] == 1:
+                    # Windows end in the order they open, so a pending timer fires first
+                    self._schedule(entry[0], now)
+                return False
+            if len(self._dedup) >= MAX_DEDUP_KEYS:
+                # Close the oldest window early to bound memory
+                oldest = next(iter(self._dedup))
+                self._dedup[oldest][0] = now
+            self._dedup[key] = [now + self.dedup_window, 0, record.pathname, record.lineno]
+
+        self._seen += 1
+        if self.sample_every > 1 and self._seen % self.sample_every != 1:
+            self.dropped['sample'] += 1
+            return False
+
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens < 1:
+                self.dropped['rate'] += 1
+                return False
+            self._tokens -= 1
+
+        return True
+
+    def _expire(self, now: float) -> List[Tuple[DedupKey, list]]:
+        """Close finished dedup windows. Must hold the lock."""
+        expired = []
+        while self._dedup:
+            key = next(iter(self._dedup))
+            entry = self._dedup[key]
+            if entry[0] > now:
+                # Windows are opened in order, the rest are still running
+                break
+            del self._dedup[key]
+            if entry[1]:
+                expired.append((key, entry))
+        return expired
+
+    @staticmethod
+    def _emit_summary(key: DedupKey, entry: list):
+        """Log a summary for a message whose window suppressed repeats."""
+        name, levelno, msg, args = key
+        _, suppressed, pathname, lineno = entry
+        message = str(msg) % args if args else str(msg)
+        logger = logging.getLogger(name)
+        summary = logger.makeRecord(
+            name, levelno, pathname, lineno,
+            '%s (repeated %d times)', (message, suppressed), None,
+            extra={'throttle_summary': True},
+        )
+        logger.handle(summary)
+
+
+def _dedup_key(record: logging.LogRecord) -> DedupKey:
+    """
+    Identify a record's message without formatting it.
+
+    Records are keyed on their template and args, so the caller's thread does
+    not render messages that are only counted. Args that cannot be hashed
+    (e.g. a mapping) fall back to the rendered message.
+    """
+    key = (record.name, record.levelno, record.msg, record.args)
+    try:
+        hash(key)
+    except TypeError:
+        return (record.name, record.levelno, record.getMessage(), None)
+    return key
+
+
+def create_throttles(config: Dict[str, dict]) -> Dict[str, LogThrottle]:
+    """
+    Create throttles from the LOGGING_CONFIG["throttle"] section.
+
+    Args:
+        config: Mapping of logger name to LogThrottle keyword arguments
+
+    Returns:
+        Mapping of logger name to throttle filter
+    """
+    return {logger_name: LogThrottle(**options) for logger_name, options in config.items()}
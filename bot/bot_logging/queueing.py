@@ -0,0 +1,162 @@
+"""
+Queue-backed, non-blocking logging pipeline.
+
+Loggers only enqueue records into a bounded queue; a single background
+listener thread formats them and performs the actual file and console I/O.
+This keeps blocking writes and rotation renames off the asyncio thread.
+"""
+
+import copy
+import logging
+import logging.handlers
+import queue
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# Backpressure policies applied when the queue is full
+POLICY_BLOCK = "block"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_DEBUG = "drop_debug"
+
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_DEBUG)
+
+
+# Renders tracebacks for records that cross process boundaries
+_exception_formatter = logging.Formatter()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that tags records with a route and applies a backpressure policy."""
+
+    def __init__(self, log_queue: queue.Queue, route: str, policy: str = POLICY_BLOCK, merge_message: bool = False):
+        """
+        Initialize the queue handler.
+
+        Args:
+            log_queue: Bounded queue shared with the listener
+            route: Name of the handler group the listener should deliver to
+            policy: Backpressure policy ('block', 'drop_oldest' or 'drop_debug')
+            merge_message: Merge args into the message and render tracebacks so the
+                record can be pickled (required for multiprocessing queues)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r}, expected one of {POLICIES}")
+
+        super().__init__(log_queue)
+        self.route = route
+        self.policy = policy
+        self.merge_message = merge_message
+        self.enqueued: Counter = Counter()
+        self.dropped: Counter = Counter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Tag the record with its route.
+
+        Unlike the stdlib implementation, the message is not formatted here;
+        that work happens on the listener thread. With `merge_message`, only
+        the parts that may not pickle (args, traceback objects) are resolved.
+        """
+        if self.merge_message:
+            record = copy.copy(record)
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                if not record.exc_text:
+                    record.exc_text = _exception_formatter.formatException(record.exc_info)
+                record.exc_info = None
+        record.log_route = self.route
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """Enqueue a record, applying the backpressure policy when the queue is full."""
+        self.enqueued[record.levelname] += 1
+        if self.policy == POLICY_BLOCK:
+            self.queue.put(record)
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+
+            if self.policy == POLICY_DROP_DEBUG:
+                if record.levelno <= logging.DEBUG:
+                    self._count_drop(record)
+                    return
+                if self._evict_debug():
+                    continue
+
+            # drop_oldest, or drop_debug with no DEBUG record left to evict
+            try:
+                self._count_drop(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+    def _evict_debug(self) -> bool:
+        """
+        Remove the oldest queued DEBUG record.
+
+        Returns:
+            True if a record was evicted, False otherwise
+        """
+        mutex = getattr(self.queue, "mutex", None)
+        if mutex is None:
+            # Queues without an inspectable buffer (e.g. multiprocessing)
+            return False
+
+        with mutex:
+            for queued in self.queue.queue:
+                if queued is not None and queued.levelno <= logging.DEBUG:
+                    self.queue.queue.remove(queued)
+                    self.queue.not_full.notify()
+                    self._count_drop(queued)
+                    return True
+        return False
+
+    def _count_drop(self, record: Optional[logging.LogRecord]):
+        """Record a dropped record in the per-level counter."""
+        if record is not None:
+            self.dropped[record.levelname] += 1
+
+
+class RoutingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that delivers each record to the handlers of its route."""
+
+    def __init__(self, log_queue: queue.Queue, routes: Dict[str, List[logging.Handler]]):
+        """
+        Initialize the listener.
+
+        Args:
+            log_queue: Queue shared with the queue handlers
+            routes: Mapping of route name to the handlers that should receive its records
+        """
+        handlers = {id(h): h for group in routes.values() for h in group}
+        super().__init__(log_queue, *handlers.values(), respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord):
+        """Deliver a record to the handlers registered for its route."""
+        for handler in self.routes.get(getattr(record, "log_route", None), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self):
+        """Enqueue the stop sentinel, waiting for space instead of raising when full."""
+        self.queue.put(self._sentinel)
+
+
+def lowest_level(handlers: Iterable[logging.Handler]) -> int:
+    """
+    Get the lowest threshold among a group of handlers.
+
+    Args:
+        handlers: Handlers to inspect
+
+    Returns:
+        Lowest handler level, or NOTSET if there are no handlers
+    """
+    levels = [h.level for h in handlers]
+    return min(levels) if levels else logging.NOTSET
@@ -0,0 +1,353 @@
+"""
+Compressed log rotation with background retention.
+
+Rotation itself only renames the active file to a timestamped segment; a
+background worker then compresses the segment (gzip or zstd) and enforces
+retention by segment count, age and a total disk budget shared by all logs.
+"""
+
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+COMPRESSION_EXTENSIONS = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# Sidecar index written next to a segment by bot_logging.search
+INDEX_SUFFIX = '.idx.json'
+
+# Suffix of a backup segment: legacy numbered (.1) or timestamped, optionally compressed
+SEGMENT_SUFFIX = re.compile(r'^(\d+|\d{8}-\d{6}(-\d+)?)(\.gz|\.zst)?$')
+
+
+def resolve_compression(compression: Optional[str]) -> Optional[str]:
+    """
+    Get the compression that will actually be used.
+
+    Args:
+        compression: Requested compression ('gzip', 'zstd' or None)
+
+    Returns:
+        'zstd' falls back to 'gzip' when the zstandard package is missing
+    """
+    if compression is None:
+        return None
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {tuple(COMPRESSION_EXTENSIONS)}")
+    if compression == 'zstd' and zstandard is None:
+        return 'gzip'
+    return compression
+
+
+def is_compressed(path: str) -> bool:
+    """Check whether a segment is compressed, based on its extension."""
+    return path.endswith(tuple(COMPRESSION_EXTENSIONS.values()))
+
+
+def backup_segments(path: str) -> List[str]:
+    """
+    Get the rotated backups of a log file, newest first.
+
+    Args:
+        path: Path of the active log file
+
+    Returns:
+        Paths of numbered, timestamped and compressed backups
+    """
+    directory, base = os.path.split(path)
+    prefix = base + '.'
+    try:
+        names = os.listdir(directory or '.')
+    except FileNotFoundError:
+        return []
+
+    segments = []
+    for name in names:
+        if name.startswith(prefix) and SEGMENT_SUFFIX.match(name[len(prefix):]):
+            full_path = os.path.join(directory, name)
+            try:
+                segments.append((os.path.getmtime(full_path), full_path))
+            except FileNotFoundError:
+                continue  # Removed by retention meanwhile
+    return [segment for _, segment in sorted(segments, reverse=True)]
+
+
+def compress_file(source: str, compression: str) -> str:
+    """
+    Compress a file next to itself and remove the original.
+
+    The modification time is preserved so segment ordering stays intact.
+
+    Args:
+        source: File to compress
+        compression: 'gzip' or 'zstd'
+
+    Returns:
+        Path of the compressed file
+    """
+    target = source + COMPRESSION_EXTENSIONS[compression]
+    partial = target + '.tmp'
+    stat = os.stat(source)
+
+    with open(source, 'rb') as src, open(partial, 'wb') as dst:
+        if compression == 'zstd':
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode='wb', compresslevel=6) as gz:
+                shutil.copyfileobj(src, gz, 1024 * 1024)
+
+    os.utime(partial, (stat.st_atime, stat.st_mtime))
+    os.replace(partial, target)
+    os.remove(source)
+    RotationWorker._remove(source + INDEX_SUFFIX)
+    return target
+
+
+def open_segment(path: str):
+    """
+    Open a segment for binary reading, decompressing transparently.
+
+    Args:
+        path: Segment path
+
+    Returns:
+        Binary file object
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f'Reading {path} requires the zstandard package')
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def iter_segment_lines(path: str, block_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    Yield the lines of a segment from first to last, decompressing as a stream.
+
+    Memory use is bounded by `block_size` plus the longest line, whatever
+    the size of the segment.
+
+    Args:
+        path: Segment path
+        block_size: Number of decompressed bytes read per step
+
+    Yields:
+        Lines without their trailing newline
+    """
+    with open_segment(path) as f:
+        remainder = b''
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                break
+            parts = (remainder + chunk).split(b'\n')
+            remainder = parts.pop()
+            yield from parts
+        if remainder:
+            yield remainder
+
+
+class RotationWorker:
+    """Background thread compressing rotated segments and enforcing retention."""
+
+    _STOP = object()
+
+    def __init__(self):
+        self.max_total_bytes: Optional[int] = None
+        self._handlers: Dict[str, 'CompressingRotatingFileHandler'] = {}
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def register(self, handler: 'CompressingRotatingFileHandler'):
+        """Include a handler's segments in compression and retention passes."""
+        with self._lock:
+            self._handlers[handler.baseFilename] = handler
+
+    def unregister(self, handler: 'CompressingRotatingFileHandler'):
+        """Stop managing a handler's segments."""
+        with self._lock:
+            self._handlers.pop(handler.baseFilename, None)
+
+    def submit(self):
+        """Schedule a compression and retention pass."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='log-rotation', daemon=True)
+                self._thread.start()
+        self._jobs.put(None)
+
+    def stop(self, timeout: float = 30.0):
+        """Finish pending passes and stop the thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._jobs.put(self._STOP)
+            thread.join(timeout)
+
+    def _run(self):
+        """Process passes until stopped."""
+        while True:
+            job = self._jobs.get()
+            if job is self._STOP:
+                return
+            # Collapse queued requests into a single pass
+            while not self._jobs.empty():
+                if self._jobs.get_nowait() is self._STOP:
+                    self._process()
+                    return
+            self._process()
+
+    def _process(self):
+        """Compress pending segments, then apply retention."""
+        with self._lock:
+            handlers = list(self._handlers.values())
+
+        for handler in handlers:
+            if handler.compression is None:
+                continue
+            for segment in backup_segments(handler.baseFilename):
+                if is_compressed(segment):
+                    continue
+                try:
+                    compress_file(segment, handler.compression)
+                except OSError as e:
+                    logging.getLogger('bot.logging').warning('Failed to compress %s: %s', segment, e)
+
+        self._enforce_retention(handlers)
+
+    def _enforce_retention(self, handlers: List['CompressingRotatingFileHandler']):
+        """Delete segments beyond count, age and the total disk budget."""
+        now = time.time()
+        kept = []  # (mtime, size, path)
+
+        for handler in handlers:
+            for index, segment in enumerate(backup_segments(handler.baseFilename)):
+                try:
+                    stat = os.stat(segment)
+                except FileNotFoundError:
+                    continue
+                too_many = index >= handler.backupCount
+                too_old = handler.max_age is not None and now - stat.st_mtime > handler.max_age
+                if too_many or too_old:
+                    self._remove(segment)
+                else:
+                    kept.append((stat.st_mtime, stat.st_size, segment))
+
+        if self.max_total_bytes is None:
+            return
+
+        total = sum(size for _, size, _ in kept)
+        for _, size, segment in sorted(kept):
+            if total <= self.max_total_bytes:
+                break
+            self._remove(segment)
+            total -= size
+
+    @staticmethod
+    def _remove(segment: str):
+        """Delete a segment and its index, ignoring files that are already gone."""
+        for path in (segment, segment + INDEX_SUFFIX):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# Shared by all handlers so the disk budget spans every log file
+rotation_worker = RotationWorker()
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler with timestamped, compressed backups.
+
+    Rolls over by size and optionally by time. The logging thread only
+    renames the active file; compression and retention run on the shared
+    background worker.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        maxBytes: int = 0,
+        backupCount: int = 0,
+        encoding: Optional[str] = None,
+        compression: Optional[str] = 'gzip',
+        interval: Optional[float] = None,
+        max_age_days: Optional[float] = None,
+    ):
+        """
+        Initialize the handler.
+
+        Args:
+            filename: Path of the active log file
+            maxBytes: Roll over when the file would exceed this size (0 disables)
+            backupCount: Number of backups to keep
+            encoding: File encoding
+            compression: 'gzip', 'zstd' or None to keep backups uncompressed
+            interval: Also roll over after this many seconds (None disables)
+            max_age_days: Delete backups older than this (None disables)
+        """
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self.compression = resolve_compression(compression)
+        self.interval = interval
+        self.max_age = max_age_days * 86400 if max_age_days is not None else None
+        self._next_rollover = time.time() + interval if interval else None
+
+        # Pick up segments left uncompressed by a previous run
+        rotation_worker.register(self)
+        rotation_worker.submit()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Roll over when the size limit or the time interval is reached."""
+        if self._next_rollover is not None and time.time() >= self._next_rollover:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        """Rename the active file to a timestamped segment and reopen it."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            os.rename(self.baseFilename, self._segment_name())
+            rotation_worker.submit()
+
+        if self.interval:
+            self._next_rollover = time.time() + self.interval
+        if not self.delay:
+            self.stream = self._open()
+
+    def close(self):
+        """Close the file and stop managing its segments."""
+        rotation_worker.unregister(self)
+        super().close()
+
+    def _segment_name(self) -> str:
+        """Get an unused timestamped name for the next segment."""
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        name = f'{self.baseFilename}.{stamp}'
+        counter = 1
+        while any(os.path.exists(name + ext) for ext in ('', *COMPRESSION_EXTENSIONS.values())):
+            name = f'{self.baseFilename}.{stamp}-{counter}'
+            counter += 1
+        return name
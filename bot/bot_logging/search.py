@@ -0,0 +1,405 @@
+"""
+Search across current and rotated log files.
+
+Segments are scanned in a thread pool, plain ones with memory-mapped I/O
+and compressed ones by streaming their decompressed lines. Every rotated
+segment gets a small sidecar index recording its time range and the IDs
+and commands it mentions, so segments that cannot match are skipped
+without being read.
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional, Tuple
+
+from .config import LOGGING_CONFIG
+from .rotation import INDEX_SUFFIX, backup_segments, is_compressed, iter_segment_lines
+
+# Discord IDs (snowflakes) and command names as they appear in both log formats
+SNOWFLAKE_PATTERN = re.compile(rb'(?<!\d)\d{17,20}(?!\d)')
+COMMAND_PATTERN = re.compile(rb'"/([\w-]+)"|"command": "([\w -]+)"')
+
+# Timestamps at the start of text and JSON records
+TEXT_TIME_PATTERN = re.compile(rb'^\[([^\]]+)\] \[([A-Z]+)\s*\]')
+JSON_TIME_PATTERN = re.compile(rb'^\{"timestamp": "([^"]+)", "level": "([A-Z]+)"')
+
+# Shared pool for segment scans
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class SearchHit(NamedTuple):
+    """A matching log line."""
+    timestamp: float
+    path: str
+    line: str
+
+
+class LogQuery:
+    """Criteria for a log search; all given criteria must match."""
+
+    def __init__(
+        self,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        command: Optional[str] = None,
+        text: Optional[str] = None,
+        min_level: int = logging.NOTSET,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ):
+        """
+        Initialize the query.
+
+        Args:
+            guild_id: Guild ID mentioned in the record
+            user_id: User ID mentioned in the record
+            command: Command name (without the leading slash)
+            text: Case-sensitive substring of the record
+            min_level: Minimum record level
+            since: Only records written at or after this time
+            until: Only records written at or before this time
+        """
+        self.ids = [str(i).encode() for i in (guild_id, user_id) if i is not None]
+        self._id_patterns = [re.compile(rb'(?<!\d)' + i + rb'(?!\d)') for i in self.ids]
+        self.command = command.lstrip('/') if command else None
+        self.text = text.encode() if text else None
+        self.min_level = min_level
+        self.since = since.timestamp() if since else None
+        self.until = until.timestamp() if until else None
+
+    def needles(self) -> List[bytes]:
+        """Get the byte strings every matching line must contain, most selective first."""
+        needles = list(self.ids)
+        if self.text:
+            needles.append(self.text)
+        return needles
+
+    def matches_ids(self, line: bytes) -> bool:
+        """Check that every ID appears as a whole number, not inside a longer one."""
+        return all(pattern.search(line) for pattern in self._id_patterns)
+
+    def matches_command(self, line: bytes) -> bool:
+        """Check the command criterion against a raw line."""
+        if self.command is None:
+            return True
+        name = self.command.encode()
+        return b'"/' + name + b'"' in line or b'"command": "' + name + b'"' in line
+
+    def may_match(self, index: dict) -> bool:
+        """Check whether a segment with the given index can contain matches."""
+        if self.since is not None and index['end'] is not None and index['end'] < self.since:
+            return False
+        if self.until is not None and index['start'] is not None and index['start'] > self.until:
+            return False
+        ids = index['ids']
+        if any(i.decode() not in ids for i in self.ids):
+            return False
+        if self.command is not None and self.command not in index['commands']:
+            return False
+        return True
+
+
+def _line_time_level(line: bytes) -> Tuple[Optional[float], int]:
+    """
+    Get the timestamp and level of a record line.
+
+    Returns:
+        Tuple of (epoch seconds or None, numeric level or NOTSET)
+    """
+    match = JSON_TIME_PATTERN.match(line)
+    if match is not None:
+        try:
+            created = datetime.fromisoformat(match.group(1).decode()).timestamp()
+        except ValueError:
+            created = None
+        return created, logging.getLevelName(match.group(2).decode())
+
+    match = TEXT_TIME_PATTERN.match(line)
+    if match is not None:
+        try:
+            created = datetime.strptime(
+                match.group(1).decode(), LOGGING_CONFIG["file_format"]["date_format"]
+            ).timestamp()
+        except ValueError:
+            created = None
+        return created, logging.getLevelName(match.group(2).decode())
+
+    return None, logging.NOTSET
+
+
+def _read_segment(path: str):
+    """
+    Memory-map an uncompressed segment.
+
+    Compressed segments are streamed with iter_segment_lines() instead.
+    Returns None for empty files, which cannot be mapped.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def build_index(path: str, data=None) -> dict:
+    """
+    Build the sidecar index of a segment.
+
+    Args:
+        path: Segment path
+        data: Segment contents, read from disk if not given
+
+    Returns:
+        Index with the segment's size, mtime, time range, IDs and commands
+    """
+    stat = os.stat(path)
+    index = {'size': stat.st_size, 'mtime': stat.st_mtime, 'start': None, 'end': None, 'ids': [], 'commands': []}
+    if data is None and is_compressed(path):
+        return _index_lines(index, iter_segment_lines(path))
+    if data is None:
+        data = _read_segment(path)
+    if not data:
+        return index
+
+    first_end = data.find(b'\n')
+    last_start = data.rfind(b'\n', 0, len(data) - 1) + 1
+    index['start'] = _line_time_level(bytes(data[:first_end if first_end != -1 else len(data)]))[0]
+    index['end'] = _line_time_level(bytes(data[last_start:]))[0]
+    index['ids'] = sorted({m.decode() for m in SNOWFLAKE_PATTERN.findall(data)})
+    index['commands'] = sorted({(a or b).decode() for a, b in COMMAND_PATTERN.findall(data)})
+    return index
+
+
+def _index_lines(index: dict, lines: Iterable[bytes]) -> dict:
+    """Fill an index from a segment's lines, for segments that are streamed rather than mapped."""
+    ids = set()
+    commands = set()
+    last = None
+    for line in lines:
+        if last is None:
+            index['start'] = _line_time_level(line)[0]
+        last = line
+        ids.update(SNOWFLAKE_PATTERN.findall(line))
+        commands.update(a or b for a, b in COMMAND_PATTERN.findall(line))
+    if last is not None:
+        index['end'] = _line_time_level(last)[0]
+    index['ids'] = sorted(m.decode() for m in ids)
+    index['commands'] = sorted(c.decode() for c in commands)
+    return index
+
+
+def load_index(path: str) -> Optional[dict]:
+    """
+    Load a segment's sidecar index if it is still valid.
+
+    Returns:
+        The index, or None if missing or stale
+    """
+    try:
+        with open(path + INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if index.get('size') != stat.st_size or index.get('mtime') != stat.st_mtime:
+        return None
+    return index
+
+
+def _save_index(path: str, index: dict):
+    """Write a segment's sidecar index, ignoring failures."""
+    try:
+        with open(path + INDEX_SUFFIX, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+    except OSError:
+        pass
+
+
+def _line_hit(path: str, query: LogQuery, needles: List[bytes], line: bytes) -> Optional[SearchHit]:
+    """Check a single line against a query."""
+    if not all(n in line for n in needles):
+        return None
+    if not query.matches_ids(line) or not query.matches_command(line):
+        return None
+
+    created, levelno = _line_time_level(line)
+    if levelno < query.min_level:
+        return None
+    if created is not None:
+        if query.since is not None and created < query.since:
+            return None
+        if query.until is not None and created > query.until:
+            return None
+
+    return SearchHit(created or 0.0, path, line.decode('utf-8', errors='replace'))
+
+
+def scan_segment(path: str, query: LogQuery, limit: int, indexed: bool = True) -> List[SearchHit]:
+    """
+    Find the newest matching lines of a single segment.
+
+    Args:
+        path: Segment path
+        query: Search criteria
+        limit: Maximum number of hits to return
+        indexed: Use (and create) the sidecar index; disable for the active file
+
+    Returns:
+        Hits, newest first
+    """
+    index = None
+    if indexed:
+        index = load_index(path)
+        if index is not None and not query.may_match(index):
+            return []
+
+    hits: deque = deque(maxlen=limit)
+    needles = query.needles()
+
+    if is_compressed(path):
+        try:
+            if indexed and index is None:
+                index = build_index(path)
+                _save_index(path, index)
+                if not query.may_match(index):
+                    return []
+            for line in iter_segment_lines(path):
+                hit = _line_hit(path, query, needles, line)
+                if hit is not None:
+                    hits.append(hit)
+        except FileNotFoundError:
+            return []  # Removed by retention meanwhile
+        return list(reversed(hits))
+
+    try:
+        data = _read_segment(path)
+    except FileNotFoundError:
+        return []  # Removed by retention meanwhile
+    if data is None:
+        return []
+
+    try:
+        if indexed and index is None:
+            index = build_index(path, data)
+            _save_index(path, index)
+            if not query.may_match(index):
+                return []
+
+        position = 0
+        end = len(data)
+
+        while position < end:
+            if needles:
+                found = data.find(needles[0], position)
+                if found == -1:
+                    break
+                line_start = data.rfind(b'\n', 0, found) + 1
+            else:
+                line_start = position
+
+            line_end = data.find(b'\n', line_start)
+            if line_end == -1:
+                line_end = end
+            position = line_end + 1
+
+            hit = _line_hit(path, query, needles, bytes(data[line_start:line_end]))
+            if hit is not None:
+                hits.append(hit)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    return list(reversed(hits))
+
+
+def search_paths(paths: Optional[List[str]] = None) -> List[str]:
+    """
+    Get the segments to search, newest first within each log file.
+
+    Args:
+        paths: Active log files; defaults to every file in LOGGING_CONFIG["files"]
+
+    Returns:
+        Active files followed by their backups
+    """
+    if paths is None:
+        paths = [file_config["filename"] for file_config in LOGGING_CONFIG["files"].values()]
+
+    segments = []
+    for path in paths:
+        if os.path.exists(path):
+            segments.append(path)
+        segments.extend(backup_segments(path))
+    return segments
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the shared scan thread pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='log-search')
+    return _executor
+
+
+async def iter_search(
+    query: LogQuery,
+    paths: Optional[List[str]] = None,
+    limit_per_segment: int = 500,
+) -> AsyncIterator[SearchHit]:
+    """
+    Search log segments without blocking the event loop.
+
+    Segments are scanned concurrently in a thread pool and hits are yielded
+    segment by segment, newest segment first, as soon as each is ready.
+
+    Args:
+        query: Search criteria
+        paths: Active log files; defaults to every configured log file
+        limit_per_segment: Maximum hits taken from a single segment
+
+    Yields:
+        Matching lines
+    """
+    loop = asyncio.get_running_loop()
+    segments = await loop.run_in_executor(_get_executor(), search_paths, paths)
+    active = set(paths or (c["filename"] for c in LOGGING_CONFIG["files"].values()))
+
+    futures = [
+        loop.run_in_executor(
+            _get_executor(), scan_segment, segment, query, limit_per_segment, segment not in active
+        )
+        for segment in segments
+    ]
+    try:
+        for future in futures:
+            for hit in await future:
+                yield hit
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def search_logs(query: LogQuery, limit: int = 100, paths: Optional[List[str]] = None) -> List[SearchHit]:
+    """
+    Collect up to `limit` hits for a query.
+
+    Args:
+        query: Search criteria
+        limit: Maximum number of hits
+        paths: Active log files; defaults to every configured log file
+
+    Returns:
+        Hits, newest segment first
+    """
+    hits: List[SearchHit] = []
+    async for hit in iter_search(query, paths, limit_per_segment=limit):
+        hits.append(hit)
+        if len(hits) >= limit:
+            break
+    return hits
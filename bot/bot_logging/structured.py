@@ -0,0 +1,51 @@
+"""
+Structured JSON log output.
+
+This module provides a formatter writing one JSON object per line with a
+stable set of fields, so log shippers can parse records without regexes.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+# Context attributes read from records (passed via `extra=`)
+CONTEXT_FIELDS = ('guild_id', 'user_id', 'command', 'duration_ms')
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter emitting one JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format the record as a single JSON line.
+
+        Every line has the fields timestamp, level, logger, message, guild_id,
+        user_id, command and duration_ms; context fields are null when the
+        record does not carry them. Exceptions and stack info are added under
+        'exception' and 'stack' when present.
+
+        Args:
+            record: The log record to format
+
+        Returns:
+            JSON encoded record
+        """
+        payload: Dict[str, Any] = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            payload[field] = getattr(record, field, None)
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = self.formatStack(record.stack_info)
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
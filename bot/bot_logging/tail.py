@@ -0,0 +1,395 @@
+"""
+Log tailing for the Discord bot.
+
+This module keeps the most recent formatted records in memory and falls back
+to reading log files backwards in fixed-size blocks, so fetching the last few
+lines costs the same no matter how large the log files have grown.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import re
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from .config import LOGGING_CONFIG
+from .rotation import backup_segments, is_compressed, iter_segment_lines
+
+# Size of the blocks read from the end of a log file
+BLOCK_SIZE = 8192
+
+# Header of a record written with LOGGING_CONFIG["file_format"]
+RECORD_PATTERN = re.compile(
+    r'^\[(?P<time>[^\]]+)\] \[(?P<level>[A-Z]+)\s*\] (?P<name>[^:\s]+): '
+)
+
+# (created, levelno, logger name, formatted text)
+BufferEntry = Tuple[float, int, str, str]
+
+# (time, level name, logger name, record text) read from a log file
+Record = Tuple[Union[str, datetime], str, str, str]
+
+# Result of _select() for a record written before `since`
+OLDER = None
+
+
+def _matches_logger(name: str, prefix: Optional[str]) -> bool:
+    """Check whether a logger name is the given logger or one of its children."""
+    return prefix is None or name == prefix or name.startswith(prefix + '.')
+
+
+class RingBufferHandler(logging.Handler):
+    """Handler keeping the last N formatted records of every logger in memory."""
+
+    def __init__(self, capacity: int = 500):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Number of records kept per logger
+        """
+        super().__init__()
+        self.capacity = capacity
+        self.buffers: Dict[str, Deque[BufferEntry]] = {}
+
+    def emit(self, record: logging.LogRecord):
+        """Store the formatted record in its logger's buffer."""
+        try:
+            text = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        buffer = self.buffers.get(record.name)
+        if buffer is None:
+            buffer = self.buffers[record.name] = deque(maxlen=self.capacity)
+        buffer.append((record.created, record.levelno, record.name, text))
+
+    def tail(
+        self,
+        lines: int,
+        min_level: int = logging.NOTSET,
+        logger: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Get the most recent buffered records matching the filters.
+
+        Args:
+            lines: Maximum number of records to return
+            min_level: Minimum record level
+            logger: Only include this logger and its children
+            since: Only include records created at or after this time
+            until: Only include records created at or before this time
+
+        Returns:
+            Formatted records, oldest first
+        """
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        candidates: List[BufferEntry] = []
+
+        self.acquire()
+        try:
+            for name, buffer in self.buffers.items():
+                if not _matches_logger(name, logger):
+                    continue
+
+                taken = 0
+                for entry in reversed(buffer):
+                    created, levelno = entry[0], entry[1]
+                    if since_ts is not None and created < since_ts:
+                        break
+                    if levelno < min_level or (until_ts is not None and created > until_ts):
+                        continue
+                    candidates.append(entry)
+                    taken += 1
+                    if taken >= lines:
+                        break
+        finally:
+            self.release()
+
+        newest = heapq.nlargest(lines, candidates, key=lambda entry: entry[0])
+        return [entry[3] for entry in reversed(newest)]
+
+
+def log_segments(path: str) -> List[str]:
+    """
+    Get a log file and its rotated backups, newest first.
+
+    Args:
+        path: Path of the active log file
+
+    Returns:
+        Existing paths: `path` followed by its numbered, timestamped and
+        compressed backups
+    """
+    segments = [path] if os.path.exists(path) else []
+    return segments + backup_segments(path)
+
+
+def read_lines_reversed(path: str, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yield the lines of an uncompressed file from last to first.
+
+    The file is read backwards in fixed-size blocks, so memory use does not
+    depend on the file size. Compressed segments cannot be read backwards;
+    see tail_file() for how they are handled.
+
+    Args:
+        path: File to read
+        block_size: Number of bytes read per step
+
+    Yields:
+        Lines without their trailing newline
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size) + remainder
+
+            parts = chunk.split(b'\n')
+            remainder = parts.pop(0)
+            for line in reversed(parts):
+                if line:
+                    yield line.decode('utf-8', errors='replace')
+
+        if remainder:
+            yield remainder.decode('utf-8', errors='replace')
+
+
+def _parse_json_record(line: str) -> Optional[Tuple[datetime, str, str]]:
+    """
+    Parse a line written by the JSON formatter.
+
+    Returns:
+        Tuple of (local time, level name, logger name), or None if the line
+        is not a JSON record
+    """
+    try:
+        data = json.loads(line)
+        created = datetime.fromisoformat(data['timestamp']).astimezone().replace(tzinfo=None)
+        return created, data['level'], data['logger']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _iter_records(path: str) -> Iterator[Record]:
+    """
+    Yield whole records (including traceback lines) from first to last.
+
+    The segment is streamed, so this works for compressed segments. Lines
+    before the first record header belong to a record of an older segment
+    and are skipped, as _iter_records_reversed() does.
+
+    Yields:
+        Tuples as from _iter_records_reversed()
+    """
+    current: Optional[Tuple[str, str, str]] = None
+    lines: List[str] = []
+    for raw in iter_segment_lines(path):
+        if not raw:
+            continue
+        line = raw.decode('utf-8', errors='replace')
+        if line.startswith('{'):
+            parsed = _parse_json_record(line)
+            if parsed is not None:
+                if current is not None:
+                    yield (*current, '\n'.join(lines))
+                    current = None
+                yield (*parsed, line)
+                continue
+
+        match = RECORD_PATTERN.match(line)
+        if match is None:
+            if current is not None:
+                lines.append(line)
+            continue
+
+        if current is not None:
+            yield (*current, '\n'.join(lines))
+        current = match.group('time'), match.group('level'), match.group('name')
+        lines = [line]
+
+    if current is not None:
+        yield (*current, '\n'.join(lines))
+
+
+def _iter_records_reversed(path: str) -> Iterator[Record]:
+    """
+    Yield whole records (including traceback lines) from last to first.
+
+    Both the text format and one-object-per-line JSON are understood.
+
+    Yields:
+        Tuples of (time, level name, logger name, record text); the time is
+        a string for text records and a datetime for JSON records
+    """
+    continuation: List[str] = []
+    for line in read_lines_reversed(path):
+        if line.startswith('{'):
+            parsed = _parse_json_record(line)
+            if parsed is not None:
+                yield (*parsed, line)
+                continue
+
+        match = RECORD_PATTERN.match(line)
+        if match is None:
+            continuation.append(line)
+            continue
+
+        text = '\n'.join([line, *reversed(continuation)])
+        continuation.clear()
+        yield match.group('time'), match.group('level'), match.group('name'), text
+
+
+def _select(
+    record: Record,
+    min_level: int,
+    logger: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    date_format: str,
+) -> Optional[bool]:
+    """
+    Check a record read from a file against the tail filters.
+
+    Returns:
+        Whether the record matches, or OLDER if it was written before `since`
+    """
+    time_value, level_name, name, _ = record
+    if since or until:
+        if isinstance(time_value, datetime):
+            created = time_value
+        else:
+            try:
+                created = datetime.strptime(time_value, date_format)
+            except ValueError:
+                return False
+        if since and created < since:
+            return OLDER
+        if until and created > until:
+            return False
+
+    levelno = logging.getLevelName(level_name)
+    if isinstance(levelno, int) and levelno < min_level:
+        return False
+    return _matches_logger(name, logger)
+
+
+def tail_file(
+    path: str,
+    lines: int,
+    min_level: int = logging.NOTSET,
+    logger: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Get the most recent records from a log file and its rotated backups.
+
+    Plain segments are read backwards and stop at the first record that is
+    old enough. Compressed segments are streamed forward, keeping only the
+    newest matches still needed, so neither depends on the segment size.
+
+    Args:
+        path: Path of the active log file
+        lines: Maximum number of records to return
+        min_level: Minimum record level
+        logger: Only include this logger and its children
+        since: Only include records written at or after this time
+        until: Only include records written at or before this time
+
+    Returns:
+        Formatted records, oldest first
+    """
+    date_format = LOGGING_CONFIG["file_format"]["date_format"]
+    collected: List[str] = []
+
+    for segment in log_segments(path):
+        if is_compressed(segment):
+            matches: Deque[str] = deque(maxlen=lines - len(collected))
+            reached_since = False
+            try:
+                for record in _iter_records(segment):
+                    selected = _select(record, min_level, logger, since, until, date_format)
+                    if selected is OLDER:
+                        reached_since = True
+                    elif selected:
+                        matches.append(record[3])
+            except FileNotFoundError:
+                continue  # Removed by retention meanwhile
+            collected.extend(reversed(matches))
+            if reached_since or len(collected) >= lines:
+                # Files are chronological, everything further back is older
+                break
+            continue
+
+        try:
+            for record in _iter_records_reversed(segment):
+                selected = _select(record, min_level, logger, since, until, date_format)
+                if selected is OLDER:
+                    # Files are chronological, everything further back is older
+                    return list(reversed(collected))
+                if not selected:
+                    continue
+
+                collected.append(record[3])
+                if len(collected) >= lines:
+                    return list(reversed(collected))
+        except FileNotFoundError:
+            continue  # Compressed or removed by retention meanwhile
+
+    return list(reversed(collected))
+
+
+async def tail_logs(
+    lines: int,
+    logger: str = 'bot',
+    min_level: int = logging.NOTSET,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    buffer: Optional[RingBufferHandler] = None,
+    path: Optional[str] = None,
+) -> List[str]:
+    """
+    Get the most recent log records, preferring the in-memory buffer.
+
+    The log file is only read (in a worker thread) when the buffer does not
+    hold enough matching records.
+
+    Args:
+        lines: Maximum number of records to return
+        logger: Only include this logger and its children
+        min_level: Minimum record level
+        since: Only include records written at or after this time
+        until: Only include records written at or before this time
+        buffer: Ring buffer to consult first
+        path: Log file to fall back to. Defaults to the file of the logger's
+            top-level name in LOGGING_CONFIG["files"]
+
+    Returns:
+        Formatted records, oldest first
+    """
+    if buffer is not None:
+        recent = buffer.tail(lines, min_level, logger, since, until)
+        if len(recent) >= lines:
+            return recent
+
+    if path is None:
+        file_config = LOGGING_CONFIG["files"].get(logger.split('.', 1)[0])
+        if file_config is None:
+            return recent if buffer is not None else []
+        path = file_config["filename"]
+
+    return await asyncio.to_thread(tail_file, path, lines, min_level, logger, since, until)
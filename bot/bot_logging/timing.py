@@ -0,0 +1,251 @@
+"""
+Phase timings for commands and events.
+
+The logging decorators time three phases of every invocation:
+
+- total: the handler's run time
+- first_response: until Discord acknowledged the first interaction
+  response (a defer or a message)
+- http: time spent waiting on Discord HTTP calls made by the handler
+
+Measurements use `time.perf_counter_ns()` and are recorded into fixed-size,
+log-linear histograms, so recording costs a few integer operations and
+memory stays bounded however many invocations are seen. Histograms with the
+same layout can be merged (e.g. across commands or processes).
+
+HTTP and response times are attributed through a context variable set by
+the decorators; `instrument_discord()` wraps discord.py's HTTP clients to
+update it.
+"""
+
+import functools
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Sub-buckets per power of two; 16 keeps the relative error under 6.25%
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Largest recorded value (about 18 minutes); longer durations are clamped
+MAX_VALUE_NS = (1 << 40) - 1
+
+PHASES = ('total', 'first_response', 'http')
+
+
+def _bucket_index(value: int) -> int:
+    """Get the bucket of a non-negative value."""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """Get the [lower, upper) value range of a bucket."""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    lower = (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+    return lower, lower + (1 << shift)
+
+
+BUCKET_COUNT = _bucket_index(MAX_VALUE_NS) + 1
+
+
+class LatencyHistogram:
+    """Bounded log-linear histogram of nanosecond durations."""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, value_ns: int):
+        """Record a duration in nanoseconds."""
+        value_ns = min(max(value_ns, 0), MAX_VALUE_NS)
+        self.counts[_bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if self.max is None or value_ns > self.max:
+            self.max = value_ns
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Add another histogram's values to this one and return it."""
+        if other.count:
+            self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+            self.count += other.count
+            self.total += other.total
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """
+        Estimate a percentile.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            Duration in nanoseconds (midpoint of the matching bucket, within
+            the observed min/max), or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                lower, upper = _bucket_bounds(index)
+                return min(max((lower + upper - 1) // 2, self.min), self.max)
+        return self.max
+
+    def mean(self) -> Optional[float]:
+        """Get the mean duration in nanoseconds, or None if nothing was recorded."""
+        return self.total / self.count if self.count else None
+
+
+class PhaseTimer:
+    """Timing state of one command or event invocation."""
+
+    __slots__ = ('start', 'first_response', 'http')
+
+    def __init__(self):
+        self.start = time.perf_counter_ns()
+        self.first_response: Optional[int] = None
+        self.http = 0
+
+
+# Invocation being timed in the current task
+_current_timer: ContextVar[Optional[PhaseTimer]] = ContextVar('bot_phase_timer', default=None)
+
+
+class TimingRegistry:
+    """Histograms per (kind, name, phase), e.g. ('command', 'ping', 'total')."""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+
+    def start(self) -> Tuple[PhaseTimer, object]:
+        """
+        Start timing an invocation in the current context.
+
+        Returns:
+            The timer and a token to pass to finish()
+        """
+        timer = PhaseTimer()
+        return timer, _current_timer.set(timer)
+
+    def finish(self, kind: str, name: str, timer: PhaseTimer, token: object) -> int:
+        """
+        Record a finished invocation.
+
+        Args:
+            kind: 'command' or 'event'
+            name: Command or event name
+            timer: Timer returned by start()
+            token: Token returned by start()
+
+        Returns:
+            Total duration in nanoseconds
+        """
+        total = time.perf_counter_ns() - timer.start
+        _current_timer.reset(token)
+        self._histogram(kind, name, 'total').record(total)
+        if timer.first_response is not None:
+            self._histogram(kind, name, 'first_response').record(timer.first_response)
+        if timer.http:
+            self._histogram(kind, name, 'http').record(timer.http)
+        return total
+
+    def get(self, kind: str, name: str, phase: str) -> Optional[LatencyHistogram]:
+        """Get a histogram, or None if nothing was recorded for it."""
+        return self.histograms.get((kind, name, phase))
+
+    def names(self, kind: str) -> List[str]:
+        """Get the names with recorded timings of a kind, sorted."""
+        return sorted({name for k, name, _ in self.histograms if k == kind})
+
+    def merged(self, kind: str, phase: str) -> LatencyHistogram:
+        """Get one histogram combining every name of a kind for a phase."""
+        result = LatencyHistogram()
+        for (k, _, p), histogram in self.histograms.items():
+            if k == kind and p == phase:
+                result.merge(histogram)
+        return result
+
+    def clear(self):
+        """Forget every recorded timing."""
+        self.histograms.clear()
+
+    def _histogram(self, kind: str, name: str, phase: str) -> LatencyHistogram:
+        key = (kind, name, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+
+# Timings recorded by the logging decorators
+timings = TimingRegistry()
+
+_instrumented = False
+
+
+def instrument_discord():
+    """
+    Attribute discord.py HTTP time and the first interaction response to the
+    invocation being timed. Safe to call more than once.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+
+    from discord.http import HTTPClient
+    from discord.webhook.async_ import AsyncWebhookAdapter
+
+    HTTPClient.request = _timed_request(HTTPClient.request)
+    # Interaction responses and followups go through the webhook adapter
+    AsyncWebhookAdapter.request = _timed_request(AsyncWebhookAdapter.request, track_response=True)
+    _instrumented = True
+
+
+def _timed_request(request, track_response: bool = False):
+    """Wrap an HTTP request method so its duration is added to the current timer."""
+
+    @functools.wraps(request)
+    async def wrapper(self, route, *args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return await request(self, route, *args, **kwargs)
+
+        start = time.perf_counter_ns()
+        try:
+            result = await request(self, route, *args, **kwargs)
+        finally:
+            timer.http += time.perf_counter_ns() - start
+        if track_response and timer.first_response is None and route.path.endswith('/callback'):
+            timer.first_response = time.perf_counter_ns() - timer.start
+        return result
+
+    return wrapper
+
+
+def format_ns(value: Optional[int]) -> str:
+    """Format a nanosecond duration for humans, e.g. '12.3ms'."""
+    if value is None:
+        return '-'
+    if value < 1_000_000:
+        return f'{value / 1000:.0f}µs'
+    if value < 1_000_000_000:
+        return f'{value / 1_000_000:.1f}ms'
+    return f'{value / 1_000_000_000:.2f}s'
@@ -7,7 +7,16 @@ across all bot modules and cogs.
 
 import logging
 import functools
-from typing import Any, Callable
+from typing import Any, Callable, Dict, List, Optional
+
+from .timing import instrument_discord, timings
+
+# Callback receiving (name, duration in seconds, exception or None)
+Observer = Callable[[str, float, Optional[BaseException]], None]
+
+# Notified after every command or event handled by the decorators below
+_command_observers: List[Observer] = []
+_event_observers: List[Observer] = []
 
 
 def get_bot_logger(name: str = None) -> logging.Logger:
@@ -38,9 +47,83 @@ def get_bot_logger(name: str = None) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def add_command_observer(observer: Observer):
+    """
+    Get notified after every command run through the logging decorators.
+    
+    Args:
+        observer: Called with the command name, its duration in seconds and the
+            exception it raised (None on success); must be cheap and not raise
+    """
+    _command_observers.append(observer)
+
+
+def add_event_observer(observer: Observer):
+    """
+    Get notified after every event run through `log_event`.
+    
+    Args:
+        observer: Called with the event name, its duration in seconds and the
+            exception it raised (None on success); must be cheap and not raise
+    """
+    _event_observers.append(observer)
+
+
+def remove_observer(observer: Observer):
+    """Stop notifying an observer added with add_command_observer() or add_event_observer()."""
+    for observers in (_command_observers, _event_observers):
+        if observer in observers:
+            observers.remove(observer)
+
+
+def _notify(observers: List[Observer], name: str, duration: float, error: Optional[BaseException] = None):
+    """Call each observer, never letting one break the command or event."""
+    for observer in observers:
+        try:
+            observer(name, duration, error)
+        except Exception:
+            logging.getLogger('bot').warning('Observer %r failed', observer, exc_info=True)
+
+
+def interaction_context(interaction, **extra: Any) -> Dict[str, Any]:
+    """
+    Build the `extra=` context for records about an interaction.
+    
+    The keys match the fields of the JSON log format.
+    
+    Args:
+        interaction: The interaction being handled
+        **extra: Additional context fields (e.g. duration_ms)
+    
+    Returns:
+        Dictionary suitable for the `extra` argument of logging calls
+    """
+    command = getattr(interaction, 'command', None)
+    user = getattr(interaction, 'user', None)
+    context = {
+        'guild_id': getattr(interaction, 'guild_id', None),
+        'user_id': user.id if user is not None else None,
+        'command': command.qualified_name if command is not None else None,
+    }
+    context.update(extra)
+    return context
+
+
+def _find_arg(args: tuple, attribute: str) -> Any:
+    """Get the first of the leading positional arguments having `attribute`, skipping a cog's `self`."""
+    for arg in args[:2]:
+        if hasattr(arg, attribute):
+            return arg
+    return args[0] if args else None
+
+
 def log_slash_command_usage(func: Callable) -> Callable:
     """
-    Decorator to automatically log slash command usage.
+    Decorator to automatically log slash command usage and time it.
+    
+    Records the total duration, the time to the first interaction response
+    and the time spent in Discord HTTP calls (see bot_logging.timing).
+    Works on plain functions and cog methods.
     
     Usage:
         @bot.tree.command()
@@ -49,28 +132,46 @@ def log_slash_command_usage(func: Callable) -> Callable:
             # Command logic here
             pass
     """
+    instrument_discord()
+    
     @functools.wraps(func)
-    async def wrapper(interaction, *args, **kwargs):
+    async def wrapper(*args, **kwargs):
+        interaction = _find_arg(args, 'response')
         logger = get_bot_logger('commands')
+        context = interaction_context(interaction)
+        name = context['command'] or func.__name__
         
         # Log command invocation
-        guild_info = f" in {interaction.guild.name}" if interaction.guild else " in DM"
-        logger.info(f'Slash command "/{interaction.command.name}" invoked by {interaction.user}{guild_info}')
+        logger.info(
+            'Slash command "/%s" invoked by %s in %s',
+            name, interaction.user, interaction.guild.name if interaction.guild else "DM",
+            extra=context,
+        )
         
+        timer, token = timings.start()
+        error = None
         try:
-            result = await func(interaction, *args, **kwargs)
-            logger.debug(f'Slash command "/{interaction.command.name}" completed successfully')
-            return result
-        except Exception as e:
-            logger.error(f'Slash command "/{interaction.command.name}" failed: {e}', exc_info=True)
+            return await func(*args, **kwargs)
+        except BaseException as e:
+            error = e
             raise
+        finally:
+            duration = timings.finish('command', name, timer, token) / 1e9
+            context['duration_ms'] = duration * 1000
+            if error is None:
+                logger.debug('Slash command "/%s" completed successfully', name, extra=context)
+            elif isinstance(error, Exception):
+                logger.error('Slash command "/%s" failed: %s', name, error, exc_info=error, extra=context)
+            _notify(_command_observers, name, duration, error)
     
     return wrapper
 
 
 def log_command_usage(func: Callable) -> Callable:
     """
-    Decorator to automatically log traditional command usage.
+    Decorator to automatically log traditional command usage and time it.
+    
+    Works on plain functions and cog methods.
     
     Usage:
         @bot.command()
@@ -79,28 +180,48 @@ def log_command_usage(func: Callable) -> Callable:
             # Command logic here
             pass
     """
+    instrument_discord()
+    
     @functools.wraps(func)
-    async def wrapper(ctx, *args, **kwargs):
+    async def wrapper(*args, **kwargs):
+        ctx = _find_arg(args, 'invoked_with')
         logger = get_bot_logger('commands')
+        context = {
+            'guild_id': ctx.guild.id if ctx.guild else None,
+            'user_id': ctx.author.id,
+            'command': ctx.command.qualified_name if ctx.command else None,
+        }
+        name = context['command'] or func.__name__
         
         # Log command invocation
-        guild_info = f" in {ctx.guild.name}" if ctx.guild else " in DM"
-        logger.info(f'Command "{ctx.command}" invoked by {ctx.author}{guild_info}')
+        logger.info(
+            'Command "%s" invoked by %s in %s',
+            name, ctx.author, ctx.guild.name if ctx.guild else "DM",
+            extra=context,
+        )
         
+        timer, token = timings.start()
+        error = None
         try:
-            result = await func(ctx, *args, **kwargs)
-            logger.debug(f'Command "{ctx.command}" completed successfully')
-            return result
-        except Exception as e:
-            logger.error(f'Command "{ctx.command}" failed: {e}', exc_info=True)
+            return await func(*args, **kwargs)
+        except BaseException as e:
+            error = e
             raise
+        finally:
+            duration = timings.finish('command', name, timer, token) / 1e9
+            context['duration_ms'] = duration * 1000
+            if error is None:
+                logger.debug('Command "%s" completed successfully', name, extra=context)
+            elif isinstance(error, Exception):
+                logger.error('Command "%s" failed: %s', name, error, exc_info=error, extra=context)
+            _notify(_command_observers, name, duration, error)
     
     return wrapper
 
 
 def log_event(event_name: str):
     """
-    Decorator to log bot events.
+    Decorator to log bot events and time them.
     
     Usage:
         @bot.event
@@ -110,18 +231,33 @@ def log_event(event_name: str):
             pass
     """
     def decorator(func: Callable) -> Callable:
+        instrument_discord()
+        
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             logger = get_bot_logger('events')
-            logger.debug(f'Event "{event_name}" triggered')
+            logger.debug('Event "%s" triggered', event_name)
             
+            timer, token = timings.start()
+            error = None
             try:
-                result = await func(*args, **kwargs)
-                logger.debug(f'Event "{event_name}" processed successfully')
-                return result
-            except Exception as e:
-                logger.error(f'Event "{event_name}" failed: {e}', exc_info=True)
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                error = e
                 raise
+            finally:
+                duration = timings.finish('event', event_name, timer, token) / 1e9
+                if error is None:
+                    logger.debug(
+                        'Event "%s" processed successfully', event_name,
+                        extra={'duration_ms': duration * 1000},
+                    )
+                elif isinstance(error, Exception):
+                    logger.error(
+                        'Event "%s" failed: %s', event_name, error, exc_info=error,
+                        extra={'duration_ms': duration * 1000},
+                    )
+                _notify(_event_observers, event_name, duration, error)
         
         return wrapper
     return decorator
@@ -0,0 +1,341 @@
+"""
+Cache policy settings and bounded caches.
+
+The member cache, startup chunking and the message cache are configured
+through environment variables (see `cache_options`). Commands that need
+member data look it up lazily through `MemberLookup`, which keeps a small,
+expiring cache instead of every member of every guild. `ResponseCache`
+keeps the embeds of informational commands until an event changes them.
+"""
+
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import discord
+
+_MISSING = object()
+
+# Matches any value in ResponseCache.invalidate()
+ANY = object()
+
+# Accepted MEMBER_CACHE values besides combinations of MemberCacheFlags names
+MEMBER_CACHE_PRESETS = ('default', 'all', 'none')
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after a fixed time."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries; the least recently used are evicted first
+            ttl: Seconds an entry stays valid (None keeps entries until evicted)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (expiry, value), least recently used first
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry, marking it as recently used."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expiry, value = entry
+        if expiry < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store an entry, evicting the least recently used ones beyond `maxsize`."""
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else float('inf')
+        self._data[key] = (expiry, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove the entries whose key matches a predicate.
+
+        Returns:
+            Number of removed entries
+        """
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        """Remove every entry."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and entry[0] >= time.monotonic()
+
+
+class MemberLookup:
+    """Lazily fetches guild members, keeping recently used ones in a bounded cache."""
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 600.0):
+        """
+        Initialize the lookup.
+
+        Args:
+            maxsize: Maximum number of cached members
+            ttl: Seconds a fetched member is reused before being fetched again
+        """
+        self.cache = TTLCache(maxsize, ttl)
+
+    async def get(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """
+        Get a member from the library cache, the lookup cache, or the API.
+
+        Args:
+            guild: Guild to look in
+            user_id: Member's user ID
+
+        Returns:
+            The member, or None if they are not in the guild
+        """
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+
+        key = (guild.id, user_id)
+        member = self.cache.get(key, _MISSING)
+        if member is not _MISSING:
+            return member
+
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            member = None
+        self.cache.set(key, member)
+        return member
+
+    def invalidate(self, guild_id: int, user_id: int):
+        """Forget a cached member, e.g. after they changed or left."""
+        self.cache.pop((guild_id, user_id))
+
+
+class ResponseCache:
+    """
+    Built command responses (embeds) keyed by command, guild and target.
+
+    Entries are dropped when a dispatched event changes what they show, and
+    expire after `ttl` regardless, which bounds staleness for changes whose
+    events the bot does not receive (e.g. member updates without the members
+    intent). Responses must not depend on the invoking user beyond the key.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Seconds a response is reused
+        """
+        self.cache = TTLCache(maxsize, ttl)
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.invalidations = 0
+        # Event name -> handler receiving the event's arguments
+        self._handlers = {
+            'guild_update': self._guild_update,
+            'guild_remove': self._guild_remove,
+            'guild_emojis_update': self._guild_changed,
+            'guild_channel_create': self._channel_changed,
+            'guild_channel_delete': self._channel_changed,
+            'member_join': self._member_changed,
+            'member_update': self._member_update,
+            'raw_member_remove': self._raw_member_remove,
+            'user_update': self._user_update,
+            'guild_role_update': self._role_changed,
+            'guild_role_delete': self._role_changed,
+        }
+
+    def get(self, command: str, guild_id: Optional[int] = None, target_id: Optional[int] = None) -> Any:
+        """Get a cached response, or None."""
+        response = self.cache.get((command, guild_id, target_id))
+        if response is None:
+            self.misses[command] += 1
+        else:
+            self.hits[command] += 1
+        return response
+
+    def set(self, command: str, guild_id: Optional[int], target_id: Optional[int], response: Any):
+        """Store a response; it must not be modified afterwards."""
+        self.cache.set((command, guild_id, target_id), response)
+
+    def invalidate(self, command: Any = ANY, guild_id: Any = ANY, target_id: Any = ANY) -> int:
+        """
+        Drop cached responses; each argument left as ANY matches every value.
+
+        A fully specified key is removed directly, anything else scans the cache.
+
+        Returns:
+            Number of dropped responses
+        """
+        if ANY not in (command, guild_id, target_id):
+            removed = int(self.cache.pop((command, guild_id, target_id), _MISSING) is not _MISSING)
+        else:
+            removed = self.cache.discard_where(
+                lambda key: (command is ANY or key[0] == command)
+                and (guild_id is ANY or key[1] == guild_id)
+                and (target_id is ANY or key[2] == target_id)
+            )
+        self.invalidations += removed
+        return removed
+
+    def on_dispatch(self, event: str, args: tuple):
+        """Drop the responses a dispatched event makes stale; called for every event."""
+        handler = self._handlers.get(event)
+        if handler is not None and self.cache:
+            handler(*args)
+
+    def _guild_update(self, before: discord.Guild, after: discord.Guild):
+        self.invalidate('serverinfo', after.id, None)
+
+    def _guild_remove(self, guild: discord.Guild):
+        self.invalidate(guild_id=guild.id)
+
+    def _guild_changed(self, guild: discord.Guild, *args):
+        self.invalidate('serverinfo', guild.id, None)
+
+    def _channel_changed(self, channel: discord.abc.GuildChannel):
+        self.invalidate('serverinfo', channel.guild.id, None)
+
+    def _member_changed(self, member: discord.Member):
+        self.invalidate('serverinfo', member.guild.id, None)
+        self.invalidate('userinfo', member.guild.id, member.id)
+
+    def _member_update(self, before: discord.Member, after: discord.Member):
+        self.invalidate('userinfo', after.guild.id, after.id)
+
+    def _raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.invalidate('serverinfo', payload.guild_id, None)
+        self.invalidate('userinfo', payload.guild_id, payload.user.id)
+
+    def _user_update(self, before: discord.User, after: discord.User):
+        self.invalidate('userinfo', target_id=after.id)
+
+    def _role_changed(self, role: discord.Role, *args):
+        # Role colors and mentions appear in the userinfo of every member holding it
+        self.invalidate('userinfo', guild_id=role.guild.id)
+
+
+def parse_member_cache_flags(value: Optional[str], intents: discord.Intents) -> Optional[discord.MemberCacheFlags]:
+    """
+    Parse the MEMBER_CACHE variable.
+
+    Args:
+        value: 'default' (or empty), 'all', 'none', or a comma-separated list of
+            MemberCacheFlags names such as 'voice,joined'
+        intents: Intents the bot connects with
+
+    Returns:
+        Member cache flags, or None to keep the library default
+
+    Raises:
+        ValueError: If a flag name is unknown
+    """
+    value = (value or 'default').strip().lower()
+    if value == 'default':
+        return None
+    if value == 'all':
+        return discord.MemberCacheFlags.from_intents(intents)
+    if value == 'none':
+        return discord.MemberCacheFlags.none()
+
+    names = [name for name in value.replace(' ', '').split(',') if name]
+    unknown = [name for name in names if name not in discord.MemberCacheFlags.VALID_FLAGS]
+    if unknown:
+        raise ValueError(
+            f"Unknown MEMBER_CACHE flag(s) {unknown}, expected {MEMBER_CACHE_PRESETS} "
+            f"or a combination of {sorted(discord.MemberCacheFlags.VALID_FLAGS)}"
+        )
+    # MemberCacheFlags() enables everything, so start from none
+    flags = discord.MemberCacheFlags.none()
+    for name in names:
+        setattr(flags, name, True)
+    return flags
+
+
+def describe_member_cache(flags: discord.MemberCacheFlags) -> str:
+    """Render member cache flags as a readable list, e.g. 'voice, joined'."""
+    return ', '.join(name for name, enabled in flags if enabled) or 'none'
+
+
+def parse_optional_bool(value: Optional[str]) -> Optional[bool]:
+    """Parse a true/false variable; empty means None (library default)."""
+    if value is None or not value.strip():
+        return None
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"Expected true or false, got {value!r}")
+
+
+def cache_options(
+    intents: discord.Intents,
+    member_cache: Optional[str] = None,
+    chunk_guilds: Optional[str] = None,
+    max_messages: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build Client keyword arguments from the cache policy variables.
+
+    Unset variables are left out so the library defaults apply.
+
+    Args:
+        intents: Intents the bot connects with
+        member_cache: MEMBER_CACHE value
+        chunk_guilds: CHUNK_GUILDS_AT_STARTUP value
+        max_messages: MAX_MESSAGES value; 0 or 'none' disables the message cache
+
+    Returns:
+        Keyword arguments for the bot constructor
+
+    Raises:
+        ValueError: If a value is malformed
+    """
+    options: Dict[str, Any] = {}
+
+    flags = parse_member_cache_flags(member_cache, intents)
+    if flags is not None:
+        options['member_cache_flags'] = flags
+
+    chunk = parse_optional_bool(chunk_guilds)
+    if chunk is not None:
+        options['chunk_guilds_at_startup'] = chunk
+
+    if max_messages is not None and max_messages.strip():
+        value = max_messages.strip().lower()
+        options['max_messages'] = None if value in ('0', 'none') else int(value)
+
+    return options
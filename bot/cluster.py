@@ -0,0 +1,517 @@
+"""
+Multi-process cluster launcher.
+
+The supervisor splits the shards into contiguous ranges and runs one worker
+process per range, so event processing is spread over several CPU cores.
+Workers are started one after another (each waits for the previous one to
+be ready, respecting Discord's identify rate limit) and restarted with
+exponential backoff when they crash.
+
+Workers send their logs to the supervisor over a multiprocessing queue and
+report their stats over a pipe; the supervisor combines the stats and
+broadcasts the cluster-wide totals back to every worker for /status.
+
+Usage:
+    CLUSTER_WORKERS=4 SHARD_COUNT=auto python cluster.py
+"""
+
+import asyncio
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Imported before discord.py so worker startup timelines include the imports below
+from startup import StartupTimeline
+
+import discord
+from discord.http import HTTPClient
+from dotenv import load_dotenv
+
+from bot import create_bot
+from bot_logging import attach_cluster_queue, log_startup_info, setup_logging, shutdown_logging
+from eventloop import backend_info, select_event_loop
+from sharding import shard_health
+
+# Exit code of a worker that must not be restarted (e.g. an invalid token)
+EXIT_FATAL = 78
+
+# Restart backoff: doubles per consecutive crash, reset after a stable run
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 120.0
+STABLE_UPTIME = 60.0
+
+# Seconds a starting worker may take to become ready before the next one starts
+START_TIMEOUT_BASE = 30.0
+START_TIMEOUT_PER_SHARD = 6.0
+
+# Seconds between stats reports from each worker
+STATS_INTERVAL = 15.0
+
+# Seconds workers get to shut down before being killed
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def shard_ranges(shard_count: int, workers: int) -> List[List[int]]:
+    """
+    Split shards into contiguous ranges, one per worker.
+
+    Args:
+        shard_count: Total number of shards
+        workers: Number of worker processes
+
+    Returns:
+        Shard IDs per worker; sizes differ by at most one
+    """
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for worker_id in range(workers):
+        end = start + size + (1 if worker_id < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+async def fetch_recommended_shards(token: str) -> int:
+    """Ask Discord for the recommended shard count of the bot."""
+    http = HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shard_count, _, _ = await http.get_bot_gateway()
+        return shard_count
+    finally:
+        await http.close()
+
+
+def aggregate_stats(snapshots: Dict[int, dict], assignments: Dict[int, List[int]], shard_count: int) -> dict:
+    """
+    Combine worker stats into cluster-wide totals.
+
+    Shards of workers that are down are reported as disconnected.
+
+    Args:
+        snapshots: Latest stats per live worker
+        assignments: Shard IDs per worker
+        shard_count: Total number of shards
+
+    Returns:
+        Totals with guilds, members, worker counts and per-shard health
+    """
+    shards = []
+    for worker_id, shard_ids in assignments.items():
+        snapshot = snapshots.get(worker_id)
+        if snapshot is not None:
+            shards.extend(snapshot['shards'])
+        else:
+            shards.extend(
+                {'id': shard_id, 'latency': None, 'guilds': 0, 'state': 'disconnected'}
+                for shard_id in shard_ids
+            )
+
+    return {
+        'workers': len(assignments),
+        'workers_ready': sum(1 for snapshot in snapshots.values() if snapshot['ready']),
+        'guilds': sum(snapshot['guilds'] for snapshot in snapshots.values()),
+        'members': sum(snapshot['members'] for snapshot in snapshots.values()),
+        'shard_count': shard_count,
+        'shards': sorted(shards, key=lambda shard: shard['id']),
+    }
+
+
+class ClusterClient:
+    """Worker side of the supervisor pipe: reports stats and keeps the cluster totals."""
+
+    def __init__(self, worker_id: int, conn: multiprocessing.connection.Connection, bot):
+        """
+        Initialize the client.
+
+        Args:
+            worker_id: Index of this worker
+            conn: Worker end of the supervisor pipe
+            bot: Bot run by this worker
+        """
+        self.worker_id = worker_id
+        self.conn = conn
+        self.bot = bot
+        # Latest cluster-wide totals broadcast by the supervisor
+        self.stats: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start reporting; must be called from the bot's event loop."""
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self.conn.fileno(), self._receive)
+        self.bot.add_listener(self._on_ready, 'on_ready')
+        self._task = loop.create_task(self._report_loop())
+
+    def snapshot(self) -> dict:
+        """Collect this worker's stats."""
+        return {
+            'worker': self.worker_id,
+            'pid': os.getpid(),
+            'ready': self.bot.is_ready(),
+            'guilds': self.bot.stats.guilds,
+            'members': self.bot.member_count(),
+            'shards': shard_health(self.bot, self.bot.stats.shard_guilds),
+        }
+
+    def send(self, kind: str, **payload):
+        """Send a message to the supervisor, ignoring a closed pipe."""
+        try:
+            self.conn.send({'type': kind, **payload})
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+
+    async def _on_ready(self):
+        """Tell the supervisor this worker is ready so the next one can start."""
+        self.send('ready', stats=self.snapshot())
+
+    async def _report_loop(self):
+        """Report stats periodically."""
+        while not self.bot.is_closed():
+            await asyncio.sleep(STATS_INTERVAL)
+            self.send('stats', stats=self.snapshot())
+
+    def _receive(self):
+        """Handle messages from the supervisor."""
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message.get('type') == 'cluster':
+                    self.stats = message['stats']
+        except (EOFError, OSError):
+            # Supervisor is gone; stop listening
+            asyncio.get_running_loop().remove_reader(self.conn.fileno())
+
+
+def run_worker(worker_id: int, shard_ids: List[int], shard_count: int, log_queue, conn):
+    """
+    Entry point of a worker process.
+
+    Args:
+        worker_id: Index of this worker
+        shard_ids: Shards run by this worker
+        shard_count: Total number of shards
+        log_queue: Supervisor's logging queue
+        conn: Worker end of the supervisor pipe
+    """
+    timeline = StartupTimeline()
+    timeline.mark('Imports')
+    # Let discord.py close the connections cleanly when the supervisor stops us
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    load_dotenv()
+    logger = setup_logging(os.getenv('LOG_ENVIRONMENT', 'production'), cluster_queue=log_queue)
+    timeline.mark('Logging Setup')
+    logger.info('Cluster worker %d starting shards %s (pid %d)', worker_id, shard_ids, os.getpid())
+
+    # The command tree is global; one worker syncing it is enough
+    try:
+        bot = create_bot(
+            logger,
+            sharded=True,
+            shard_count=shard_count,
+            shard_ids=shard_ids,
+            command_sync=None if worker_id == 0 else 'never',
+            timeline=timeline,
+        )
+    except ValueError as e:
+        logger.critical('Cluster worker %d: invalid configuration: %s', worker_id, e)
+        shutdown_logging()
+        sys.exit(EXIT_FATAL)
+    bot.cluster = ClusterClient(worker_id, conn, bot)
+    timeline.mark('Bot Created')
+
+    try:
+        _, loop_warning = select_event_loop(os.getenv('EVENT_LOOP', 'auto'))
+    except ValueError as e:
+        logger.critical('Cluster worker %d: invalid configuration: %s', worker_id, e)
+        shutdown_logging()
+        sys.exit(EXIT_FATAL)
+    if loop_warning:
+        logger.warning(loop_warning)
+
+    try:
+        bot.run(os.getenv('DISCORD_TOKEN'), log_handler=None)
+    except discord.LoginFailure:
+        logger.critical('Cluster worker %d: invalid Discord token', worker_id)
+        sys.exit(EXIT_FATAL)
+    except Exception as e:
+        logger.critical('Cluster worker %d crashed: %s', worker_id, e, exc_info=True)
+        sys.exit(1)
+    finally:
+        shutdown_logging()
+
+
+class WorkerState:
+    """Supervisor bookkeeping for one worker."""
+
+    def __init__(self, worker_id: int, shard_ids: List[int]):
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn: Optional[multiprocessing.connection.Connection] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+
+
+class ClusterSupervisor:
+    """Starts, monitors and restarts worker processes."""
+
+    def __init__(self, logger, shard_count: int, workers: int):
+        """
+        Initialize the supervisor.
+
+        Args:
+            logger: Supervisor logger
+            shard_count: Total number of shards
+            workers: Number of worker processes
+        """
+        self.logger = logger
+        self.shard_count = shard_count
+        self.context = multiprocessing.get_context('spawn')
+        self.log_queue = self.context.Queue(maxsize=10000)
+        self.workers = {
+            worker_id: WorkerState(worker_id, shard_ids)
+            for worker_id, shard_ids in enumerate(shard_ranges(shard_count, workers))
+        }
+        self.snapshots: Dict[int, dict] = {}
+        self.pending = deque(self.workers)
+        self.starting: Optional[int] = None
+        self.start_deadline = 0.0
+        self.stopping = False
+        self.exit_code = 0
+
+    def run(self) -> int:
+        """
+        Supervise the workers until stopped.
+
+        Returns:
+            Process exit code
+        """
+        attach_cluster_queue(self.log_queue)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        for state in self.workers.values():
+            self.logger.info('Worker %d will run shards %d-%d', state.worker_id, state.shard_ids[0], state.shard_ids[-1])
+
+        try:
+            while not self.stopping:
+                self._start_next()
+                self._wait(self._next_timeout())
+        finally:
+            self._stop_workers()
+        return self.exit_code
+
+    def _request_stop(self, signum, frame):
+        """Signal handler: stop the cluster."""
+        self.stopping = True
+        # Workers exiting also wakes up the wait in run()
+        for state in self.workers.values():
+            if state.process is not None and state.process.is_alive():
+                state.process.terminate()
+
+    def _start_next(self):
+        """Start the next pending worker once the previous one is ready."""
+        now = time.monotonic()
+        if self.starting is not None and now >= self.start_deadline:
+            self.logger.warning('Worker %d is not ready yet, starting the next one', self.starting)
+            self.starting = None
+        if self.starting is not None or not self.pending:
+            return
+
+        state = self.workers[self.pending[0]]
+        if now < state.restart_at:
+            return
+        self.pending.popleft()
+
+        parent_conn, child_conn = self.context.Pipe()
+        state.process = self.context.Process(
+            target=run_worker,
+            args=(state.worker_id, state.shard_ids, self.shard_count, self.log_queue, child_conn),
+            name=f'cluster-worker-{state.worker_id}',
+        )
+        state.process.start()
+        child_conn.close()
+        state.conn = parent_conn
+        state.started_at = now
+        self.starting = state.worker_id
+        self.start_deadline = now + START_TIMEOUT_BASE + START_TIMEOUT_PER_SHARD * len(state.shard_ids)
+        self.logger.info('Started worker %d (pid %d)', state.worker_id, state.process.pid)
+
+    def _next_timeout(self) -> float:
+        """Get how long to wait for events before the next scheduled action."""
+        now = time.monotonic()
+        deadlines = [now + STATS_INTERVAL]
+        if self.starting is not None:
+            deadlines.append(self.start_deadline)
+        elif self.pending:
+            deadlines.append(self.workers[self.pending[0]].restart_at)
+        return max(0.0, min(deadlines) - now)
+
+    def _wait(self, timeout: float):
+        """Handle worker messages and exits for up to `timeout` seconds."""
+        running = [state for state in self.workers.values() if state.process is not None]
+        sources = {}
+        for state in running:
+            sources[state.process.sentinel] = state
+            if state.conn is not None:
+                sources[state.conn] = state
+
+        try:
+            ready = multiprocessing.connection.wait(list(sources), timeout)
+        except InterruptedError:
+            return
+
+        for source in ready:
+            state = sources[source]
+            if source is state.conn:
+                self._receive(state)
+        for source in ready:
+            state = sources[source]
+            if state.process is not None and source == state.process.sentinel:
+                self._handle_exit(state)
+
+    def _receive(self, state: WorkerState):
+        """Handle the messages a worker sent."""
+        try:
+            while state.conn.poll():
+                message = state.conn.recv()
+                self.snapshots[state.worker_id] = message['stats']
+                if message['type'] == 'ready':
+                    self.logger.info(
+                        'Worker %d ready with %d guild(s) in %.1fs',
+                        state.worker_id, message['stats']['guilds'], time.monotonic() - state.started_at,
+                    )
+                    if self.starting == state.worker_id:
+                        self.starting = None
+        except (EOFError, OSError):
+            state.conn.close()
+            state.conn = None
+            return
+        self._broadcast()
+
+    def _broadcast(self):
+        """Send the combined stats to every live worker."""
+        stats = aggregate_stats(
+            self.snapshots,
+            {worker_id: state.shard_ids for worker_id, state in self.workers.items()},
+            self.shard_count,
+        )
+        for state in self.workers.values():
+            if state.conn is None:
+                continue
+            try:
+                state.conn.send({'type': 'cluster', 'stats': stats})
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+
+    def _handle_exit(self, state: WorkerState):
+        """Schedule a restart of a worker that exited."""
+        state.process.join()
+        exit_code = state.process.exitcode
+        uptime = time.monotonic() - state.started_at
+        state.process = None
+        if state.conn is not None:
+            state.conn.close()
+            state.conn = None
+        self.snapshots.pop(state.worker_id, None)
+        if self.starting == state.worker_id:
+            self.starting = None
+        self._broadcast()
+
+        if self.stopping:
+            self.logger.info('Worker %d stopped (exit code %s)', state.worker_id, exit_code)
+            return
+        if exit_code == EXIT_FATAL:
+            self.logger.critical('Worker %d failed fatally, stopping the cluster', state.worker_id)
+            self.exit_code = 1
+            self.stopping = True
+            return
+
+        state.failures = 1 if uptime >= STABLE_UPTIME else state.failures + 1
+        delay = min(BACKOFF_BASE * 2 ** (state.failures - 1), BACKOFF_MAX)
+        state.restart_at = time.monotonic() + delay
+        self.pending.append(state.worker_id)
+        self.logger.error(
+            'Worker %d exited with code %s after %.0fs, restarting in %.0fs',
+            state.worker_id, exit_code, uptime, delay,
+        )
+
+    def _stop_workers(self):
+        """Ask every worker to stop, killing those that do not."""
+        self.logger.info('Stopping cluster')
+        running = [state for state in self.workers.values() if state.process is not None]
+        for state in running:
+            if state.process.is_alive():
+                state.process.terminate()
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for state in running:
+            state.process.join(max(0.0, deadline - time.monotonic()))
+            if state.process.is_alive():
+                self.logger.warning('Worker %d did not stop in time, killing it', state.worker_id)
+                state.process.kill()
+                state.process.join()
+            self.logger.info('Worker %d stopped (exit code %s)', state.worker_id, state.process.exitcode)
+
+
+def main():
+    """Run the cluster supervisor."""
+    load_dotenv()
+
+    log_env = os.getenv('LOG_ENVIRONMENT', 'production')
+    logger = setup_logging(log_env).getChild('cluster')
+
+    token = os.getenv('DISCORD_TOKEN')
+    if not token:
+        logger.critical("DISCORD_TOKEN not found in environment variables!")
+        sys.exit(1)
+
+    try:
+        workers = int(os.getenv('CLUSTER_WORKERS') or os.cpu_count() or 1)
+        # Validated here so a bad value fails once instead of in every worker
+        event_loop, loop_warning = select_event_loop(os.getenv('EVENT_LOOP', 'auto'))
+        shard_setting = (os.getenv('SHARD_COUNT') or 'auto').strip().lower()
+        if shard_setting == 'auto':
+            shard_count = asyncio.run(fetch_recommended_shards(token))
+        else:
+            shard_count = int(shard_setting)
+        if workers < 1 or shard_count < 1:
+            raise ValueError('CLUSTER_WORKERS and SHARD_COUNT must be at least 1')
+    except discord.LoginFailure:
+        logger.critical('Invalid Discord token provided!')
+        sys.exit(1)
+    except (ValueError, discord.HTTPException) as e:
+        logger.critical('Invalid cluster configuration: %s', e)
+        sys.exit(1)
+    if loop_warning:
+        logger.warning(loop_warning)
+
+    supervisor = ClusterSupervisor(logger, shard_count, workers)
+    log_startup_info(logger, {
+        'Python Version': sys.version.split()[0],
+        'discord.py Version': discord.__version__,
+        'Log Environment': log_env,
+        'Cluster Workers': len(supervisor.workers),
+        'Shard Count': shard_count,
+        **backend_info(event_loop),
+    })
+
+    try:
+        exit_code = supervisor.run()
+    finally:
+        shutdown_logging()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
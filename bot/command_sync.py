@@ -0,0 +1,173 @@
+"""
+Slash command sync that skips unchanged command trees.
+
+The registered commands are serialized to the payload Discord would receive,
+hashed, and compared with the hash stored after the last successful sync.
+Restarts that do not change any command never call the bulk-overwrite
+endpoint. Development guilds can be synced instead of the global scope, since
+guild commands propagate instantly.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import discord
+from discord import app_commands
+
+# Where fingerprints of the last successful syncs are kept
+DEFAULT_STATE_PATH = '/app/data/command_sync.json'
+
+# auto: sync when the fingerprint changed, always: sync on every start, never: do not sync
+SYNC_MODES = ('auto', 'always', 'never')
+
+
+def parse_guild_ids(value: Optional[str]) -> List[int]:
+    """
+    Parse a comma-separated list of guild IDs (e.g. the DEV_GUILD_IDS variable).
+
+    Args:
+        value: Raw value, may be empty or None
+
+    Returns:
+        Guild IDs in the given order
+    """
+    if not value:
+        return []
+    return [int(part) for part in value.replace(' ', '').split(',') if part]
+
+
+async def tree_payload(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> List[dict]:
+    """
+    Serialize the commands of one scope in a canonical order.
+
+    Args:
+        tree: Command tree holding the commands
+        guild: Guild scope, or None for global commands
+
+    Returns:
+        Command payloads sorted by type and name
+    """
+    commands = tree.get_commands(guild=guild)
+    translator = tree.translator
+    if translator:
+        payload = [await command.get_translated_payload(tree, translator) for command in commands]
+    else:
+        payload = [command.to_dict(tree) for command in commands]
+    return sorted(payload, key=lambda command: (command.get('type', 1), command['name']))
+
+
+def fingerprint(payload: List[dict]) -> str:
+    """Hash a command payload; key order and whitespace do not affect the result."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class CommandSyncer:
+    """Syncs a command tree only for scopes whose fingerprint changed."""
+
+    def __init__(
+        self,
+        tree: app_commands.CommandTree,
+        logger: logging.Logger,
+        mode: str = 'auto',
+        dev_guild_ids: Iterable[int] = (),
+        state_path: str = DEFAULT_STATE_PATH,
+    ):
+        """
+        Initialize the syncer.
+
+        Args:
+            tree: Command tree to sync
+            logger: Logger for sync decisions
+            mode: One of SYNC_MODES
+            dev_guild_ids: Sync to these guilds instead of globally
+            state_path: JSON file storing the last synced fingerprints
+        """
+        if mode not in SYNC_MODES:
+            raise ValueError(f"Unknown command sync mode {mode!r}, expected one of {SYNC_MODES}")
+        self.tree = tree
+        self.logger = logger
+        self.mode = mode
+        self.dev_guilds = [discord.Object(id=guild_id) for guild_id in dev_guild_ids]
+        self.state_path = state_path
+
+    async def sync(self, force: bool = False) -> Dict[str, Optional[int]]:
+        """
+        Sync every scope whose commands changed since the last sync.
+
+        With development guilds configured, global commands are copied to and
+        synced in each of those guilds and the global scope is left untouched.
+
+        Args:
+            force: Sync even when the fingerprint is unchanged
+
+        Returns:
+            Mapping of scope to the number of synced commands, None if skipped
+        """
+        if self.mode == 'never':
+            self.logger.info('Slash command sync disabled')
+            return {}
+
+        if not self.dev_guilds:
+            return {'global': await self.sync_scope(None, force)}
+
+        results = {}
+        for guild in self.dev_guilds:
+            # Start from a clean copy so commands removed since the last sync (e.g. by a reload) go away
+            self.tree.clear_commands(guild=guild)
+            self.tree.copy_global_to(guild=guild)
+            results[f'guild:{guild.id}'] = await self.sync_scope(guild, force)
+        return results
+
+    async def sync_scope(self, guild: Optional[discord.abc.Snowflake], force: bool = False) -> Optional[int]:
+        """
+        Sync a single scope if its fingerprint changed.
+
+        Args:
+            guild: Guild scope, or None for global commands
+            force: Sync even when the fingerprint is unchanged
+
+        Returns:
+            Number of synced commands, or None if the sync was skipped
+        """
+        scope = f'guild:{guild.id}' if guild else 'global'
+        digest = fingerprint(await tree_payload(self.tree, guild))
+        state = self._load_state()
+        app_state = state.setdefault(str(self.tree.client.application_id), {})
+
+        if not force and self.mode == 'auto' and app_state.get(scope) == digest:
+            self.logger.info('Slash commands unchanged for %s (%s), skipping sync', scope, digest[:12])
+            return None
+
+        synced = await self.tree.sync(guild=guild)
+        self.logger.info('Synced %d slash command(s) to %s (%s)', len(synced), scope, digest[:12])
+
+        app_state[scope] = digest
+        self._save_state(state)
+        return len(synced)
+
+    def _load_state(self) -> Dict[str, Dict[str, str]]:
+        """Read stored fingerprints, keyed by application ID and scope."""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning('Ignoring unreadable command sync state %s: %s', self.state_path, e)
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save_state(self, state: Dict[str, Dict[str, str]]):
+        """Write stored fingerprints atomically; failures only cost a redundant sync later."""
+        partial = self.state_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            with open(partial, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+            os.replace(partial, self.state_path)
+        except OSError as e:
+            self.logger.warning('Could not save command sync state to %s: %s', self.state_path, e)
@@ -0,0 +1,89 @@
+"""
+Event loop selection and performance backend reporting.
+
+EVENT_LOOP picks the asyncio event loop implementation: 'uvloop' (a libuv
+based loop, typically faster at scheduling callbacks and socket I/O),
+'asyncio' for the standard loop, or 'auto' to use uvloop when it is
+installed. discord.py picks its faster JSON (orjson) and gateway
+compression (zstandard) backends on its own when they are installed;
+`backend_info` reports what is in use.
+"""
+
+import asyncio
+import platform
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+import discord
+
+EVENT_LOOPS = ('auto', 'asyncio', 'uvloop')
+
+
+def select_event_loop(name: Optional[str] = 'auto') -> Tuple[str, Optional[str]]:
+    """
+    Install the requested event loop implementation for asyncio.run().
+
+    Must be called before the bot starts its loop.
+
+    Args:
+        name: 'auto', 'asyncio' or 'uvloop' (empty means 'auto')
+
+    Returns:
+        The loop in use ('uvloop' or 'asyncio') and a warning if the request
+        could not be honoured
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = (name or 'auto').strip().lower()
+    if name not in EVENT_LOOPS:
+        raise ValueError(f"Unknown EVENT_LOOP {name!r}, expected one of {EVENT_LOOPS}")
+    if name == 'asyncio':
+        return 'asyncio', None
+
+    try:
+        import uvloop
+    except ImportError:
+        warning = 'uvloop requested but not installed, using the asyncio loop' if name == 'uvloop' else None
+        return 'asyncio', warning
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return 'uvloop', None
+
+
+def backend_info(loop_name: str) -> Dict[str, str]:
+    """
+    Describe the event loop, JSON and compression backends and their versions.
+
+    Args:
+        loop_name: Loop returned by select_event_loop()
+
+    Returns:
+        Mapping suitable for log_startup_info()
+    """
+    if loop_name == 'uvloop':
+        import uvloop
+        loop = f'uvloop {uvloop.__version__}'
+    else:
+        loop = f'asyncio ({platform.python_implementation()} {platform.python_version()})'
+
+    if discord.utils.HAS_ORJSON:
+        import orjson
+        json_backend = f'orjson {orjson.__version__}'
+    else:
+        json_backend = 'json (stdlib)'
+
+    compression = discord.utils._ActiveDecompressionContext.COMPRESSION_TYPE
+    zstd_source = getattr(discord.utils, '_ZSTD_SOURCE', None)
+    if zstd_source == 'zstandard':
+        import zstandard
+        compression += f' (zstandard {zstandard.__version__})'
+    elif zstd_source:
+        compression += f' ({zstd_source})'
+
+    return {
+        'Event Loop': loop,
+        'JSON Backend': json_backend,
+        'Gateway Compression': compression,
+        'aiohttp Version': aiohttp.__version__,
+    }
@@ -3,14 +3,23 @@
 # This file shows how to create a cog with slash commands that can be loaded into the main bot.
 # To use this example:
 # 1. Uncomment the code below
-# 2. In bot.py, add: await bot.load_extension('example_commands')
-# 3. Restart the container
+# 2. Make sure it is listed in BOT_EXTENSIONS (it is by default)
+# 3. Save the file; with HOT_RELOAD_INTERVAL set it is loaded without a restart,
+#    otherwise restart the container
 
 """
+import logging
+from datetime import datetime, timedelta
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from auth import owner_only
+from bot_logging import get_log_buffer, tail_logs
+from bot_logging.utils import interaction_context
+from ratelimit import rate_limit
+
 class ExampleSlashCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -22,31 +31,47 @@ class ExampleSlashCommands(commands.Cog):
     async def hello_slash(self, interaction: discord.Interaction):
         '''Say hello to a user'''
         logger = self.bot.logger.getChild('commands')
-        logger.debug(f"Processing hello command for user: {interaction.user}")
-        logger.info(f'Hello slash command invoked by {interaction.user} in {interaction.guild.name if interaction.guild else "DM"}')
-        logger.info(f"Greeting user {interaction.user.display_name}")
+        logger.debug("Processing hello command for user: %s", interaction.user)
+        logger.info(
+            'Hello slash command invoked by %s in %s', interaction.user, interaction.guild.name if interaction.guild else "DM",
+            extra=interaction_context(interaction),
+        )
+        logger.info("Greeting user %s", interaction.user.display_name)
         await interaction.response.send_message(f'Hello, {interaction.user.mention}! 👋')
         logger.debug("Hello command completed successfully")
 
     @app_commands.command(name='serverinfo', description='Display server information')
+    @rate_limit(3, 10)
     async def serverinfo_slash(self, interaction: discord.Interaction):
         '''Display server information'''
         logger = self.bot.logger.getChild('commands')
-        logger.info(f'ServerInfo slash command invoked by {interaction.user} in {interaction.guild.name if interaction.guild else "DM"}')
+        logger.info(
+            'ServerInfo slash command invoked by %s in %s', interaction.user, interaction.guild.name if interaction.guild else "DM",
+            extra=interaction_context(interaction),
+        )
         
         if not interaction.guild:
             await interaction.response.send_message("This command can only be used in a server!", ephemeral=True)
             return
             
         guild = interaction.guild
+        cache = self.bot.response_cache
+        embed = cache.get('serverinfo', guild.id)
+        if embed is not None:
+            await interaction.response.send_message(embed=embed)
+            return
+        
         embed = discord.Embed(
             title=f"📋 {guild.name} Server Info",
             color=0x7289da
         )
         
+        # The owner is usually not in the member cache; fetch it on demand
+        owner = await self.bot.member_lookup.get(guild, guild.owner_id) if guild.owner_id else None
+        
         embed.add_field(name="👥 Members", value=guild.member_count, inline=True)
         embed.add_field(name="📅 Created", value=guild.created_at.strftime("%B %d, %Y"), inline=True)
-        embed.add_field(name="👑 Owner", value=guild.owner.mention if guild.owner else "Unknown", inline=True)
+        embed.add_field(name="👑 Owner", value=owner.mention if owner else "Unknown", inline=True)
         embed.add_field(name="💬 Channels", value=len(guild.channels), inline=True)
         embed.add_field(name="😀 Emojis", value=len(guild.emojis), inline=True)
         embed.add_field(name="🛡️ Verification", value=str(guild.verification_level).title(), inline=True)
@@ -54,7 +79,8 @@ class ExampleSlashCommands(commands.Cog):
         if guild.icon:
             embed.set_thumbnail(url=guild.icon.url)
         
-        logger.debug(f"Server info command: {guild.name} ({guild.member_count} members)")
+        logger.debug("Server info command: %s (%s members)", guild.name, guild.member_count, extra=interaction_context(interaction))
+        cache.set('serverinfo', guild.id, None, embed)
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name='userinfo', description='Display information about a user')
@@ -62,9 +88,22 @@ class ExampleSlashCommands(commands.Cog):
     async def userinfo_slash(self, interaction: discord.Interaction, user: discord.Member = None):
         '''Display user information'''
         logger = self.bot.logger.getChild('commands')
-        logger.info(f'UserInfo slash command invoked by {interaction.user} in {interaction.guild.name if interaction.guild else "DM"}')
+        logger.info(
+            'UserInfo slash command invoked by %s in %s', interaction.user, interaction.guild.name if interaction.guild else "DM",
+            extra=interaction_context(interaction),
+        )
         
         target_user = user or interaction.user
+        guild_id = interaction.guild.id if interaction.guild else None
+        cache = self.bot.response_cache
+        embed = cache.get('userinfo', guild_id, target_user.id)
+        if embed is not None:
+            await interaction.response.send_message(embed=embed)
+            return
+        
+        # Users resolved without guild data (e.g. not cached) are fetched on demand
+        if interaction.guild and not isinstance(target_user, discord.Member):
+            target_user = await self.bot.member_lookup.get(interaction.guild, target_user.id) or target_user
         
         embed = discord.Embed(
             title=f"👤 {target_user.display_name}",
@@ -84,13 +123,17 @@ class ExampleSlashCommands(commands.Cog):
         
         embed.set_thumbnail(url=target_user.display_avatar.url)
         
+        cache.set('userinfo', guild_id, target_user.id, embed)
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name='logtest', description='Demonstrate different log levels (admin only)')
     async def log_test_slash(self, interaction: discord.Interaction):
         '''Demonstrate different log levels with colored output'''
         logger = self.bot.logger.getChild('commands')
-        logger.info(f'LogTest slash command invoked by {interaction.user} in {interaction.guild.name if interaction.guild else "DM"}')
+        logger.info(
+            'LogTest slash command invoked by %s in %s', interaction.user, interaction.guild.name if interaction.guild else "DM",
+            extra=interaction_context(interaction),
+        )
         
         # Check if user has admin permissions
         if not interaction.user.guild_permissions.administrator:
@@ -118,74 +161,77 @@ class ExampleSlashCommands(commands.Cog):
         )
 
     @app_commands.command(name='logs', description='Show recent bot logs (owner only)')
-    @app_commands.describe(lines='Number of log lines to show (default: 10)')
-    async def logs_slash(self, interaction: discord.Interaction, lines: int = 10):
+    @app_commands.describe(
+        lines='Number of log lines to show (default: 10)',
+        level='Minimum log level to include',
+        source='Logger to show, including its children (default: bot)',
+        minutes='Only show records from the last N minutes',
+    )
+    @app_commands.choices(level=[
+        app_commands.Choice(name=name, value=name)
+        for name in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+    ])
+    @rate_limit(2, 10)
+    @owner_only()
+    async def logs_slash(
+        self,
+        interaction: discord.Interaction,
+        lines: int = 10,
+        level: str = None,
+        source: str = 'bot',
+        minutes: int = None,
+    ):
         '''Show recent bot logs (owner only)'''
         logger = self.bot.logger.getChild('commands')
-        logger.info(f'Logs slash command invoked by {interaction.user} in {interaction.guild.name if interaction.guild else "DM"}')
-        
-        # Check if user is the bot owner
-        app_info = await self.bot.application_info()
-        if interaction.user.id != app_info.owner.id:
-            logger.warning(f"Non-owner {interaction.user} tried to use logs command")
-            await interaction.response.send_message("❌ This command is only available to the bot owner.", ephemeral=True)
-            return
+        logger.info(
+            'Logs slash command invoked by %s in %s', interaction.user, interaction.guild.name if interaction.guild else "DM",
+            extra=interaction_context(interaction),
+        )
         
         lines = max(1, min(lines, 50))  # Limit between 1 and 50 lines
+        since = datetime.now() - timedelta(minutes=minutes) if minutes else None
         
         try:
-            with open('/app/data/logs/bot.log', 'r', encoding='utf-8') as f:
-                log_lines = f.readlines()
-                recent_logs = ''.join(log_lines[-lines:])
-                
-                if len(recent_logs) > 1900:  # Discord embed limit
-                    recent_logs = recent_logs[-1900:]
-                
-                embed = discord.Embed(
-                    title=f"📋 Recent Bot Logs ({lines} lines)",
-                    description=f"```\n{recent_logs}```",
-                    color=0x0099ff
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+            # Served from memory when possible, otherwise read backwards from the file
+            records = await tail_logs(
+                lines,
+                logger=source,
+                min_level=logging.getLevelName(level) if level else logging.NOTSET,
+                since=since,
+                buffer=get_log_buffer(),
+            )
+            if not records:
+                await interaction.response.send_message("❌ No matching log records found.", ephemeral=True)
+                return
+            
+            recent_logs = '\n'.join(records)
+            if len(recent_logs) > 1900:  # Discord embed limit
+                recent_logs = recent_logs[-1900:]
+            
+            embed = discord.Embed(
+                title=f"📋 Recent Logs: {source} ({len(records)} lines)",
+                description=f"```\n{recent_logs}```",
+                color=0x0099ff
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
         except FileNotFoundError:
             await interaction.response.send_message("❌ No log file found.", ephemeral=True)
         except Exception as e:
-            logger.error(f"Error reading logs: {e}")
+            logger.error("Error reading logs: %s", e)
             await interaction.response.send_message("❌ Error reading log file.", ephemeral=True)
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
         '''Log when a member joins'''
         logger = self.bot.logger.getChild('events')
-        logger.info(f"New member joined: {member} (ID: {member.id}) in {member.guild.name}")
+        logger.info(
+            "New member joined: %s (ID: %s) in %s", member, member.id, member.guild.name,
+            extra={'guild_id': member.guild.id, 'user_id': member.id},
+        )
         
-        # Optional: Send a welcome message
+        # Optional: Send a welcome message (joins arriving together share one message)
         if member.guild.system_channel:
-            embed = discord.Embed(
-                title="👋 Welcome!",
-                description=f"Welcome to {member.guild.name}, {member.mention}!",
-                color=0x00ff00
-            )
-            try:
-                await member.guild.system_channel.send(embed=embed)
-            except discord.Forbidden:
-                logger.debug("No permission to send welcome message")
-
-    @commands.Cog.listener()
-    async def on_app_command_error(self, interaction: discord.Interaction, error: Exception):
-        '''Handle slash command errors in this cog'''
-        logger = self.bot.logger.getChild('commands')
-        command_name = interaction.command.name if interaction.command else "unknown"
-        
-        if isinstance(error, app_commands.CommandOnCooldown):
-            logger.debug(f'Slash command "{command_name}" on cooldown for {interaction.user}')
-            if not interaction.response.is_done():
-                await interaction.response.send_message(
-                    f"⏰ This command is on cooldown. Try again in {error.retry_after:.1f} seconds.",
-                    ephemeral=True
-                )
-        else:
-            logger.error(f'Error in slash command "{command_name}": {error}', exc_info=True)
+            self.bot.join_aggregator.add(member)
 
 async def setup(bot):
     await bot.add_cog(ExampleSlashCommands(bot))
@@ -0,0 +1,211 @@
+"""
+Hot reload of extension modules edited in the bot volume.
+
+A background task polls the source files of the configured extensions
+(BOT_EXTENSIONS) and reloads only those that changed, keeping the gateway
+connection open. `reload_extension` restores the previously loaded version
+when the new code fails to import or set up, so a typo does not take the
+commands offline. Slash commands are re-synced only if a reload changed the
+command tree's fingerprint.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from discord.ext import commands
+
+from command_sync import fingerprint, tree_payload
+
+# Seconds between checks unless configured otherwise
+DEFAULT_INTERVAL = 2.0
+
+# (path, mtime in nanoseconds, size) of every source file of an extension
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def parse_extensions(value: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated list of extension names (e.g. the BOT_EXTENSIONS variable).
+
+    Args:
+        value: Raw value, may be empty or None
+
+    Returns:
+        Extension names in the given order, without duplicates
+    """
+    if not value:
+        return []
+    return list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+
+
+def parse_interval(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the HOT_RELOAD_INTERVAL variable.
+
+    Args:
+        value: Seconds between checks; empty, None or 0 disables hot reload
+
+    Raises:
+        ValueError: If the value is not a number or is negative
+    """
+    if not value:
+        return None
+    interval = float(value)
+    if interval < 0:
+        raise ValueError('HOT_RELOAD_INTERVAL must not be negative')
+    return interval or None
+
+
+def extension_files(name: str) -> List[str]:
+    """
+    Find the source files of an extension: its module, or every module of a package.
+
+    Args:
+        name: Dotted extension name
+
+    Returns:
+        Paths of the .py files, empty if the extension cannot be found
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return []
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        return []
+    if not spec.submodule_search_locations:
+        return [spec.origin]
+
+    files = []
+    for location in spec.submodule_search_locations:
+        for root, dirs, names in os.walk(location):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            files.extend(os.path.join(root, n) for n in names if n.endswith('.py'))
+    return sorted(files)
+
+
+def discard_bytecode(files: Iterable[str]):
+    """
+    Delete the cached bytecode of source files.
+
+    Cached bytecode is validated by the source's mtime in whole seconds and
+    its size, so a quick edit that keeps the size would otherwise be ignored.
+    """
+    for path in files:
+        try:
+            os.remove(importlib.util.cache_from_source(path))
+        except (OSError, NotImplementedError):
+            pass
+
+
+def signature(files: Iterable[str]) -> Signature:
+    """Get the modification signature of source files; missing files are left out."""
+    result = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        result.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(result)
+
+
+class ExtensionReloader:
+    """Polls extension source files and reloads the extensions that changed."""
+
+    def __init__(self, bot: commands.Bot, extensions: Iterable[str], logger: Optional[logging.Logger] = None):
+        """
+        Initialize the reloader.
+
+        Args:
+            bot: Bot the extensions are loaded into (needs a `command_syncer` attribute)
+            extensions: Extension names to watch, loaded or not
+            logger: Logger for reload results
+        """
+        self.bot = bot
+        self.extensions = list(extensions)
+        self.logger = logger or logging.getLogger('bot.reload')
+        self.reloads = 0
+        self.failures = 0
+        self._signatures: Dict[str, Signature] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: float = DEFAULT_INTERVAL):
+        """Record the current files and start polling; must be called from the event loop."""
+        if self._task is not None:
+            return
+        self._signatures = {name: signature(extension_files(name)) for name in self.extensions}
+        self._task = asyncio.get_running_loop().create_task(self._poll(interval))
+        self.logger.info('Watching %s for changes every %.1fs', ', '.join(self.extensions) or 'no extensions', interval)
+
+    def stop(self):
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def changed(self) -> List[str]:
+        """Get the extensions whose files changed since the last check, updating the stored signatures."""
+        changed = []
+        for name in self.extensions:
+            current = signature(extension_files(name))
+            if current != self._signatures.get(name):
+                self._signatures[name] = current
+                changed.append(name)
+        return changed
+
+    async def reload(self, names: Iterable[str]) -> List[str]:
+        """
+        Reload (or load, if not loaded yet) extensions and re-sync commands if they changed.
+
+        A failed reload keeps the previously loaded version running.
+
+        Args:
+            names: Extensions to reload
+
+        Returns:
+            The extensions that were reloaded successfully
+        """
+        before = fingerprint(await tree_payload(self.bot.tree))
+        reloaded = []
+        for name in names:
+            discard_bytecode(extension_files(name))
+            try:
+                if name in self.bot.extensions:
+                    await self.bot.reload_extension(name)
+                else:
+                    await self.bot.load_extension(name)
+            except commands.NoEntryPointError:
+                self.logger.info('Extension %s has no setup function, not loaded', name)
+            except commands.ExtensionError as e:
+                self.failures += 1
+                kept = 'keeping the previous version' if name in self.bot.extensions else 'not loaded'
+                self.logger.error('Failed to reload extension %s, %s: %s', name, kept, e, exc_info=e.__cause__ or e)
+            else:
+                self.reloads += 1
+                reloaded.append(name)
+                self.logger.info('Reloaded extension %s', name)
+
+        if reloaded and self.bot.command_syncer.mode != 'never':
+            after = fingerprint(await tree_payload(self.bot.tree))
+            if after != before:
+                try:
+                    await self.bot.command_syncer.sync()
+                except Exception as e:
+                    self.logger.error('Failed to sync slash commands after reload: %s', e, exc_info=True)
+            else:
+                self.logger.debug('Slash commands unchanged by the reload, skipping sync')
+        return reloaded
+
+    async def _poll(self, interval: float):
+        """Check for changes every `interval` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                names = self.changed()
+                if names:
+                    await self.reload(names)
+            except Exception as e:
+                self.logger.warning('Extension reload check failed: %s', e, exc_info=True)
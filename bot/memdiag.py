@@ -0,0 +1,264 @@
+"""
+Live memory diagnostics with tracemalloc.
+
+Tracing is off by default (it slows allocations down and uses memory of its
+own) and is started on demand or at startup with MEMORY_SNAPSHOT_INTERVAL.
+Snapshots are pickled under /app/data/memory so that two of them can be
+compared later, even after a restart; comparing them shows which source
+lines allocated the memory that was gained in between.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+from metrics import process_rss
+
+# Directory snapshots are saved to
+SNAPSHOT_DIR = '/app/data/memory'
+
+# Snapshots kept in SNAPSHOT_DIR; older ones are deleted
+MAX_SNAPSHOTS = 10
+
+# Frames recorded per allocation unless configured otherwise
+DEFAULT_FRAMES = 1
+
+SNAPSHOT_SUFFIX = '.tracemalloc'
+
+# Allocations made by the diagnostics themselves are left out of snapshots
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count, e.g. '12.3 MiB' (signed sizes keep their sign)."""
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f'{sign}{size:.0f} {unit}' if unit == 'B' else f'{sign}{size:.1f} {unit}'
+        size /= 1024
+    return f'{sign}{size:.2f} GiB'
+
+
+def cache_counts(client: discord.Client) -> Dict[str, int]:
+    """
+    Count the objects held in discord.py's caches.
+
+    Args:
+        client: Client whose connection state is inspected
+
+    Returns:
+        Mapping of model name to number of cached instances
+    """
+    state = client._connection
+    guilds = client.guilds
+    return {
+        'Guild': len(guilds),
+        'Member': sum(len(guild._members) for guild in guilds),
+        'User': len(state._users),
+        'GuildChannel': sum(len(guild._channels) for guild in guilds),
+        'Thread': sum(len(guild._threads) for guild in guilds),
+        'Role': sum(len(guild._roles) for guild in guilds),
+        'Emoji': len(state._emojis),
+        'Sticker': len(state._stickers),
+        'Message': len(state._messages) if state._messages is not None else 0,
+        'PrivateChannel': len(state._private_channels),
+    }
+
+
+class MemoryDiagnostics:
+    """Starts tracemalloc, records snapshots and compares them."""
+
+    def __init__(self, client: discord.Client, logger: Optional[logging.Logger] = None, directory: str = SNAPSHOT_DIR):
+        """
+        Initialize the diagnostics.
+
+        Args:
+            client: Client whose caches are counted
+            logger: Logger for periodic growth summaries
+            directory: Directory snapshots are saved to
+        """
+        self.client = client
+        self.logger = logger or logging.getLogger('bot.memory')
+        self.directory = directory
+        self._last_name = ''
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = DEFAULT_FRAMES) -> bool:
+        """
+        Start tracing allocations.
+
+        Args:
+            frames: Frames of traceback stored per allocation (more is slower)
+
+        Returns:
+            False if tracing was already running
+        """
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(frames)
+        self.logger.info('Started tracing memory allocations (%d frame(s))', frames)
+        return True
+
+    def stop(self):
+        """Stop tracing and the periodic snapshots, freeing the traces."""
+        self.stop_periodic()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self.logger.info('Stopped tracing memory allocations')
+
+    def snapshots(self) -> List[str]:
+        """Get the names of the saved snapshots, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(SNAPSHOT_SUFFIX)] for name in names if name.endswith(SNAPSHOT_SUFFIX))
+
+    async def take_snapshot(self) -> Tuple[str, tracemalloc.Snapshot]:
+        """
+        Take a snapshot and save it, deleting the oldest beyond MAX_SNAPSHOTS.
+
+        Returns:
+            The snapshot's name and the snapshot
+
+        Raises:
+            RuntimeError: If tracing is not running
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('Memory tracing is not running')
+
+        snapshot = tracemalloc.take_snapshot()
+        name = self._next_name()
+        snapshot = await asyncio.to_thread(self._save, name, snapshot)
+        return name, snapshot
+
+    async def load(self, name: str) -> tracemalloc.Snapshot:
+        """
+        Load a saved snapshot.
+
+        Raises:
+            FileNotFoundError: If there is no snapshot with that name
+        """
+        return await asyncio.to_thread(tracemalloc.Snapshot.load, self._path(name))
+
+    async def diff(
+        self, older: tracemalloc.Snapshot, newer: tracemalloc.Snapshot, key: str = 'lineno', limit: int = 10,
+    ) -> List[tracemalloc.StatisticDiff]:
+        """
+        Compare two snapshots.
+
+        Args:
+            older: Earlier snapshot
+            newer: Later snapshot
+            key: Grouping, 'lineno', 'filename' or 'traceback'
+            limit: Number of entries to return
+
+        Returns:
+            The entries that grew the most, largest growth first
+        """
+        stats = await asyncio.to_thread(newer.compare_to, older, key)
+        return [stat for stat in stats if stat.size_diff > 0][:limit]
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Get cheap process-wide memory figures.
+
+        Returns:
+            Mapping with rss (bytes or None), traced/peak (bytes, None when not
+            tracing), allocated_blocks, gc_counts and cache counts per model
+        """
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+        return {
+            'rss': process_rss(),
+            'traced': traced,
+            'peak': peak,
+            'allocated_blocks': sys.getallocatedblocks(),
+            'gc_counts': gc.get_count(),
+            'caches': cache_counts(self.client),
+        }
+
+    def start_periodic(self, interval: float, frames: int = DEFAULT_FRAMES):
+        """
+        Take a snapshot every `interval` seconds and log the growth since the previous one.
+
+        Must be called from the event loop; starts tracing if needed.
+        """
+        self.start(frames)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._periodic(interval))
+
+    def stop_periodic(self):
+        """Stop the periodic snapshots."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _periodic(self, interval: float):
+        """Snapshot periodically, logging the top growth."""
+        previous: Optional[tracemalloc.Snapshot] = None
+        while True:
+            await asyncio.sleep(interval)
+            if not tracemalloc.is_tracing():
+                continue
+            try:
+                name, snapshot = await self.take_snapshot()
+                if previous is not None:
+                    top = await self.diff(previous, snapshot, limit=5)
+                    rss = process_rss()
+                    self.logger.info(
+                        'Memory snapshot %s: traced %s, RSS %s, top growth:\n%s',
+                        name, format_bytes(tracemalloc.get_traced_memory()[0]),
+                        format_bytes(rss) if rss is not None else 'n/a',
+                        '\n'.join(f'  {format_bytes(stat.size_diff):>10}  {stat.traceback[0]}' for stat in top)
+                        or '  (none)',
+                    )
+                previous = snapshot
+            except Exception as e:
+                self.logger.warning('Periodic memory snapshot failed: %s', e, exc_info=True)
+
+    def _path(self, name: str) -> str:
+        """Get the file of a snapshot, refusing names that are not plain file names."""
+        if os.path.basename(name) != name or not name:
+            raise FileNotFoundError(name)
+        return os.path.join(self.directory, name + SNAPSHOT_SUFFIX)
+
+    def _next_name(self) -> str:
+        """Name a new snapshot after the current time, unique and sorting after the previous one."""
+        now = time.time()
+        name = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'-{int(now * 1000) % 1000:03d}'
+        if name <= self._last_name:
+            # Same millisecond as the previous snapshot, or the clock went back
+            base, _, count = self._last_name.partition('_')
+            name = f'{base}_{int(count or 0) + 1}'
+        self._last_name = name
+        return name
+
+    def _save(self, name: str, snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        """Filter out tracemalloc's and the import system's allocations, write the snapshot and prune old ones."""
+        snapshot = snapshot.filter_traces(_SNAPSHOT_FILTERS)
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot.dump(self._path(name))
+        for old in self.snapshots()[:-MAX_SNAPSHOTS]:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+        return snapshot
@@ -0,0 +1,354 @@
+"""
+Prometheus metrics endpoint.
+
+An optional HTTP server (enabled with METRICS_PORT) exposes the bot's
+metrics in the Prometheus text format at /metrics. Counters come from the
+existing hooks: the statistics kept from dispatched events, the logging
+decorators (command and event durations), the app_command_error event and
+the logging pipeline. Gateway latency, event loop lag and memory are
+sampled when the endpoint is scraped, so an idle bot does no extra work.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import os
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import discord
+from discord.ext import commands
+
+from bot_logging import get_log_counts
+from bot_logging.utils import add_command_observer, add_event_observer, remove_observer
+from sharding import shard_health
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Upper bounds (seconds) of the duration histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Watchdog percentile names -> quantile label values
+LAG_QUANTILES = {'p50': '0.5', 'p95': '0.95', 'p99': '0.99', 'max': '1'}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Cumulative histogram of observed values, as exported by Prometheus clients."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets: Sorted upper bounds; an implicit +Inf bucket is added
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Get (upper bound, count of values <= bound) pairs, ending with +Inf."""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            result.append((_format_value(bound), total))
+        return result
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way the text format expects."""
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    """Escape a label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    """Render a label set, e.g. {command="ping"}."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class MetricsWriter:
+    """Builds a text format exposition."""
+
+    def __init__(self, prefix: str = 'discordbot_'):
+        """
+        Initialize the writer.
+
+        Args:
+            prefix: Prepended to every metric name
+        """
+        self.prefix = prefix
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, object], float]]):
+        """
+        Add a gauge or counter.
+
+        Args:
+            name: Metric name without prefix
+            kind: 'gauge' or 'counter'
+            help_text: HELP line
+            samples: (labels, value) pairs
+        """
+        name = self.prefix + name
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            self.lines.append(f'{name}{_labels(labels)} {_format_value(value)}')
+
+    def histograms(self, name: str, help_text: str, histograms: Iterable[Tuple[Dict[str, object], Histogram]]):
+        """
+        Add a histogram family.
+
+        Args:
+            name: Metric name without prefix
+            help_text: HELP line
+            histograms: (labels, histogram) pairs
+        """
+        name = self.prefix + name
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} histogram')
+        for labels, histogram in histograms:
+            for bound, count in histogram.cumulative():
+                self.lines.append(f'{name}_bucket{_labels({**labels, "le": bound})} {count}')
+            self.lines.append(f'{name}_sum{_labels(labels)} {_format_value(histogram.sum)}')
+            self.lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+    def render(self) -> str:
+        """Get the exposition text."""
+        return '\n'.join(self.lines) + '\n'
+
+
+def process_rss() -> Optional[int]:
+    """Get the resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def measure_loop_lag() -> float:
+    """Measure how long a callback waits for its turn on the event loop, in seconds."""
+    start = time.perf_counter()
+    await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+class Metrics:
+    """Collects the bot's metrics and serves them over HTTP."""
+
+    def __init__(self, bot: discord.Client, logger: Optional[logging.Logger] = None):
+        """
+        Initialize the metrics.
+
+        Args:
+            bot: Bot whose statistics are exported (needs a `stats` attribute)
+            logger: Logger for the HTTP server
+        """
+        self.bot = bot
+        self.logger = logger or logging.getLogger('bot.metrics')
+        self.command_durations: Dict[str, Histogram] = {}
+        self.command_errors: Counter = Counter()
+        self.event_durations: Dict[str, Histogram] = {}
+        self.event_errors: Counter = Counter()
+        self._runner: Optional['web.AppRunner'] = None
+
+    def observe_command(self, name: Optional[str], duration: float, error: Optional[BaseException] = None):
+        """
+        Record the duration of a command run through the logging decorators.
+
+        `error` is not counted here: failures reach on_app_command_error or
+        observe_command_error() whether or not the command is decorated, so
+        counting them here too would count decorated commands twice.
+        """
+        name = name or 'unknown'
+        histogram = self.command_durations.get(name)
+        if histogram is None:
+            histogram = self.command_durations[name] = Histogram()
+        histogram.observe(duration)
+
+    def observe_event(self, name: str, duration: float, error: Optional[BaseException] = None):
+        """Record the duration of an event handler run through `log_event`."""
+        histogram = self.event_durations.get(name)
+        if histogram is None:
+            histogram = self.event_durations[name] = Histogram()
+        histogram.observe(duration)
+        if error is not None:
+            self.event_errors[name, type(error).__name__] += 1
+
+    async def on_app_command_error(self, interaction: discord.Interaction, error: Exception):
+        """Count a failed application command by command and error type."""
+        command = interaction.command.qualified_name if interaction.command else 'unknown'
+        error = getattr(error, 'original', error)
+        self.command_errors[command, type(error).__name__] += 1
+
+    def observe_command_error(self, ctx: commands.Context, error: commands.CommandError):
+        """
+        Count a failed prefix command by command and error type.
+
+        Called by the bot's on_command_error rather than registered as a
+        listener, since any listener silences discord.py's default report.
+        """
+        if isinstance(error, commands.CommandNotFound):
+            return
+        command = ctx.command.qualified_name if ctx.command else 'unknown'
+        error = getattr(error, 'original', error)
+        self.command_errors[command, type(error).__name__] += 1
+
+    async def start(self, host: str, port: int):
+        """
+        Start collecting decorator metrics and serving /metrics.
+
+        Args:
+            host: Address to bind
+            port: Port to bind
+        """
+        if self._runner is not None:
+            return
+        # aiohttp's server side is only imported when the endpoint is enabled
+        from aiohttp import web
+
+        add_command_observer(self.observe_command)
+        add_event_observer(self.observe_event)
+        self.bot.add_listener(self.on_app_command_error, 'on_app_command_error')
+
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.logger.info('Serving metrics on http://%s:%d/metrics', host, port)
+
+    async def stop(self):
+        """Stop the HTTP server and the decorator observers."""
+        if self._runner is None:
+            return
+        remove_observer(self.observe_command)
+        remove_observer(self.observe_event)
+        self.bot.remove_listener(self.on_app_command_error, 'on_app_command_error')
+        await self._runner.cleanup()
+        self._runner = None
+
+    async def _handle(self, request: 'web.Request') -> 'web.Response':
+        """Serve the metrics."""
+        from aiohttp import web
+
+        body = await self.render()
+        return web.Response(body=body.encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+    async def render(self) -> str:
+        """Collect every metric into the text format."""
+        lag = await measure_loop_lag()
+        bot = self.bot
+        stats = bot.stats
+        out = MetricsWriter()
+
+        out.metric('guilds', 'gauge', 'Guilds available to this process', [({}, stats.guilds)])
+        out.metric('members', 'gauge', 'Members across the guilds of this process', [({}, stats.members)])
+        out.metric('channels', 'gauge', 'Channels across the guilds of this process', [({}, stats.channels)])
+
+        health = shard_health(bot, stats.shard_guilds)
+        out.metric(
+            'gateway_latency_seconds', 'gauge', 'Heartbeat latency per shard',
+            [({'shard': shard['id']}, shard['latency']) for shard in health if shard['latency'] is not None],
+        )
+        out.metric(
+            'shard_up', 'gauge', 'Whether a shard is connected (1) or not (0)',
+            [({'shard': shard['id']}, int(shard['state'] == 'connected')) for shard in health],
+        )
+        out.metric(
+            'shard_guilds', 'gauge', 'Guilds per shard',
+            [({'shard': shard['id']}, shard['guilds']) for shard in health],
+        )
+
+        out.metric(
+            'gateway_events_total', 'counter', 'Gateway events received by type',
+            [({'type': event}, count) for event, count in sorted(stats.events.items())],
+        )
+        out.metric(
+            'commands_total', 'counter', 'Application commands invoked',
+            [({'command': command}, count) for command, count in sorted(stats.commands.items())],
+        )
+        out.metric(
+            'command_errors_total', 'counter', 'Commands that failed, by error type',
+            [({'command': command, 'error': error}, count) for (command, error), count in sorted(self.command_errors.items())],
+        )
+        out.histograms(
+            'command_duration_seconds', 'Command handler run time',
+            [({'command': command}, histogram) for command, histogram in sorted(self.command_durations.items())],
+        )
+        out.histograms(
+            'event_duration_seconds', 'Event handler run time',
+            [({'event': event}, histogram) for event, histogram in sorted(self.event_durations.items())],
+        )
+        out.metric(
+            'event_errors_total', 'counter', 'Event handlers that failed, by error type',
+            [({'event': event, 'error': error}, count) for (event, error), count in sorted(self.event_errors.items())],
+        )
+
+        responses = bot.response_cache
+        out.metric(
+            'response_cache_hits_total', 'counter', 'Command responses served from the response cache',
+            [({'command': command}, count) for command, count in sorted(responses.hits.items())],
+        )
+        out.metric(
+            'response_cache_misses_total', 'counter', 'Command responses that had to be built',
+            [({'command': command}, count) for command, count in sorted(responses.misses.items())],
+        )
+        out.metric('response_cache_invalidations_total', 'counter', 'Cached responses dropped by events', [({}, responses.invalidations)])
+        out.metric('response_cache_entries', 'gauge', 'Responses currently cached', [({}, len(responses.cache))])
+
+        welcome = bot.join_aggregator
+        out.metric('welcome_joins_total', 'counter', 'Member joins queued for a welcome message', [({}, welcome.joins)])
+        out.metric('welcome_messages_total', 'counter', 'Welcome messages sent', [({}, welcome.messages)])
+
+        log_counts = get_log_counts()
+        out.metric(
+            'log_records_total', 'counter', 'Log records passed to the logging pipeline by level',
+            [({'level': level}, count) for level, count in sorted(log_counts['logged'].items())],
+        )
+        out.metric(
+            'log_records_dropped_total', 'counter', 'Log records dropped by reason and level',
+            [
+                ({'reason': reason, 'level': level}, count)
+                for (reason, level), count in sorted(log_counts['dropped'].items())
+            ],
+        )
+
+        out.metric('event_loop_lag_seconds', 'gauge', 'Delay before a ready callback ran, sampled at scrape time', [({}, lag)])
+        watchdog = getattr(bot, 'watchdog', None)
+        if watchdog is not None:
+            recent = watchdog.percentiles() or {}
+            out.metric(
+                'event_loop_lag_quantile_seconds', 'gauge', 'Event loop lag percentiles over the recent samples',
+                [({'quantile': LAG_QUANTILES[name]}, value) for name, value in recent.items()],
+            )
+            out.metric('event_loop_stalls_total', 'counter', 'Times the event loop was blocked beyond the threshold', [({}, watchdog.stalls)])
+        rss = process_rss()
+        if rss is not None:
+            out.metric('process_resident_memory_bytes', 'gauge', 'Resident memory size', [({}, rss)])
+        out.metric('uptime_seconds', 'gauge', 'Seconds since the bot started', [({}, time.time() - stats.started_at)])
+        return out.render()
@@ -0,0 +1,494 @@
+"""
+Owner-only slash commands for operating the running bot.
+
+These commands are registered by `main()` in bot.py alongside the built-in
+commands and refuse to run for anyone but the bot owners (see auth.py).
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional
+
+import discord
+from discord import app_commands
+
+from auth import owner_only
+from bot_logging import get_log_levels, set_log_level
+from bot_logging.search import LogQuery, SearchHit, iter_search
+from bot_logging.timing import TimingRegistry, format_ns, timings
+from bot_logging.utils import interaction_context
+from memdiag import format_bytes
+from profiling import SamplingProfiler
+
+# Held while a /profile is running; profiles do not overlap
+_profile_lock = asyncio.Lock()
+
+LEVEL_CHOICES = [
+    app_commands.Choice(name=name, value=name)
+    for name in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+]
+
+
+@app_commands.command(name="loglevel", description="Show or change logger and handler levels (owner only)")
+@app_commands.describe(
+    target="Logger name (e.g. discord.gateway) or handler (console, buffer, file:bot)",
+    level="New level; omit to show the current levels",
+)
+@app_commands.choices(level=LEVEL_CHOICES)
+@owner_only()
+async def loglevel_slash(interaction: discord.Interaction, target: Optional[str] = None, level: Optional[str] = None):
+    """Show or change logging levels without a restart."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Loglevel slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    if target and level:
+        kind = set_log_level(target, logging.getLevelName(level))
+        logger.warning('%s set %s "%s" to %s', interaction.user, kind, target, level, extra=interaction_context(interaction))
+
+    levels = get_log_levels()
+    embed = discord.Embed(
+        title="🎚️ Log Levels",
+        description=f"Set {target} to **{level}**" if target and level else None,
+        color=0x0099ff
+    )
+    embed.add_field(
+        name="📜 Loggers (requested → effective)",
+        value="\n".join(f"`{name}`: {value}" for name, value in levels['loggers'].items()) or "None",
+        inline=False
+    )
+    embed.add_field(
+        name="📤 Handlers",
+        value="\n".join(f"`{name}`: {value}" for name, value in levels['handlers'].items()) or "None",
+        inline=False
+    )
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@loglevel_slash.autocomplete('target')
+async def loglevel_target_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    """Suggest known logger and handler names."""
+    # Autocomplete skips command checks
+    if not interaction.client.auth.is_owner(interaction.user):
+        return []
+    levels = get_log_levels()
+    names = [*levels['handlers'], *levels['loggers'], 'discord.gateway', 'discord.client']
+    return [
+        app_commands.Choice(name=name, value=name)
+        for name in dict.fromkeys(names)
+        if current.lower() in name.lower()
+    ][:25]
+
+
+class LogSearchView(discord.ui.View):
+    """Paginates search hits, fetching further pages from the search on demand."""
+
+    PAGE_SIZE = 10
+
+    def __init__(self, owner: discord.abc.User, hits: AsyncIterator[SearchHit], title: str):
+        super().__init__(timeout=300)
+        self.owner = owner
+        self.title = title
+        self._hits = hits
+        self._pages: List[List[SearchHit]] = []
+        self._exhausted = False
+        self.page = 0
+
+    async def fetch_page(self, page: int) -> bool:
+        """Pull hits from the search until `page` is available; False if there is no such page."""
+        while len(self._pages) <= page and not self._exhausted:
+            chunk = []
+            async for hit in self._hits:
+                chunk.append(hit)
+                if len(chunk) >= self.PAGE_SIZE:
+                    break
+            else:
+                self._exhausted = True
+            if chunk:
+                self._pages.append(chunk)
+        return page < len(self._pages)
+
+    def build_embed(self) -> discord.Embed:
+        """Render the current page."""
+        embed = discord.Embed(title=self.title, color=0x0099ff)
+        hits = self._pages[self.page] if self._pages else []
+        if not hits:
+            embed.description = "No matching log lines."
+            return embed
+
+        lines = [hit.line if len(hit.line) <= 300 else hit.line[:297] + "..." for hit in hits]
+        description = "```\n" + "\n".join(lines) + "\n```"
+        if len(description) > 4000:
+            description = description[:3990] + "\n...\n```"
+        embed.description = description
+
+        total = f"{len(self._pages)}" if self._exhausted else f"{len(self._pages)}+"
+        embed.set_footer(text=f"Page {self.page + 1}/{total}")
+        return embed
+
+    def update_buttons(self):
+        """Enable only the directions that have pages."""
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self._exhausted and self.page >= len(self._pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the user who ran the search may page through it."""
+        return interaction.user.id == self.owner.id
+
+    async def on_timeout(self):
+        """Stop the underlying search."""
+        await self._hits.aclose()
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        if await self.fetch_page(self.page + 1):
+            self.page += 1
+        self.update_buttons()
+        await interaction.edit_original_response(embed=self.build_embed(), view=self)
+
+
+@app_commands.command(name="logsearch", description="Search current and rotated log files (owner only)")
+@app_commands.describe(
+    guild_id="Guild ID mentioned in the log line",
+    user_id="User ID mentioned in the log line",
+    command="Command name, e.g. ping",
+    text="Text the log line must contain (case-sensitive)",
+    level="Minimum log level",
+    hours="Only search the last N hours",
+)
+@app_commands.choices(level=LEVEL_CHOICES)
+@owner_only()
+async def logsearch_slash(
+    interaction: discord.Interaction,
+    guild_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    command: Optional[str] = None,
+    text: Optional[str] = None,
+    level: Optional[str] = None,
+    hours: Optional[app_commands.Range[float, 0, 24 * 90]] = None,
+):
+    """Search every log segment for lines matching all given criteria."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Logsearch slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    # Snowflakes exceed the integer range Discord allows for options, so take them as text
+    try:
+        query = LogQuery(
+            guild_id=int(guild_id) if guild_id else None,
+            user_id=int(user_id) if user_id else None,
+            command=command,
+            text=text,
+            min_level=logging.getLevelName(level) if level else logging.NOTSET,
+            since=datetime.now() - timedelta(hours=hours) if hours else None,
+        )
+    except ValueError:
+        await interaction.response.send_message("❌ Guild and user IDs must be numbers.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    criteria = [
+        f"{name}={value}" for name, value in (
+            ('guild', guild_id), ('user', user_id), ('command', command),
+            ('text', text), ('level', level), ('hours', hours),
+        ) if value
+    ]
+    view = LogSearchView(interaction.user, iter_search(query), f"🔎 Log Search: {', '.join(criteria) or 'all'}")
+    await view.fetch_page(0)
+    view.update_buttons()
+    await interaction.followup.send(embed=view.build_embed(), view=view, ephemeral=True)
+
+
+def format_timing_table(registry: TimingRegistry, kind: str, max_chars: int) -> str:
+    """
+    Render per-name percentiles of every phase as a code block.
+
+    Args:
+        registry: Recorded timings
+        kind: 'command' or 'event'
+        max_chars: Maximum length of the result; rows that do not fit are left out
+
+    Returns:
+        Code block with one row per name, or an empty string if nothing was recorded
+    """
+    names = registry.names(kind)
+    if not names:
+        return ""
+
+    header = f"{'name':<16}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'1st p95':>9}{'http p95':>9}"
+    rows = []
+    for name in names:
+        total = registry.get(kind, name, 'total')
+        first = registry.get(kind, name, 'first_response')
+        http = registry.get(kind, name, 'http')
+        rows.append(
+            f"{name[:15]:<16}{total.count:>6}"
+            f"{format_ns(total.percentile(0.50)):>9}{format_ns(total.percentile(0.95)):>9}"
+            f"{format_ns(total.percentile(0.99)):>9}"
+            f"{format_ns(first.percentile(0.95) if first else None):>9}"
+            f"{format_ns(http.percentile(0.95) if http else None):>9}"
+        )
+    if len(names) > 1:
+        combined = registry.merged(kind, 'total')
+        rows.append(
+            f"{'(all)':<16}{combined.count:>6}"
+            f"{format_ns(combined.percentile(0.50)):>9}{format_ns(combined.percentile(0.95)):>9}"
+            f"{format_ns(combined.percentile(0.99)):>9}"
+        )
+
+    lines = [header]
+    length = len(header) + len("```\n\n```")
+    for row in rows:
+        if length + len(row) + 1 > max_chars:
+            break
+        lines.append(row)
+        length += len(row) + 1
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+@app_commands.command(name="perf", description="Show command and event latency percentiles (owner only)")
+@app_commands.describe(reset="Clear the recorded timings after showing them")
+@owner_only()
+async def perf_slash(interaction: discord.Interaction, reset: bool = False):
+    """Show p50/p95/p99 of total, first-response and HTTP time per command and event."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Perf slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    commands_table = format_timing_table(timings, 'command', 4000)
+    events_table = format_timing_table(timings, 'event', 1024)
+    embed = discord.Embed(
+        title="⏱️ Performance",
+        description=commands_table or "No command timings recorded yet.",
+        color=0x0099ff
+    )
+    if events_table:
+        embed.add_field(name="📡 Events", value=events_table, inline=False)
+    embed.set_footer(text="total duration percentiles · 1st = first response · http = Discord API time")
+
+    if reset:
+        timings.clear()
+        embed.description += "\n*Timings were reset.*"
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+def _code_block(lines: List[str], max_chars: int = 1024) -> str:
+    """Join lines into a code block, leaving out lines that would exceed `max_chars`."""
+    kept = []
+    length = len("```\n\n```")
+    for line in lines:
+        if length + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        length += len(line) + 1
+    return "```\n" + "\n".join(kept) + "\n```"
+
+
+def build_profile_embed(profiler: SamplingProfiler, path: str) -> discord.Embed:
+    """Summarize a finished profile."""
+    samples = max(profiler.loop_samples, 1)
+    busy = 100 * (1 - profiler.idle_samples / samples)
+    embed = discord.Embed(
+        title="🔬 Profile",
+        description=(
+            f"{profiler.samples} samples over {profiler.duration:.1f}s "
+            f"({profiler.interval * 1000:.0f}ms interval) · event loop busy {busy:.0f}% of the time"
+        ),
+        color=0x0099ff
+    )
+
+    top = profiler.top_functions(12)
+    embed.add_field(
+        name="🔥 Event loop thread (cumulative / own %)",
+        value=_code_block([
+            f"{100 * cumulative / samples:5.1f} {100 * own / samples:5.1f}  {label}"
+            for label, cumulative, own in top
+        ]) if top else "No samples",
+        inline=False
+    )
+
+    awaiting = profiler.top_awaiting(8)
+    if awaiting:
+        rounds = max(profiler.samples, 1)
+        embed.add_field(
+            name="⏳ Coroutines tasks waited in (% of samples)",
+            value=_code_block([f"{100 * count / rounds:5.1f}  {label}" for label, count in awaiting]),
+            inline=False
+        )
+
+    embed.set_footer(text=f"Collapsed stacks saved to {path}")
+    return embed
+
+
+@app_commands.command(name="profile", description="Profile the running bot for a few seconds (owner only)")
+@app_commands.describe(seconds="How long to sample, in seconds")
+@owner_only()
+async def profile_slash(interaction: discord.Interaction, seconds: app_commands.Range[int, 1, 120] = 10):
+    """Run the sampling profiler against the live event loop and attach the result."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Profile slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    if _profile_lock.locked():
+        await interaction.response.send_message("⏳ A profile is already running.", ephemeral=True)
+        return
+
+    async with _profile_lock:
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        profiler = SamplingProfiler(asyncio.get_running_loop())
+        await profiler.run(seconds)
+        path = await asyncio.to_thread(profiler.save)
+        logger.info(
+            'Profile of %.1fs with %d samples saved to %s', profiler.duration, profiler.samples, path,
+            extra=interaction_context(interaction),
+        )
+
+    await interaction.followup.send(
+        embed=build_profile_embed(profiler, path),
+        file=discord.File(path, filename=os.path.basename(path)),
+        ephemeral=True,
+    )
+
+
+memory_group = app_commands.Group(name="memory", description="Memory diagnostics with tracemalloc (owner only)")
+
+
+@memory_group.command(name="start", description="Start tracing memory allocations")
+@app_commands.describe(frames="Frames of traceback stored per allocation (default: TRACEMALLOC_FRAMES, more is slower)")
+@owner_only()
+async def memory_start_slash(interaction: discord.Interaction, frames: Optional[app_commands.Range[int, 1, 50]] = None):
+    """Start tracemalloc."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Memory start slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    if frames is None:
+        frames = interaction.client.tracemalloc_frames
+
+    if interaction.client.memory.start(frames):
+        message = f"🟢 Tracing memory allocations with {frames} frame(s). Take a `/memory snapshot` now and another later."
+    else:
+        message = "ℹ️ Memory tracing is already running."
+    await interaction.response.send_message(message, ephemeral=True)
+
+
+@memory_group.command(name="stop", description="Stop tracing memory allocations")
+@owner_only()
+async def memory_stop_slash(interaction: discord.Interaction):
+    """Stop tracemalloc and periodic snapshots."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Memory stop slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    interaction.client.memory.stop()
+    await interaction.response.send_message("🔴 Memory tracing stopped.", ephemeral=True)
+
+
+@memory_group.command(name="snapshot", description="Record a memory snapshot under /app/data")
+@owner_only()
+async def memory_snapshot_slash(interaction: discord.Interaction):
+    """Take and save a tracemalloc snapshot."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Memory snapshot slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    memory = interaction.client.memory
+    if not memory.tracing:
+        await interaction.response.send_message("❌ Memory tracing is not running, use `/memory start` first.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    name, snapshot = await memory.take_snapshot()
+    traced = sum(stat.size for stat in snapshot.statistics('filename'))
+    logger.info('Memory snapshot %s saved (%s traced)', name, format_bytes(traced), extra=interaction_context(interaction))
+    await interaction.followup.send(f"📸 Snapshot `{name}` saved ({format_bytes(traced)} traced).", ephemeral=True)
+
+
+@memory_group.command(name="diff", description="Show the top allocation growth between two snapshots")
+@app_commands.describe(
+    older="Earlier snapshot (default: the second most recent)",
+    newer="Later snapshot (default: the most recent)",
+    group_by="Group allocations by source line or by file",
+)
+@app_commands.choices(group_by=[
+    app_commands.Choice(name="file and line", value="lineno"),
+    app_commands.Choice(name="file", value="filename"),
+])
+@owner_only()
+async def memory_diff_slash(
+    interaction: discord.Interaction,
+    older: Optional[str] = None,
+    newer: Optional[str] = None,
+    group_by: str = "lineno",
+):
+    """Compare two saved snapshots."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Memory diff slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    memory = interaction.client.memory
+    names = memory.snapshots()
+    newer = newer or (names[-1] if names else None)
+    older = older or (names[-2] if len(names) > 1 else None)
+    if not older or not newer:
+        await interaction.response.send_message("❌ Two snapshots are needed, take them with `/memory snapshot`.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        top = await memory.diff(await memory.load(older), await memory.load(newer), key=group_by, limit=15)
+    except FileNotFoundError as e:
+        await interaction.followup.send(f"❌ Unknown snapshot `{e}`.", ephemeral=True)
+        return
+
+    description = f"`{older}` → `{newer}`, grouped by {'file and line' if group_by == 'lineno' else 'file'}\n"
+    lines = [f"{format_bytes(stat.size_diff):>10} {stat.count_diff:>+8}  {stat.traceback[0]}" for stat in top]
+    embed = discord.Embed(
+        title="📈 Memory Growth",
+        description=description + (_code_block(lines, max_chars=4000 - len(description)) if lines else "No growth"),
+        color=0x0099ff
+    )
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+
+@memory_diff_slash.autocomplete('older')
+@memory_diff_slash.autocomplete('newer')
+async def memory_snapshot_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    """Suggest saved snapshots, newest first."""
+    # Autocomplete skips command checks
+    if not interaction.client.auth.is_owner(interaction.user):
+        return []
+    names = reversed(interaction.client.memory.snapshots())
+    return [app_commands.Choice(name=name, value=name) for name in names if current in name][:25]
+
+
+@memory_group.command(name="stats", description="Show RSS, traced memory and cached discord.py objects")
+@owner_only()
+async def memory_stats_slash(interaction: discord.Interaction):
+    """Report memory figures and cache object counts."""
+    logger = interaction.client.logger.getChild('commands')
+    logger.info('Memory stats slash command invoked by %s', interaction.user, extra=interaction_context(interaction))
+
+    stats = interaction.client.memory.stats()
+    embed = discord.Embed(title="🧠 Memory", color=0x0099ff)
+    embed.add_field(name="RSS", value=format_bytes(stats['rss']) if stats['rss'] is not None else "n/a", inline=True)
+    embed.add_field(
+        name="Traced (peak)",
+        value=f"{format_bytes(stats['traced'])} ({format_bytes(stats['peak'])})" if stats['traced'] is not None else "Not tracing",
+        inline=True
+    )
+    embed.add_field(name="Allocated blocks", value=f"{stats['allocated_blocks']:,}", inline=True)
+    embed.add_field(
+        name="Cached objects",
+        value=_code_block([f"{name:<15}{count:>12,}" for name, count in stats['caches'].items()]),
+        inline=False
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+# Commands registered by main()
+OWNER_COMMANDS = [loglevel_slash, logsearch_slash, perf_slash, profile_slash, memory_group]
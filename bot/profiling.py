@@ -0,0 +1,222 @@
+"""
+On-demand sampling profiler for the running bot.
+
+While a profile runs, a background thread samples at a fixed interval:
+
+- the event loop thread's stack (via `sys._current_frames()`), showing what
+  the loop is executing, i.e. where CPU time goes
+- the await chain of every pending asyncio task, showing which coroutines
+  the bot is waiting in (HTTP calls, sleeps, locks...)
+
+Samples are aggregated into collapsed stacks, the input format of
+flamegraph tools (flamegraph.pl, speedscope, inferno). Nothing is installed
+while no profile runs, so there is no overhead outside a profiling window.
+"""
+
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Directory profiles are saved to
+PROFILE_DIR = '/app/data/profiles'
+
+# Profiles kept in PROFILE_DIR; older ones are deleted
+MAX_PROFILES = 20
+
+# Seconds between samples
+SAMPLE_INTERVAL = 0.01
+
+# Root frames of the two kinds of stacks in a profile
+LOOP_ROOT = '[event loop thread]'
+TASK_ROOT = '[task]'
+
+# Functions the loop thread sits in while waiting for I/O
+_IDLE_FILES = ('selectors.py',)
+
+# Generic task names end in a counter that would split identical stacks
+_TASK_NUMBER = re.compile(r'-\d+$')
+
+
+def _short_path(filename: str) -> str:
+    """Shorten a source path to its package-relative part."""
+    marker = 'site-packages' + os.sep
+    index = filename.rfind(marker)
+    if index != -1:
+        return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+
+class SamplingProfiler:
+    """Samples the event loop thread and pending tasks from a background thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = SAMPLE_INTERVAL):
+        """
+        Initialize the profiler.
+
+        Args:
+            loop: Event loop to profile
+            interval: Seconds between samples
+        """
+        self.loop = loop
+        self.interval = interval
+
+        # Collapsed stack -> number of samples
+        self.stacks: Counter = Counter()
+        # Loop thread: samples in which a function was on the stack / at the top
+        self.cumulative: Counter = Counter()
+        self.own: Counter = Counter()
+        # Tasks: samples in which some task was suspended inside a function
+        self.awaiting: Counter = Counter()
+        self.samples = 0
+        self.loop_samples = 0
+        self.idle_samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+
+        self._labels: Dict[object, str] = {}
+        self._thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start sampling; must be called from the event loop thread."""
+        self._thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.started_at is not None:
+            self.duration = time.time() - self.started_at
+
+    async def run(self, seconds: float):
+        """Profile for `seconds`, then stop; must be awaited on the profiled loop."""
+        self.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(self.stop)
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int, int]]:
+        """
+        Get the functions the loop thread spent the most time in.
+
+        Frames present in every sample (the loop's own entry points) are left out.
+
+        Returns:
+            (function, cumulative samples, own samples) sorted by cumulative samples
+        """
+        top = [
+            (label, count, self.own[label])
+            for label, count in self.cumulative.most_common()
+            if count < self.loop_samples
+        ]
+        return top[:limit]
+
+    def top_awaiting(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the coroutines tasks were most often suspended in.
+
+        Returns:
+            (function, samples with at least one task inside it), most frequent first
+        """
+        return self.awaiting.most_common(limit)
+
+    def collapsed(self) -> str:
+        """Render the samples as collapsed stacks ("frame;frame;frame count" per line)."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def save(self, directory: str = PROFILE_DIR) -> str:
+        """
+        Write the collapsed stacks to a file, deleting the oldest profiles beyond MAX_PROFILES.
+
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at or time.time()))
+        path = os.path.join(directory, f'profile-{stamp}.folded')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+
+        profiles = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.folded')
+        )
+        for old in profiles[:-MAX_PROFILES]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return path
+
+    def _run(self):
+        """Sample until stopped."""
+        while not self._stop.wait(self.interval):
+            self._sample_loop_thread()
+            self._sample_tasks()
+            self.samples += 1
+
+    def _label(self, code) -> str:
+        """Get a readable, cached name for a code object."""
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f'{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+        return label
+
+    def _sample_loop_thread(self):
+        """Record the loop thread's current stack."""
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        self.loop_samples += 1
+        if codes[0].co_filename.endswith(_IDLE_FILES):
+            self.idle_samples += 1
+
+        labels = [self._label(code) for code in reversed(codes)]
+        self.stacks[';'.join([LOOP_ROOT, *labels])] += 1
+        for label in set(labels):
+            self.cumulative[label] += 1
+        self.own[labels[-1]] += 1
+
+    def _sample_tasks(self):
+        """Record the await chain of every pending task."""
+        try:
+            tasks = asyncio.all_tasks(self.loop)
+        except RuntimeError:
+            # The task set changed while being copied; skip this sample
+            return
+
+        seen = set()
+        for task in tasks:
+            labels = []
+            awaitable = task.get_coro()
+            while awaitable is not None:
+                frame = getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'gi_frame', None)
+                if frame is None:
+                    break
+                labels.append(self._label(frame.f_code))
+                awaitable = getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'gi_yieldfrom', None)
+            if not labels:
+                continue
+
+            name = _TASK_NUMBER.sub('', task.get_name())
+            self.stacks[';'.join([f'{TASK_ROOT} {name}', *labels])] += 1
+            seen.update(labels)
+        for label in seen:
+            self.awaiting[label] += 1
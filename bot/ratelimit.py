@@ -0,0 +1,219 @@
+"""
+Rate limits for application commands.
+
+Limits are token buckets of `rate` uses per `per` seconds, kept per user,
+guild, channel or globally. Each bucket is stored as a single float, the
+time at which it will be full again (the generic cell rate algorithm), in
+an insertion-ordered dict. Buckets that have refilled are indistinguishable
+from absent ones and are evicted from the front of the dict as new uses
+come in, so memory follows the number of recently active keys rather than
+every user ever seen; `max_keys` caps it regardless.
+
+Limits are declared on a command with the `rate_limit()` check, or in the
+RATE_LIMITS variable, which the command tree enforces before any check or
+argument conversion runs. Both reject with `CommandOnCooldown`, answered by
+the global error handler.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+# What a bucket is kept per
+SCOPES = ('user', 'guild', 'channel', 'global')
+
+# Buckets kept per limit; the least recently used are dropped beyond it
+MAX_KEYS = 100_000
+
+# Commands a RATE_LIMITS entry named '*' applies to
+ALL_COMMANDS = '*'
+
+# Tolerance for float rounding when a bucket has exactly one token left
+_EPSILON = 1e-9
+
+
+def scope_key(interaction: discord.Interaction, scope: str) -> int:
+    """Get the bucket key of an interaction; DMs count as their own guild and channel."""
+    if scope == 'user':
+        return interaction.user.id
+    if scope == 'guild':
+        return interaction.guild_id or interaction.user.id
+    if scope == 'channel':
+        return interaction.channel_id or interaction.user.id
+    return 0
+
+
+class RateLimiter:
+    """Token buckets of one limit, keyed by user, guild or channel ID."""
+
+    def __init__(self, rate: int, per: float, scope: str = 'user', max_keys: int = MAX_KEYS):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Uses allowed in a burst
+            per: Seconds to refill the whole burst
+            scope: One of SCOPES
+            max_keys: Maximum number of buckets kept
+
+        Raises:
+            ValueError: If the limit or scope is invalid
+        """
+        if rate < 1 or per <= 0:
+            raise ValueError(f'Invalid rate limit {rate}/{per}s')
+        if scope not in SCOPES:
+            raise ValueError(f'Unknown rate limit scope {scope!r}, expected one of {SCOPES}')
+        self.rate = rate
+        self.per = per
+        self.scope = scope
+        self.max_keys = max_keys
+        self.cooldown = app_commands.Cooldown(rate, per)
+        # Seconds one use takes to refill
+        self._interval = per / rate
+        # key -> time the bucket is full again, least recently used first
+        self._full_at: 'OrderedDict[int, float]' = OrderedDict()
+
+    def retry_after(self, key: int, now: float) -> float:
+        """Get the seconds until `key` may use the limit again, 0 if it may now."""
+        full_at = self._full_at.get(key, now)
+        wait = max(full_at, now) + self._interval - now - self.per
+        return wait if wait > _EPSILON else 0.0
+
+    def consume(self, key: int, now: float):
+        """Record a use by `key` (after retry_after() returned 0)."""
+        full_at = self._full_at.pop(key, now)
+        self._full_at[key] = max(full_at, now) + self._interval
+        self._evict(now)
+
+    def hit(self, key: int, now: Optional[float] = None) -> float:
+        """
+        Use the limit if allowed.
+
+        Returns:
+            0 if the use was allowed, otherwise the seconds to wait
+        """
+        now = time.monotonic() if now is None else now
+        wait = self.retry_after(key, now)
+        if not wait:
+            self.consume(key, now)
+        return wait
+
+    def _evict(self, now: float):
+        """Drop refilled buckets from the least recently used end, and any beyond max_keys."""
+        buckets = self._full_at
+        while buckets:
+            key, full_at = next(iter(buckets.items()))
+            if full_at > now and len(buckets) <= self.max_keys:
+                break
+            del buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+
+class RateLimits:
+    """Configured limits per command name, checked together."""
+
+    def __init__(self, limits: Optional[Dict[str, List[RateLimiter]]] = None):
+        """
+        Initialize the limits.
+
+        Args:
+            limits: Limiters per qualified command name; '*' applies to every command
+        """
+        self.limits = limits or {}
+        self.rejected = 0
+
+    def check(self, interaction: discord.Interaction):
+        """
+        Use every limit applying to the interaction's command.
+
+        Nothing is used unless every limit allows the interaction.
+
+        Raises:
+            app_commands.CommandOnCooldown: If a limit is exhausted
+        """
+        if not self.limits or interaction.command is None:
+            return
+        limiters = self.limits.get(interaction.command.qualified_name, []) + self.limits.get(ALL_COMMANDS, [])
+        if not limiters:
+            return
+        try:
+            enforce(interaction, limiters)
+        except app_commands.CommandOnCooldown:
+            self.rejected += 1
+            raise
+
+
+def enforce(interaction: discord.Interaction, limiters: List[RateLimiter]):
+    """
+    Use every limiter for an interaction, or none of them.
+
+    Raises:
+        app_commands.CommandOnCooldown: With the longest wait, if any limiter is exhausted
+    """
+    now = time.monotonic()
+    keys = [(limiter, scope_key(interaction, limiter.scope)) for limiter in limiters]
+    worst: Tuple[float, Optional[RateLimiter]] = (0.0, None)
+    for limiter, key in keys:
+        wait = limiter.retry_after(key, now)
+        if wait > worst[0]:
+            worst = (wait, limiter)
+    if worst[1] is not None:
+        raise app_commands.CommandOnCooldown(worst[1].cooldown, worst[0])
+    for limiter, key in keys:
+        limiter.consume(key, now)
+
+
+def rate_limit(rate: int, per: float, scope: str = 'user', max_keys: int = MAX_KEYS):
+    """
+    Limit an application command to `rate` uses per `per` seconds per scope.
+
+    Args:
+        rate: Uses allowed in a burst
+        per: Seconds to refill the whole burst
+        scope: 'user', 'guild', 'channel' or 'global'
+        max_keys: Maximum number of buckets kept
+
+    Raises:
+        app_commands.CommandOnCooldown: From the check, when the limit is exhausted
+    """
+    limiter = RateLimiter(rate, per, scope, max_keys)
+
+    def predicate(interaction: discord.Interaction) -> bool:
+        enforce(interaction, [limiter])
+        return True
+
+    return app_commands.check(predicate)
+
+
+def parse_rate_limits(value: Optional[str]) -> Dict[str, List[RateLimiter]]:
+    """
+    Parse the RATE_LIMITS variable.
+
+    Entries are separated by commas and look like `command=rate/seconds` or
+    `command=rate/seconds:scope` (scope defaults to user), e.g.
+    `serverinfo=3/10,logs=1/5:channel,*=20/10`. A command may have several
+    entries; `*` applies to every command and shares its buckets between them.
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits: Dict[str, List[RateLimiter]] = {}
+    if not value:
+        return limits
+    for entry in value.replace(' ', '').split(','):
+        if not entry:
+            continue
+        try:
+            command, spec = entry.split('=', 1)
+            spec, _, scope = spec.partition(':')
+            rate, per = spec.split('/', 1)
+            limiter = RateLimiter(int(rate), float(per.rstrip('s')), scope or 'user')
+        except ValueError as e:
+            raise ValueError(f'Invalid RATE_LIMITS entry {entry!r} ({e}), expected command=rate/seconds[:scope]') from None
+        limits.setdefault(command.lstrip('/'), []).append(limiter)
+    return limits
@@ -0,0 +1,163 @@
+"""
+Shard configuration and health reporting.
+
+Sharding is opt-in through the SHARD_COUNT and SHARD_IDS environment
+variables. The health helpers work for both the single-connection and the
+auto-sharded bot, so commands can report per-connection state either way.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import discord
+
+# Maximum shard lines rendered into a single embed field
+MAX_SHARD_LINES = 15
+
+STATE_EMOJIS = {
+    'connected': '🟢',
+    'rate limited': '🟡',
+    'connecting': '🟡',
+    'disconnected': '🔴',
+}
+
+
+def parse_shard_ids(value: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse shard IDs given as a comma-separated list with optional ranges.
+
+    Args:
+        value: Raw value such as "0,1,4-7", may be empty or None
+
+    Returns:
+        Sorted shard IDs, or None if no IDs were given
+    """
+    if not value:
+        return None
+
+    shard_ids = set()
+    for part in value.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            shard_ids.update(range(int(start), int(end) + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+def parse_shard_config(count: Optional[str], ids: Optional[str]) -> Tuple[bool, Optional[int], Optional[List[int]]]:
+    """
+    Resolve the sharding options from the SHARD_COUNT and SHARD_IDS variables.
+
+    Args:
+        count: "auto", a number of shards, or empty to disable sharding
+        ids: Shard IDs run by this process (requires a numeric count)
+
+    Returns:
+        Tuple of (sharded, shard_count or None for auto, shard_ids or None for all)
+
+    Raises:
+        ValueError: If the values are malformed or inconsistent
+    """
+    count = (count or '').strip().lower()
+    shard_ids = parse_shard_ids(ids)
+
+    if not count:
+        if shard_ids is not None:
+            raise ValueError('SHARD_IDS requires SHARD_COUNT to be set')
+        return False, None, None
+
+    if count == 'auto':
+        if shard_ids is not None:
+            raise ValueError('SHARD_IDS requires a numeric SHARD_COUNT, not "auto"')
+        return True, None, None
+
+    shard_count = int(count)
+    if shard_count < 1:
+        raise ValueError('SHARD_COUNT must be at least 1')
+    if shard_ids is not None and any(shard_id >= shard_count for shard_id in shard_ids):
+        raise ValueError(f'SHARD_IDS must be lower than SHARD_COUNT ({shard_count})')
+    return True, shard_count, shard_ids
+
+
+def format_latency(latency: Optional[float]) -> str:
+    """Format a latency in seconds as milliseconds; unknown (None, NaN, inf) becomes "n/a"."""
+    if latency is None or not math.isfinite(latency):
+        return "n/a"
+    return f"{round(latency * 1000)}ms"
+
+
+def shard_health(client: discord.Client, guild_counts: Optional[Mapping[int, int]] = None) -> List[Dict]:
+    """
+    Get the health of every connection of a client.
+
+    Args:
+        client: A Client or AutoShardedClient
+        guild_counts: Guilds per shard ID if already known; counted from the cache otherwise
+
+    Returns:
+        One dict per shard with id, latency (seconds, None if unknown), guilds and state
+    """
+    if guild_counts is None:
+        guild_counts = Counter(guild.shard_id for guild in client.guilds)
+
+    if isinstance(client, discord.AutoShardedClient):
+        shards = [
+            (shard_id, shard.latency, shard.is_closed(), shard.is_ws_ratelimited())
+            for shard_id, shard in sorted(client.shards.items())
+        ]
+    else:
+        shards = [(client.shard_id or 0, client.latency, client.is_closed(), client.is_ws_ratelimited())]
+
+    health = []
+    for shard_id, latency, closed, ratelimited in shards:
+        if closed:
+            state = 'disconnected'
+        elif ratelimited:
+            state = 'rate limited'
+        elif not math.isfinite(latency):
+            state = 'connecting'
+        else:
+            state = 'connected'
+        health.append({
+            'id': shard_id,
+            'latency': latency if math.isfinite(latency) else None,
+            'guilds': guild_counts.get(shard_id, 0),
+            'state': state,
+        })
+    return health
+
+
+def format_shard_health(health: List[Dict], limit: int = MAX_SHARD_LINES) -> str:
+    """
+    Render shard health as embed field text, one line per shard.
+
+    Unhealthy shards are listed first so they are never cut off.
+
+    Args:
+        health: Result of shard_health()
+        limit: Maximum number of lines
+
+    Returns:
+        Field text
+    """
+    ordered = sorted(health, key=lambda shard: (shard['state'] == 'connected', shard['id']))
+    lines = []
+    for shard in ordered[:limit]:
+        lines.append(
+            f"{STATE_EMOJIS.get(shard['state'], '⚪')} `#{shard['id']}` {format_latency(shard['latency'])} · "
+            f"{shard['guilds']} guilds · {shard['state']}"
+        )
+    if len(ordered) > limit:
+        lines.append(f"…and {len(ordered) - limit} more")
+    return "\n".join(lines) or "No shards"
+
+
+def interaction_shard_id(interaction: discord.Interaction) -> int:
+    """Get the shard that received an interaction (0 for DMs)."""
+    if interaction.guild_id is None:
+        return 0
+    return (interaction.guild_id >> 22) % (interaction.client.shard_count or 1)
@@ -0,0 +1,65 @@
+"""
+Startup timeline.
+
+Records how long each startup phase takes (imports, logging setup, login,
+setup_hook, command sync, READY) so regressions in the time to ready show
+up in the logs. Import this module before discord.py so the import phase
+covers the library.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+# When the first bot module started importing its dependencies
+IMPORTS_STARTED = time.perf_counter()
+
+
+def _format_seconds(seconds: float) -> str:
+    """Format a phase duration, e.g. '850ms' or '2.31s'."""
+    if seconds < 1:
+        return f'{seconds * 1000:.0f}ms'
+    return f'{seconds:.2f}s'
+
+
+class StartupTimeline:
+    """Named marks in the order startup reached them."""
+
+    def __init__(self, started: float = IMPORTS_STARTED):
+        """
+        Initialize the timeline.
+
+        Args:
+            started: perf_counter() value startup is measured from
+        """
+        self.started = started
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        """Record the end of a phase; later marks of the same phase are ignored."""
+        if phase not in self:
+            self.marks.append((phase, time.perf_counter()))
+
+    def __contains__(self, phase: str) -> bool:
+        return any(name == phase for name, _ in self.marks)
+
+    def elapsed(self, phase: Optional[str] = None) -> Optional[float]:
+        """Get the seconds from the start until a phase ended (the last phase by default)."""
+        for name, at in reversed(self.marks):
+            if phase is None or name == phase:
+                return at - self.started
+        return None
+
+    def summary(self) -> Dict[str, str]:
+        """
+        Describe each phase for log_startup_info().
+
+        Returns:
+            Mapping of phase to its duration and the time since the start,
+            e.g. {'Login': '420ms (at 1.52s)'}
+        """
+        result = {}
+        previous = self.started
+        for name, at in self.marks:
+            result[name] = f'{_format_seconds(at - previous)} (at {_format_seconds(at - self.started)})'
+            previous = at
+        return result
@@ -0,0 +1,190 @@
+"""
+Incrementally maintained bot statistics.
+
+Counters are updated synchronously as events are dispatched, so reading them
+is O(1) no matter how many guilds or members the bot sees. Per-guild
+contributions are remembered so that re-announced guilds (e.g. a guild
+becoming available again) never count twice, and a background task
+periodically reconciles the totals with the library cache.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import discord
+
+# Seconds between background reconciliations with the library cache
+RECONCILE_INTERVAL = 600.0
+
+# Guilds processed between yields to the event loop while reconciling
+RECONCILE_BATCH = 1000
+
+
+class BotStats:
+    """O(1) counters for guilds, members, channels, commands and gateway events."""
+
+    def __init__(self, client: discord.Client, logger: Optional[logging.Logger] = None):
+        """
+        Initialize the stats.
+
+        Args:
+            client: Client whose events and cache are tracked
+            logger: Logger for reconciliation results
+        """
+        self.client = client
+        self.logger = logger or logging.getLogger('bot.stats')
+        self.started_at = time.time()
+
+        self.guilds = 0
+        self.members = 0
+        self.channels = 0
+        self.shard_guilds: Counter = Counter()
+        self.commands: Counter = Counter()
+        self.commands_total = 0
+        self.events: Counter = Counter()
+        self.events_total = 0
+
+        # guild ID -> (members, channels, shard ID) currently counted for it
+        self._per_guild: Dict[int, Tuple[int, int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Event name -> handler, looked up once per dispatch
+        self._handlers = {
+            'socket_event_type': self._on_socket_event_type,
+            'interaction': self._on_interaction,
+            'guild_join': self._track,
+            'guild_available': self._track,
+            'guild_remove': self._on_guild_remove,
+            'member_join': self._on_member,
+            'raw_member_remove': self._on_raw_member_remove,
+            'guild_channel_create': self._on_channel,
+            'guild_channel_delete': self._on_channel,
+            'ready': self._on_ready,
+        }
+
+    def on_dispatch(self, event: str, args: tuple):
+        """Update the counters for a dispatched event; called before any listener runs."""
+        handler = self._handlers.get(event)
+        if handler is not None:
+            handler(*args)
+
+    def start(self):
+        """Start periodic reconciliation; must be called from the event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._reconcile_loop())
+
+    def stop(self):
+        """Stop periodic reconciliation."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> dict:
+        """Get the current counters."""
+        return {
+            'guilds': self.guilds,
+            'members': self.members,
+            'channels': self.channels,
+            'commands': self.commands_total,
+            'events': self.events_total,
+            'uptime': time.time() - self.started_at,
+        }
+
+    def reconcile(self):
+        """Recompute every counter from the library cache (O(guilds), blocking)."""
+        self._per_guild.clear()
+        self.guilds = self.members = self.channels = 0
+        self.shard_guilds.clear()
+        for guild in self.client.guilds:
+            self._track(guild)
+
+    async def reconcile_async(self):
+        """Recompute every counter from the library cache, yielding to the event loop between batches."""
+        per_guild: Dict[int, Tuple[int, int, int]] = {}
+        for index, guild in enumerate(self.client.guilds):
+            per_guild[guild.id] = self._contribution(guild)
+            if index % RECONCILE_BATCH == RECONCILE_BATCH - 1:
+                await asyncio.sleep(0)
+
+        # Guilds joined or left while yielding were tracked incrementally; keep those
+        for guild_id in list(per_guild):
+            if guild_id not in self._per_guild and self.client.get_guild(guild_id) is None:
+                del per_guild[guild_id]
+        for guild_id, contribution in self._per_guild.items():
+            if guild_id not in per_guild and self.client.get_guild(guild_id) is not None:
+                per_guild[guild_id] = contribution
+
+        guilds = len(per_guild)
+        members = sum(members for members, _, _ in per_guild.values())
+        channels = sum(channels for _, channels, _ in per_guild.values())
+        drift = (guilds - self.guilds, members - self.members, channels - self.channels)
+        if any(drift):
+            self.logger.debug('Stats reconciled, drift guilds=%+d members=%+d channels=%+d', *drift)
+
+        self._per_guild = per_guild
+        self.guilds, self.members, self.channels = guilds, members, channels
+        self.shard_guilds = Counter(shard_id for _, _, shard_id in per_guild.values())
+
+    async def _reconcile_loop(self):
+        """Reconcile periodically."""
+        while True:
+            await asyncio.sleep(RECONCILE_INTERVAL)
+            try:
+                await self.reconcile_async()
+            except Exception as e:
+                self.logger.warning('Stats reconciliation failed: %s', e, exc_info=True)
+
+    @staticmethod
+    def _contribution(guild: discord.Guild) -> Tuple[int, int, int]:
+        """Get what a guild adds to the counters."""
+        return guild.member_count or 0, len(guild.channels), guild.shard_id
+
+    def _track(self, guild: discord.Guild):
+        """Count a guild, replacing what was previously counted for it."""
+        old = self._per_guild.get(guild.id)
+        new = self._contribution(guild)
+        self._per_guild[guild.id] = new
+        if old is None:
+            self.guilds += 1
+            self.shard_guilds[new[2]] += 1
+            old = (0, 0, new[2])
+        self.members += new[0] - old[0]
+        self.channels += new[1] - old[1]
+
+    def _untrack(self, guild_id: int):
+        """Stop counting a guild."""
+        old = self._per_guild.pop(guild_id, None)
+        if old is not None:
+            self.guilds -= 1
+            self.members -= old[0]
+            self.channels -= old[1]
+            self.shard_guilds[old[2]] -= 1
+
+    def _on_socket_event_type(self, event_type: str):
+        self.events[event_type] += 1
+        self.events_total += 1
+
+    def _on_interaction(self, interaction: discord.Interaction):
+        if interaction.type is discord.InteractionType.application_command:
+            self.commands[interaction.data.get('name', 'unknown')] += 1
+            self.commands_total += 1
+
+    def _on_guild_remove(self, guild: discord.Guild):
+        self._untrack(guild.id)
+
+    def _on_member(self, member: discord.Member):
+        self._track(member.guild)
+
+    def _on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        guild = self.client.get_guild(payload.guild_id)
+        if guild is not None:
+            self._track(guild)
+
+    def _on_channel(self, channel: discord.abc.GuildChannel):
+        self._track(channel.guild)
+
+    def _on_ready(self):
+        self.reconcile()
@@ -0,0 +1,176 @@
+"""
+Event loop lag monitor and blocked-loop detector.
+
+A task on the event loop wakes up at a fixed interval and records how late
+it was scheduled; the samples give lag percentiles. A separate thread
+watches the task's heartbeat: when the loop stops turning for longer than a
+threshold, it captures the loop thread's current stack with
+`sys._current_frames()`, which points at the callback or coroutine that is
+blocking (a synchronous `open()`, a CPU-heavy loop, a blocking lock...).
+Long stalls delay gateway heartbeats and are the usual cause of
+heartbeat-timeout disconnects.
+"""
+
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Seconds between lag measurements
+DEFAULT_INTERVAL = 0.5
+
+# Seconds the loop may be blocked before its stack is logged
+DEFAULT_THRESHOLD = 0.25
+
+# Lag samples kept for percentiles (10 minutes at the default interval)
+DEFAULT_WINDOW = 1200
+
+# Innermost frames of the loop thread included in a stall report
+STACK_LIMIT = 25
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Get a percentile by the nearest-rank method.
+
+    Args:
+        sorted_values: Values in ascending order (must not be empty)
+        fraction: Percentile as a fraction, e.g. 0.99
+
+    Returns:
+        The smallest value with at least `fraction` of the values at or below it
+    """
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoopWatchdog:
+    """Measures event loop lag and reports what blocks the loop."""
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        interval: float = DEFAULT_INTERVAL,
+        threshold: float = DEFAULT_THRESHOLD,
+        window: int = DEFAULT_WINDOW,
+    ):
+        """
+        Initialize the watchdog.
+
+        Args:
+            logger: Logger for stall reports
+            interval: Seconds between lag measurements
+            threshold: Seconds the loop may be blocked before its stack is logged
+            window: Number of recent lag samples kept for percentiles
+        """
+        self.logger = logger or logging.getLogger('bot.watchdog')
+        self.interval = interval
+        self.threshold = threshold
+
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stall: Optional[Dict] = None
+
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start measuring; must be called from the event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._thread = threading.Thread(target=self._monitor, name='loop-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop measuring."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._thread = None
+
+    def percentiles(self) -> Optional[Dict[str, float]]:
+        """
+        Get lag percentiles over the recent samples.
+
+        Returns:
+            Mapping with p50, p95, p99 and max (seconds), or None before the first sample
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return {
+            'p50': percentile(ordered, 0.50),
+            'p95': percentile(ordered, 0.95),
+            'p99': percentile(ordered, 0.99),
+            'max': ordered[-1],
+        }
+
+    async def _measure(self):
+        """Record how late each wake-up is and refresh the heartbeat."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            self._heartbeat = time.monotonic()
+
+    def _monitor(self):
+        """Watch the heartbeat from a separate thread and report stalls."""
+        # A heartbeat older than this means the loop has not run for `threshold`
+        limit = self.interval + self.threshold
+        poll = min(self.interval, self.threshold) / 2
+        stall_started: Optional[float] = None
+        stack: List[str] = []
+
+        while not self._stopped.wait(poll):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+
+            if stall_started is None:
+                if blocked >= self.threshold:
+                    stall_started = heartbeat + self.interval
+                    stack = self._loop_stack()
+                    self.stalls += 1
+                    self.logger.warning(
+                        'Event loop blocked for %.0fms so far, loop thread stack:\n%s',
+                        blocked * 1000, ''.join(stack).rstrip(),
+                    )
+            elif time.monotonic() - heartbeat < limit:
+                # The loop turned again; heartbeat is when the blocked callback finished
+                duration = heartbeat - stall_started
+                self.last_stall = {
+                    'at': time.time() - (time.monotonic() - stall_started),
+                    'duration': duration,
+                    'where': stack[-1].strip().splitlines()[0] if stack else 'unknown',
+                }
+                self.logger.warning(
+                    'Event loop was blocked for %.0fms (%s)', duration * 1000, self.last_stall['where'],
+                )
+                stall_started = None
+
+    def _loop_stack(self) -> List[str]:
+        """Format the current stack of the event loop thread, innermost frame last."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return []
+        try:
+            return traceback.format_stack(frame, limit=STACK_LIMIT)
+        finally:
+            del frame
@@ -0,0 +1,181 @@
+"""
+Coalesced welcome messages.
+
+Member joins are buffered per guild and flushed after a short window as a
+single welcome message that mentions up to `max_mentions` of the new members
+and summarizes the rest ("+K more"). When more members join than can be
+mentioned, the mentioned ones are a uniform random sample of the window's
+joins (reservoir sampling), so later joins are as likely to be mentioned as
+the first ones. When a guild receives more than `sample_threshold` joins in
+one window (a raid or a large invite wave), its window doubles for each
+busy window (up to `max_window`), returning to normal after a quiet one.
+Outgoing requests stay at about one per guild per window however fast
+members join.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Dict, List, Optional, Set
+
+import discord
+
+# Seconds joins are collected before a welcome message is sent
+DEFAULT_WINDOW = 5.0
+
+# Longest window while a guild is being flooded
+MAX_WINDOW = 60.0
+
+# New members mentioned per message
+DEFAULT_MAX_MENTIONS = 10
+
+# Joins per window above which a guild's window grows
+DEFAULT_SAMPLE_THRESHOLD = 50
+
+
+class _Batch:
+    """Joins of one guild waiting to be welcomed."""
+
+    __slots__ = ('guild', 'members', 'count')
+
+    def __init__(self, guild: discord.Guild):
+        self.guild = guild
+        self.members: List[discord.Member] = []
+        self.count = 0
+
+
+def welcome_options(
+    window: Optional[str] = None, max_mentions: Optional[str] = None, sample_threshold: Optional[str] = None,
+) -> Dict[str, float]:
+    """
+    Build JoinAggregator keyword arguments from the WELCOME_* variables; unset values keep the defaults.
+
+    Raises:
+        ValueError: If a value is malformed or out of range
+    """
+    options = {}
+    if window:
+        options['window'] = float(window)
+        if options['window'] <= 0:
+            raise ValueError('WELCOME_WINDOW must be positive')
+    if max_mentions:
+        options['max_mentions'] = int(max_mentions)
+        if options['max_mentions'] < 0:
+            raise ValueError('WELCOME_MAX_MENTIONS must not be negative')
+    if sample_threshold:
+        options['sample_threshold'] = int(sample_threshold)
+        if options['sample_threshold'] < 0:
+            raise ValueError('WELCOME_SAMPLE_THRESHOLD must not be negative')
+    return options
+
+
+class JoinAggregator:
+    """Buffers member joins per guild and sends one welcome message per window."""
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        window: float = DEFAULT_WINDOW,
+        max_mentions: int = DEFAULT_MAX_MENTIONS,
+        sample_threshold: int = DEFAULT_SAMPLE_THRESHOLD,
+        max_window: float = MAX_WINDOW,
+    ):
+        """
+        Initialize the aggregator.
+
+        Args:
+            logger: Logger for send failures and floods
+            window: Seconds joins are collected before flushing
+            max_mentions: New members mentioned per message
+            sample_threshold: Joins per window above which the window grows
+            max_window: Upper bound of the grown window
+        """
+        self.logger = logger or logging.getLogger('bot.welcome')
+        self.window = window
+        self.max_mentions = max_mentions
+        self.sample_threshold = sample_threshold
+        self.max_window = max(max_window, window)
+        self.joins = 0
+        self.messages = 0
+        self._batches: Dict[int, _Batch] = {}
+        # Guilds in sampling mode -> their current window
+        self._windows: Dict[int, float] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add(self, member: discord.Member):
+        """Queue a welcome for a member who joined; must be called from the event loop."""
+        guild = member.guild
+        batch = self._batches.get(guild.id)
+        if batch is None:
+            batch = self._batches[guild.id] = _Batch(guild)
+            window = self._windows.get(guild.id, self.window)
+            self._timers[guild.id] = asyncio.get_running_loop().call_later(window, self._start_flush, guild.id)
+
+        batch.count += 1
+        self.joins += 1
+        if len(batch.members) < self.max_mentions:
+            batch.members.append(member)
+        else:
+            # Reservoir sampling: each join replaces a mentioned member with probability max_mentions / count
+            index = random.randrange(batch.count)
+            if index < self.max_mentions:
+                batch.members[index] = member
+
+    async def flush(self, guild_id: int):
+        """Send the pending welcome message of a guild now."""
+        timer = self._timers.pop(guild_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(guild_id, None)
+        if batch is None:
+            return
+
+        if batch.count > self.sample_threshold:
+            window = min(self._windows.get(guild_id, self.window) * 2, self.max_window)
+            if guild_id not in self._windows:
+                self.logger.warning(
+                    '%d members joined %s within %gs, batching welcome messages', batch.count, batch.guild.name,
+                    self.window, extra={'guild_id': guild_id},
+                )
+            self._windows[guild_id] = window
+        else:
+            self._windows.pop(guild_id, None)
+
+        channel = batch.guild.system_channel
+        if channel is None:
+            return
+        try:
+            await channel.send(embed=self.build_embed(batch))
+            self.messages += 1
+        except discord.Forbidden:
+            self.logger.debug('No permission to send welcome message', extra={'guild_id': guild_id})
+        except discord.HTTPException as e:
+            self.logger.warning('Failed to send welcome message: %s', e, extra={'guild_id': guild_id})
+
+    def build_embed(self, batch: _Batch) -> discord.Embed:
+        """Build the welcome message of a batch."""
+        mentions = ', '.join(member.mention for member in batch.members)
+        others = batch.count - len(batch.members)
+        if others and mentions:
+            mentions += f' +{others} more'
+        elif others:
+            mentions = f'{others} new members'
+        return discord.Embed(
+            title='👋 Welcome!',
+            description=f'Welcome to {batch.guild.name}, {mentions}!',
+            color=0x00ff00,
+        )
+
+    async def close(self):
+        """Send every pending welcome message and stop."""
+        await asyncio.gather(*(self.flush(guild_id) for guild_id in list(self._batches)), return_exceptions=True)
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _start_flush(self, guild_id: int):
+        """Timer callback: flush a guild in a task."""
+        self._timers.pop(guild_id, None)
+        task = asyncio.get_running_loop().create_task(self.flush(guild_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
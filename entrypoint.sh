@@ -52,15 +52,44 @@ else
     echo "Data directory status: $([ -d "/app/data" ] && [ -n "$(ls -A /app/data 2>/dev/null)" ] && echo "has files" || echo "empty/missing")"
 fi
 
-# Install/update requirements if requirements.txt exists
+# Hash of the requirements, the Python version and the installed distributions
+environment_hash() {
+    {
+        cat /app/bot-volume/requirements.txt
+        python - <<'PYEOF'
+import sys
+from importlib.metadata import distributions
+print(sys.version)
+print(sorted(f"{d.metadata['Name']}=={d.version}" for d in distributions()))
+PYEOF
+    } | sha256sum | cut -d' ' -f1
+}
+
+# Install/update requirements when they or the installed packages changed since the last install
+REQUIREMENTS_HASH_FILE="/app/data/.requirements.sha256"
 if [ -f "/app/bot-volume/requirements.txt" ]; then
-    echo "Installing/updating Python packages..."
-    pip install --no-cache-dir -r /app/bot-volume/requirements.txt
+    if [ "$(environment_hash)" = "$(cat "$REQUIREMENTS_HASH_FILE" 2>/dev/null)" ]; then
+        echo "Requirements unchanged since the last install, skipping pip install"
+    else
+        echo "Installing/updating Python packages..."
+        if pip install --no-cache-dir -r /app/bot-volume/requirements.txt; then
+            # Hash again: the install itself changed the environment
+            environment_hash > "$REQUIREMENTS_HASH_FILE"
+        else
+            rm -f "$REQUIREMENTS_HASH_FILE"
+        fi
+    fi
 fi
 
+# Compile the bot volume ahead of time; only files changed since the last start are recompiled.
+# Syntax errors are reported when the bot imports the file, so they do not stop the start here.
+python -m compileall -q -j 0 /app/bot-volume > /dev/null 2>&1 || true
+
 echo "Starting bot..."
-echo "Bot files in volume:"
-ls -la /app/bot-volume/
+# Run the bot from the volume, as a multi-process cluster when CLUSTER_WORKERS is set
+if [ -n "$CLUSTER_WORKERS" ] && [ "$CLUSTER_WORKERS" != "1" ]; then
+    echo "Running: python /app/bot-volume/cluster.py ($CLUSTER_WORKERS workers)"
+    exec python -u /app/bot-volume/cluster.py
+fi
 echo "Running: python /app/bot-volume/bot.py"
-# Run the bot from the volume
 exec python -u /app/bot-volume/bot.py